@@ -1,38 +1,59 @@
 import streamlit as st
 import pandas as pd
 import os
-import glob
 import datetime
 import time
-import base64
-import re
-import json
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import PromptTemplate
-from langchain_core.messages import HumanMessage
-import firebase_admin
-from firebase_admin import credentials, firestore
+import uuid
+import array
+import collections
+import knowledge_base as kb
+from retrieval import PartitionedRetriever
+import course_catalog
+import course_store
+import query_router
+import prefetch
+import persistence
+import timeslots
+import timetable_view
+import scheduler
+import extraction
+import llm_cache
+import rate_limit
+import telemetry
+import clients
+from tokens import count_tokens
 
 # -----------------------------------------------------------------------------
 # [0] 설정 및 초기화
 # -----------------------------------------------------------------------------
 st.set_page_config(page_title="KW-강의마스터 Pro", page_icon="🦄", layout="wide")
 
+# 세션별 기록은 최근 N개만 유지 (링 버퍼)
+CHAT_HISTORY_LIMIT = int(os.environ.get("CHAT_HISTORY_LIMIT", "50"))
+LOG_LIMIT = int(os.environ.get("LOG_LIMIT", "200"))
+
 # Session State 초기화
-if "candidate_courses" not in st.session_state: st.session_state.candidate_courses = []
-if "my_schedule" not in st.session_state: st.session_state.my_schedule = []
-if "global_log" not in st.session_state: st.session_state.global_log = [] 
+# 강좌 정보는 프로세스 공유 저장소(COURSES)에 있고, 세션은 인덱스 배열과 시간표 마스크만 가진다
+if "candidate_ids" not in st.session_state: st.session_state.candidate_ids = array.array("i")
+if "schedule_ids" not in st.session_state: st.session_state.schedule_ids = course_store.STORE.index_array([])
+if "schedule_mask" not in st.session_state: st.session_state.schedule_mask = 0
+if "global_log" not in st.session_state: st.session_state.global_log = collections.deque(maxlen=LOG_LIMIT)
 if "timetable_result" not in st.session_state: st.session_state.timetable_result = "" 
-if "chat_history" not in st.session_state: st.session_state.chat_history = [] 
+if "chat_history" not in st.session_state: st.session_state.chat_history = collections.deque(maxlen=CHAT_HISTORY_LIMIT)
 if "current_menu" not in st.session_state: st.session_state.current_menu = "🤖 AI 학사 지식인"
 if "menu_radio" not in st.session_state: st.session_state["menu_radio"] = "🤖 AI 학사 지식인"
-if "timetable_chat_history" not in st.session_state: st.session_state.timetable_chat_history = []
+if "timetable_chat_history" not in st.session_state: st.session_state.timetable_chat_history = collections.deque(maxlen=CHAT_HISTORY_LIMIT)
 if "graduation_analysis_result" not in st.session_state: st.session_state.graduation_analysis_result = ""
-if "graduation_chat_history" not in st.session_state: st.session_state.graduation_chat_history = []
+if "graduation_chat_history" not in st.session_state: st.session_state.graduation_chat_history = collections.deque(maxlen=CHAT_HISTORY_LIMIT)
 if "user" not in st.session_state: st.session_state.user = None
 if "current_timetable_meta" not in st.session_state: st.session_state.current_timetable_meta = {}
 if "selected_syllabus" not in st.session_state: st.session_state.selected_syllabus = None
+if "schedule_job" not in st.session_state: st.session_state.schedule_job = None
+if "candidates_version" not in st.session_state: st.session_state.candidates_version = 0
+if "course_view" not in st.session_state: st.session_state.course_view = (None, None)
+if "selected_semester" not in st.session_state: st.session_state.selected_semester = None
+if "chat_session_id" not in st.session_state: st.session_state.chat_session_id = uuid.uuid4().hex
+if "prefetch_owner" not in st.session_state: st.session_state.prefetch_owner = prefetch.Owner()
 
 def set_style():
     st.markdown("""
@@ -77,6 +98,9 @@ def set_style():
         .course-row:hover {
             background-color: #f8f9fa;
         }
+        .course-row.cr-conflict {
+            opacity: 0.4;
+        }
         .cr-left {
             display: flex;
             flex-direction: column;
@@ -139,6 +163,20 @@ def set_style():
             border-radius: 6px; font-size: 12px; padding: 0px 8px; height: 28px; min-height: 28px;
         }
 
+        /* [Timetable] */
+        .tt-table { width: 100%; border-collapse: separate; border-spacing: 2px; table-layout: fixed; font-family: 'Pretendard'; }
+        .tt-header { color: #666; font-size: 11px; text-align: center; border-bottom: 1px solid #eee; padding: 4px; font-weight: 600; }
+        .tt-time { color: #999; font-size: 10px; text-align: center; height: 35px; background: #fdfdfd; }
+        .tt-cell { padding: 0; height: 35px; vertical-align: top; }
+        .tt-card {
+            width: 100%; height: 100%; display: flex; flex-direction: column; justify-content: center;
+            border-radius: 4px; font-size: 10px; line-height: 1.1; text-align: center; cursor: default;
+        }
+        .tt-name { font-weight: 800; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
+        .tt-online { margin-top: 10px; font-size: 11px; color: #555; }
+        .tt-badge { display: inline-block; padding: 2px 6px; border-radius: 4px; margin: 2px; font-weight: 700; font-size: 10px; }
+        .tt-empty { border: 1px dashed #f5f5f5; }
+
         #MainMenu {visibility: hidden;} footer {visibility: hidden;}
         </style>
     """, unsafe_allow_html=True)
@@ -155,6 +193,9 @@ if not api_key:
     st.error("🚨 **Google API Key가 설정되지 않았습니다.**")
     st.stop()
 
+# 관리자 패널을 볼 수 있는 계정 (쉼표 구분, 비어 있으면 아무에게도 보이지 않음)
+ADMIN_EMAILS = {e.strip() for e in os.environ.get("ADMIN_EMAILS", "").split(",") if e.strip()}
+
 def add_log(role, content, menu_context=None):
     timestamp = datetime.datetime.now().strftime("%H:%M")
     st.session_state.global_log.append({
@@ -164,40 +205,57 @@ def add_log(role, content, menu_context=None):
         "menu": menu_context
     })
 
-def run_with_retry(func, *args, **kwargs):
-    max_retries = 5
-    delays = [1, 2, 4, 8, 16]
-    for i in range(max_retries):
-        try:
-            return func(*args, **kwargs)
-        except Exception as e:
-            error_msg = str(e)
-            if "429" in error_msg or "RESOURCE_EXHAUSTED" in error_msg or "503" in error_msg:
-                if i < max_retries - 1:
-                    time.sleep(delays[i])
-                    continue
-            raise e
+# 프로세스 공용 한도(분당 요청/토큰) + 서킷 브레이커를 거쳐 실행.
+# 429/503은 지터 백오프(Retry-After 우선)로 재시도하고, 대기는 데드라인을 넘지 않는다.
+# span이 주어지면 실제 호출 횟수와 재시도 횟수를 누적한다.
+def run_with_retry(func, *args, tokens=0, deadline=None, span=None, **kwargs):
+    attempts = 0
+    def _attempt():
+        nonlocal attempts
+        attempts += 1
+        return func(*args, **kwargs)
+    try: return rate_limit.gemini.call(_attempt, tokens=tokens, deadline=deadline)
+    finally:
+        if span is not None: span.add(llm_calls=1, retries=max(0, attempts - 1))
+
+# LLM/Firestore 클라이언트 레지스트리: 프로세스당 한 번 등록하고 백그라운드에서 예열
+# (langchain/firebase import와 클라이언트 생성이 첫 화면과 매 상호작용 경로에서 빠진다)
+@st.cache_resource
+def get_clients(api_key):
+    registry = clients.ClientRegistry()
+    registry.register("gemini", lambda: clients.make_gemini(api_key, timeout=rate_limit.LLM_DEADLINE))
+    registry.register("gemini_pro", lambda: clients.make_gemini(api_key, timeout=rate_limit.LLM_DEADLINE))
+    if "firebase_service_account" in st.secrets:
+        account = dict(st.secrets["firebase_service_account"])
+        registry.register("firestore", lambda: clients.make_firestore(account), check=clients.check_firestore)
+    registry.warmup()
+    return registry
+
+CLIENTS = get_clients(api_key)
+
+def format_prompt(template, variables):
+    from langchain_core.prompts import PromptTemplate
+    return PromptTemplate.from_template(template).format(**variables)
 
 # -----------------------------------------------------------------------------
 # [Firebase Manager]
 # -----------------------------------------------------------------------------
+# Firestore 클라이언트는 레지스트리가 보관하므로 매니저 자체는 상태가 없다
+# 저장은 지연 쓰기 큐(일괄 commit, 재시도)로 요청 경로에서 빼고, 목록/사용자 조회는 TTL 캐시를 거친다
+@st.cache_resource
+def get_persistence():
+    return persistence.WriteBehindStore(lambda: CLIENTS.get_or_none("firestore"))
+
+PERSISTENCE = get_persistence()
+
 class FirebaseManager:
-    def __init__(self):
-        self.db = None
-        self.is_initialized = False
-        self.init_firestore()
-
-    def init_firestore(self):
-        if "firebase_service_account" in st.secrets:
-            try:
-                if not firebase_admin._apps:
-                    cred_info = dict(st.secrets["firebase_service_account"])
-                    cred = credentials.Certificate(cred_info)
-                    firebase_admin.initialize_app(cred)
-                self.db = firestore.client()
-                self.is_initialized = True
-            except Exception:
-                pass
+    @property
+    def db(self):
+        return CLIENTS.get_or_none("firestore")
+
+    @property
+    def is_initialized(self):
+        return self.db is not None
 
     def login(self, email, password):
         if not self.is_initialized: return None, "Firebase 연결 실패"
@@ -214,155 +272,313 @@ class FirebaseManager:
     def signup(self, email, password):
         if not self.is_initialized: return None, "Firebase 연결 실패"
         try:
-            users_ref = self.db.collection('users')
-            existing = list(users_ref.where('email', '==', email).stream())
-            if len(existing) > 0: return None, "이미 가입된 이메일"
-            new_ref = users_ref.document()
+            uid, _ = PERSISTENCE.find_user(email)
+            if uid is not None: return None, "이미 가입된 이메일"
+            # 가입은 바로 기록 (다른 세션/프로세스의 중복 가입 확인이 서버 내용을 봐야 하므로)
+            new_ref = self.db.collection('users').document()
+            from firebase_admin import firestore
             data = {"email": email, "password": password, "created_at": firestore.SERVER_TIMESTAMP}
             new_ref.set(data)
+            data["created_at"] = persistence.now()
+            PERSISTENCE.remember_user(email, new_ref.id, data)
             data['localId'] = new_ref.id
             return data, None
         except Exception as e: return None, str(e)
 
     def save_data(self, collection, doc_id, data):
         if not self.is_initialized or not st.session_state.user: return False
-        try:
-            uid = st.session_state.user['localId']
-            self.db.collection('users').document(uid).collection(collection).document(doc_id).set(data)
-            return True
-        except: return False
+        uid = st.session_state.user['localId']
+        PERSISTENCE.put(uid, collection, doc_id, {**data, "updated_at": persistence.now()})
+        return True
 
     def load_collection(self, collection):
         if not self.is_initialized or not st.session_state.user: return []
-        try:
-            uid = st.session_state.user['localId']
-            docs = self.db.collection('users').document(uid).collection(collection).order_by('updated_at', direction=firestore.Query.DESCENDING).stream()
-            return [{"id": doc.id, **doc.to_dict()} for doc in docs]
-        except: return []
+        try: return PERSISTENCE.load_collection(st.session_state.user['localId'], collection)
+        except Exception: return []
 
 fb_manager = FirebaseManager()
 
-# PDF 로드
-@st.cache_resource(show_spinner="문서 학습 중...")
-def load_knowledge_base():
-    if not os.path.exists("data"): return ""
-    pdf_files = glob.glob("data/*.pdf")
-    if not pdf_files: return ""
-    all_content = ""
-    for pdf_file in pdf_files:
-        try:
-            loader = PyPDFLoader(pdf_file)
-            pages = loader.load_and_split()
-            all_content += f"\n\n--- [문서: {os.path.basename(pdf_file)}] ---\n"
-            for page in pages: all_content += page.page_content
-        except: continue
-    return all_content
+# 기능별 지연/토큰 계측 저장소 (SQLite, 세션/프로세스 간 공유)
+@st.cache_resource
+def get_telemetry():
+    return telemetry.TelemetryStore()
 
-PRE_LEARNED_DATA = load_knowledge_base()
+TELEMETRY = get_telemetry()
+
+def track(feature, **meta):
+    return telemetry.Span(feature, TELEMETRY, **meta)
+
+# -----------------------------------------------------------------------------
+# [백그라운드 로딩] 문서 기반 리소스는 서버 시작 시 별도 스레드에서 준비
+# -----------------------------------------------------------------------------
+# 스크립트는 기다리지 않고 바로 화면을 그린다. 로그인/설정처럼 문서가 필요 없는 UI는 즉시 쓸 수 있고,
+# 문서가 필요한 기능(지식인, 강의 불러오기)만 준비될 때까지 대기 상태를 보여준다.
+# 순서: 지식 베이스 → 검색 인덱스(기본 화면인 지식인) → 강의 카탈로그 → AI 추출 청크
+
+# PDF 로드 (generate.py와 같은 해시 기반 아티팩트를 사용, 없거나 낡았을 때만 빌드) → manifest
+def load_knowledge_base():
+    if not os.path.exists(kb.DATA_DIR): return {}
+    with track("load_knowledge_base") as span:
+        if kb.needs_rebuild():
+            span.meta["rebuilt"] = True
+            try: kb.build_knowledge_base(log=None)
+            except Exception as e: span.fail(e)
+        return kb.load_manifest() or {}
+
+# 학기 파티션별 검색 인덱스 (청크 단위, 문서/페이지 출처 포함)
+# 가장 최근 학기 파티션만 먼저 만들고, 나머지 학기는 백그라운드에서 이어서 만든다
+def load_retriever(resources):
+    resources.get("knowledge_base")
+    with track("load_retriever"):
+        retriever = PartitionedRetriever()
+        for key in retriever.scope(None): retriever.index(key)
+    retriever.warmup()
+    return retriever
+
+# 강의시간표 PDF에서 추출한 정형 강의 카탈로그 (없으면 빌드)
+def load_course_catalog(resources):
+    resources.get("knowledge_base")
+    with track("load_course_catalog") as span:
+        try: course_catalog.build_catalog(log=None)
+        except Exception as e: span.fail(e)
+        return course_catalog.load_catalog()
+
+# generate.py가 미리 만든 학과 × 학년 × 학기 후보 목록 (공유 강좌 저장소에 올려 인덱스 배열로 보관)
+def load_candidate_lists(resources):
+    resources.get("knowledge_base")
+    with track("load_candidate_lists"):
+        return {key: {"term": e["term"], "version": e["version"], "ids": course_store.STORE.intern_list(e["courses"])}
+                for key, e in course_catalog.load_candidate_lists().items()}
+
+# 강좌/교수/학과 조회 질문을 LLM 없이 답하는 카탈로그 색인
+def load_course_index(resources):
+    catalog = resources.get("course_catalog")
+    with track("load_course_index"):
+        return query_router.CourseIndex(catalog)
+
+# AI 추출용 토큰 예산 청크 (map-reduce), 학기 파티션별
+def load_extraction_chunks(resources):
+    manifest = resources.get("knowledge_base")
+    return {key: extraction.split_pages(kb.iter_documents(partitions=(key,))) for key in manifest.get("partitions", {})}
+
+@st.cache_resource
+def get_resources():
+    registry = clients.ClientRegistry()
+    registry.register("knowledge_base", load_knowledge_base)
+    registry.register("retriever", lambda: load_retriever(registry))
+    registry.register("course_catalog", lambda: load_course_catalog(registry))
+    registry.register("course_index", lambda: load_course_index(registry))
+    registry.register("candidate_lists", lambda: load_candidate_lists(registry))
+    registry.register("extraction_chunks", lambda: load_extraction_chunks(registry))
+    registry.warmup()
+    return registry
+
+RESOURCES = get_resources()
+
+def kb_version():
+    return RESOURCES.get("knowledge_base").get("kb_version", "")
+
+# LLM 응답 캐시 (SQLite, 세션/프로세스 간 공유)
+@st.cache_resource
+def get_llm_cache():
+    return llm_cache.LLMCache()
+
+LLM_CACHE = get_llm_cache()
+
+# 공유 강좌 저장소 (불변 Course 레코드, 모든 세션이 같은 객체를 참조)
+COURSES = course_store.STORE
+
+def my_schedule():
+    return COURSES.courses(st.session_state.schedule_ids)
+
+def set_schedule(courses):
+    st.session_state.schedule_ids = COURSES.index_array(courses)
+    st.session_state.schedule_mask = timeslots.sum_masks(my_schedule())
 
 # -----------------------------------------------------------------------------
 # [AI Engine]
 # -----------------------------------------------------------------------------
+# 공유 클라이언트 (레지스트리에서 한 번 생성된 인스턴스를 재사용)
 def get_llm():
     if not api_key: return None
-    return ChatGoogleGenerativeAI(model="gemini-2.5-flash-preview-09-2025", temperature=0)
+    return CLIENTS.get("gemini")
 def get_pro_llm():
     if not api_key: return None
-    return ChatGoogleGenerativeAI(model="gemini-2.5-flash-preview-09-2025", temperature=0)
-
-def ask_ai(question):
-    llm = get_llm()
-    if not llm: return "⚠️ API Key 오류"
+    return CLIENTS.get("gemini_pro")
+
+# 프롬프트 + 모델 + temperature + 지식 베이스 버전이 같으면 캐시된 응답을 재사용
+# (version을 주면 전체 대신 쓰인 학기 파티션의 버전 → 새 학기 자료가 추가돼도 기존 답변 유지)
+# span이 주어지면 캐시 적중 여부와 (실제 호출 시) 프롬프트/응답 토큰 수를 누적한다.
+def cached_invoke(llm, template, variables, validate=None, span=None, version=None, deadline=None):
+    prompt = format_prompt(template, variables)
+    prompt_tokens = count_tokens(prompt)
+    called = False
     def _execute():
-        chain = PromptTemplate.from_template(
-            "문서 내용: {context}\n질문: {question}\n문서 기반 답변(인용 필수):"
-        ) | llm
-        return chain.invoke({"context": PRE_LEARNED_DATA, "question": question}).content
-    try: return run_with_retry(_execute)
-    except: return "⚠️ AI 응답 지연"
+        return llm.invoke(prompt).content
+    def _call():
+        nonlocal called
+        called = True
+        return run_with_retry(_execute, tokens=prompt_tokens, span=span, deadline=deadline)
+    response = LLM_CACHE.get_or_call(prompt, llm.model, llm.temperature, version or kb_version(), _call, validate=validate)
+    if span is not None:
+        if called: span.add(prompt_tokens=prompt_tokens, response_tokens=count_tokens(response))
+        else: span.add(cache_hits=1)
+    return response
+
+def chunk_text(chunk):
+    content = chunk.content
+    if isinstance(content, str): return content
+    return "".join(p if isinstance(p, str) else p.get("text", "") for p in content)
+
+# 스트리밍 버전: 첫 토큰이 오기 전까지만 run_with_retry로 재시도하고, 이후는 그대로 흘려보낸다
+def stream_invoke(llm, template, variables, span=None, version=None, deadline=None):
+    prompt = format_prompt(template, variables)
+    key = llm_cache.make_key(prompt, llm.model, llm.temperature, version or kb_version())
+    cached = LLM_CACHE.try_get(key)
+    if cached is not None:
+        if span is not None: span.add(cache_hits=1); span.first_token()
+        yield cached
+        return
+    prompt_tokens = count_tokens(prompt)
+    def _first_chunk():
+        stream = iter(llm.stream(prompt))
+        return next(stream, None), stream
+    first, stream = run_with_retry(_first_chunk, tokens=prompt_tokens, span=span, deadline=deadline)
+    if span is not None: span.first_token()
+    parts = []
+    if first is not None:
+        parts.append(chunk_text(first)); yield parts[-1]
+        for chunk in stream:
+            parts.append(chunk_text(chunk)); yield parts[-1]
+    response = "".join(parts)
+    if span is not None: span.add(prompt_tokens=prompt_tokens, response_tokens=count_tokens(response))
+    LLM_CACHE.try_put(key, response, llm.model)
+
+ASK_TEMPLATE = "문서 내용: {context}\n질문: {question}\n문서 기반 답변(인용 필수):"
+
+# 검색할 학기: 질문에 적힌 학기 → 시간표 화면에서 고른 학기 → (없으면) 가장 최근 학기
+def question_terms(question, retriever):
+    terms = kb.detect_terms(question, retriever.terms)
+    if not terms and st.session_state.selected_semester:
+        terms = tuple(t for t in [kb.resolve_term(retriever.terms, st.session_state.selected_semester)] if t)
+    return retriever.scope(terms)
+
+# 과목명/교수/학과 조회는 카탈로그에서 바로 답한다 (출처 페이지 포함). 설명이 필요한 질문이면 None → LLM
+def route_question(question):
+    if not RESOURCES.ready("course_index"): return None
+    with track("ask_router") as span:
+        answer = query_router.route(RESOURCES.get("course_index"), question, st.session_state.selected_semester)
+        span.meta["intent"] = answer.intent if answer else "llm"
+    return answer
+
+def ask_ai_stream(question):
+    routed = route_question(question)
+    if routed:
+        yield routed.text
+        return
+    llm = get_llm()
+    if not llm:
+        yield "⚠️ API Key 오류"
+        return
+    deadline = time.monotonic() + rate_limit.ASK_DEADLINE
+    # 코퍼스 전체 대신 해당 학기 파티션에서 질문과 관련된 상위 청크만 토큰 예산 안에서 전달
+    retriever = RESOURCES.get("retriever")
+    terms = question_terms(question, retriever)
+    with track("ask_ai_stream", terms=",".join(terms)) as span:
+        context = retriever.build_context(question, terms)
+        started = False
+        try:
+            for text in stream_invoke(llm, ASK_TEMPLATE, {"context": context, "question": question}, span=span,
+                                      version=retriever.version(terms), deadline=deadline):
+                started = True
+                yield text
+        except rate_limit.CircuitOpenError as e:
+            span.fail(e)
+            yield "\n\n⚠️ 응답이 중단되었습니다." if started else "⚠️ 요청이 몰려 있습니다. 잠시 후 다시 시도해주세요."
+        except rate_limit.DeadlineExceeded as e:
+            span.fail(e)
+            yield "\n\n⚠️ 응답이 중단되었습니다." if started else "⚠️ 응답 시간이 초과되었습니다. 잠시 후 다시 시도해주세요."
+        except Exception as e:
+            span.fail(e)
+            yield "\n\n⚠️ 응답이 중단되었습니다." if started else "⚠️ AI 응답 지연"
 
 # -----------------------------------------------------------------------------
 # [기능 로직] 시간표 & 데이터 추출 (로직 수정됨)
 # -----------------------------------------------------------------------------
 def check_time_conflict(new_course, current_schedule):
-    new_slots = set(new_course.get('time_slots', []))
-    for existing in current_schedule:
-        existing_slots = set(existing.get('time_slots', []))
-        if new_slots & existing_slots: return True, existing['name']
-    return False, None
-
+    name = timeslots.find_conflict(new_course, current_schedule)
+    return name is not None, name
+
+# [강의 목록] 탭 분류/검색/충돌 여부를 한 번의 순회로 계산하고, (목록 버전, 검색어, 담은 과목)이
+# 바뀔 때만 다시 만든다. 화면에는 페이지 단위로 보이는 행만 그린다.
+# 세션에는 후보 위치 배열과 충돌 플래그만 남기고, 행 HTML은 timetable_view가 프로세스 단위로 캐시한다.
+ROWS_PER_PAGE = 15
+
+def build_course_view(candidate_ids, schedule_ids, schedule_mask, query):
+    # 충돌 여부 = 후보 마스크 AND 시간표 마스크 (공유 저장소의 마스크 배열로 한 번에 계산)
+    blocked = COURSES.conflicts_with(candidate_ids, schedule_mask)
+    added = {COURSES[i].name for i in schedule_ids}
+    query = query.strip().lower()
+    tabs = {"must": array.array("i"), "maj": array.array("i"), "etc": array.array("i")}
+    for pos, idx in enumerate(candidate_ids):
+        c = COURSES[idx]
+        if c.name in added: continue
+        if query and query not in c.name.lower() and query not in c.professor.lower(): continue
+        tabs["must" if c.priority == 'High' else "maj" if c.priority == 'Medium' else "etc"].append(pos)
+    return {"tabs": tabs, "blocked": blocked}
+
+def get_course_view(query):
+    key = (st.session_state.candidates_version, query, st.session_state.schedule_ids.tobytes())
+    cached_key, view = st.session_state.course_view
+    if cached_key != key:
+        if cached_key is None or cached_key[:2] != key[:2]:
+            for tab in ("must", "maj", "etc"): st.session_state[f"page_{tab}"] = 0  # 목록/검색어가 바뀌면 첫 페이지로
+        view = build_course_view(st.session_state.candidate_ids, st.session_state.schedule_ids,
+                                 st.session_state.schedule_mask, query)
+        st.session_state.course_view = (key, view)
+    return view
+
+# 시간표 HTML은 timetable_view가 시간표 지문 단위로 캐시 (색상은 과목명 기준으로 고정)
 def render_interactive_timetable(schedule_list):
-    days = ["월", "화", "수", "목", "금"]
-    table_grid = {i: {d: None for d in days} for i in range(1, 10)}
-    online_courses = []
-    
-    # 색상 (파스텔톤)
-    palette = [
-        {"bg": "#FFEBEE", "text": "#C62828"}, {"bg": "#E3F2FD", "text": "#1565C0"},
-        {"bg": "#E8F5E9", "text": "#2E7D32"}, {"bg": "#F3E5F5", "text": "#6A1B9A"},
-        {"bg": "#FFF3E0", "text": "#EF6C00"}, {"bg": "#E0F2F1", "text": "#00695C"},
-        {"bg": "#FCE4EC", "text": "#AD1457"}
-    ]
-
-    for course in schedule_list:
-        slots = course.get('time_slots', [])
-        if not slots or slots == ["시간미정"] or not isinstance(slots, list):
-            online_courses.append(course)
-            continue
-        
-        style = palette[abs(hash(course['name'])) % len(palette)]
-        for slot in slots:
-            if len(slot) < 2: continue
-            day, period = slot[0], int(slot[1:]) if slot[1:].isdigit() else 0
-            if day in days and 1 <= period <= 9:
-                table_grid[period][day] = {"name": course['name'], "prof": course['professor'], "style": style}
-
-    # HTML (Compact)
-    html = """
-    <style>
-        .tt-table { width: 100%; border-collapse: separate; border-spacing: 2px; table-layout: fixed; font-family: 'Pretendard'; }
-        .tt-header { color: #666; font-size: 11px; text-align: center; border-bottom: 1px solid #eee; padding: 4px; font-weight: 600; }
-        .tt-time { color: #999; font-size: 10px; text-align: center; height: 35px; background: #fdfdfd; }
-        .tt-cell { padding: 0; height: 35px; vertical-align: top; }
-        .tt-card {
-            width: 100%; height: 100%; display: flex; flex-direction: column; justify-content: center;
-            border-radius: 4px; font-size: 10px; line-height: 1.1; text-align: center; cursor: default;
-        }
-        .tt-name { font-weight: 800; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
-        .tt-online { margin-top: 10px; font-size: 11px; color: #555; }
-        .tt-badge { display: inline-block; padding: 2px 6px; border-radius: 4px; margin: 2px; font-weight: 700; font-size: 10px; }
-    </style>
-    <table class="tt-table">
-        <tr><th style="width:20px;"></th><th>월</th><th>화</th><th>수</th><th>목</th><th>금</th></tr>
-    """
-    for i in range(1, 10):
-        html += f"<tr><td class='tt-time'>{i}</td>"
-        for d in days:
-            c = table_grid[i][d]
-            if c:
-                html += f"<td class='tt-cell'><div class='tt-card' style='background:{c['style']['bg']}; color:{c['style']['text']};'><span class='tt-name'>{c['name']}</span></div></td>"
-            else:
-                html += "<td class='tt-cell' style='border:1px dashed #f5f5f5;'></td>"
-        html += "</tr>"
-    html += "</table>"
-    
-    if online_courses:
-        html += "<div class='tt-online'><strong>💻 온라인/기타:</strong> "
-        for c in online_courses:
-            s = palette[abs(hash(c['name'])) % len(palette)]
-            html += f"<span class='tt-badge' style='background:{s['bg']}; color:{s['text']};'>{c['name']}</span>"
-        html += "</div>"
-    return html
+    return timetable_view.render_timetable(schedule_list)
+
+# 카탈로그 기반 후보 조회 (결정적, 밀리초 단위). 카탈로그에 없을 때만 AI 스캔으로 대체
+# 미리 만든 목록이 현재 학기 파티션 버전과 맞으면 그대로, 없거나 낡았으면 카탈로그 조회 → AI 추출
+def get_course_candidates(major, grade, semester, cancelled=None):
+    with track("course_candidates", major=major, grade=grade, semester=semester) as span:
+        manifest = RESOURCES.get("knowledge_base")
+        entry = (RESOURCES.get_or_none("candidate_lists") or {}).get(course_catalog.candidate_key(major, grade, semester))
+        term = kb.resolve_term(kb.terms(manifest), semester)
+        if entry and term and entry["version"] == course_catalog.candidate_version(manifest, term):
+            span.meta["source"] = "precomputed"
+            return COURSES.courses(entry["ids"])
+        courses = course_catalog.validate_candidates(
+            course_catalog.query_candidates(RESOURCES.get("course_catalog"), major, grade, semester))
+        span.meta["source"] = "catalog" if courses else "ai"
+        return courses or get_course_candidates_json(major, grade, semester, cancelled=cancelled)
+
+# 설정(학과/학년/학기)이 바뀌면 바로 백그라운드에서 후보를 불러 둔다 (조합별로 세션 간 공유,
+# 다른 조합으로 바뀌어 아무도 기다리지 않는 작업은 취소). 결과는 공유 저장소의 인덱스 배열.
+@st.cache_resource
+def get_prefetcher():
+    return prefetch.Prefetcher()
+
+PREFETCH = get_prefetcher()
+
+def prefetch_candidates(major, grade, semester, wait=False):
+    load = lambda cancelled: COURSES.intern_list(get_course_candidates(major, grade, semester, cancelled=cancelled))
+    request = PREFETCH.get if wait else PREFETCH.request
+    return request(st.session_state.prefetch_owner, (major, grade, semester), load)
 
 # [핵심 수정] AI 자율 추론 프롬프트
-def get_course_candidates_json(major, grade, semester, diagnosis_text=""):
+def get_course_candidates_json(major, grade, semester, diagnosis_text="", cancelled=None):
     llm = get_llm()
     if not llm: return []
 
     # 교양 과목 등 모든 필터링 로직을 AI에게 위임 (문서 기반)
     prompt_template = """
     너는 [대학교 학사 데이터베이스 전문 파서]이다. 
-    제공된 [강의 문서(PDF)] 전체를 꼼꼼히 스캔하여, 아래 조건에 맞는 **모든 과목**을 JSON으로 추출하라.
+    제공된 [강의 문서(PDF)] 일부를 꼼꼼히 스캔하여, 아래 조건에 맞는 **모든 과목**을 JSON으로 추출하라.
     
     [필수 조건]
     1. **대상 학생:** {major} 소속, {grade} {semester} 학생이 수강 가능한 과목.
@@ -386,22 +602,58 @@ def get_course_candidates_json(major, grade, semester, diagnosis_text=""):
     [문서 데이터] {context}
     """
     
-    def _execute():
-        chain = PromptTemplate.from_template(prompt_template) | llm
-        return chain.invoke({
+    # 선택한 학기(+공통) 파티션만, 토큰 예산 청크로 나눠 병렬 추출 후 병합 (한 응답에 전부 담다가 잘리는 문제 방지)
+    manifest = RESOURCES.get("knowledge_base")
+    term = kb.resolve_term(kb.terms(manifest), semester)
+    keys = [k for k in (term, kb.COMMON) if k] if term else list(manifest.get("partitions", {}))
+    partitions = RESOURCES.get("extraction_chunks")
+    chunks = [c for k in keys for c in partitions.get(k, [])]
+    version = kb.partition_version(manifest, keys)
+    # 스캔 전체 예산: 지나면 남은 청크는 호출하지 않고 (DeadlineExceeded → 빈 결과) 모인 결과만 병합
+    deadline = time.monotonic() + rate_limit.SCAN_DEADLINE
+
+    def _extract(chunk):
+        variables = {
             "major": major, "grade": grade, "semester": semester,
-            "diagnosis_context": diagnosis_text, "context": PRE_LEARNED_DATA
-        }).content
-
-    try:
-        response = run_with_retry(_execute)
-        cleaned_json = response.replace("```json", "").replace("```", "").strip()
-        if not cleaned_json.startswith("["):
-             start = cleaned_json.find("[")
-             end = cleaned_json.rfind("]")
-             if start != -1 and end != -1: cleaned_json = cleaned_json[start:end+1]
-        return json.loads(cleaned_json)
-    except: return []
+            "diagnosis_context": diagnosis_text, "context": chunk
+        }
+        # 파싱 가능한 응답만 캐시 (잘린 JSON이 캐시에 남지 않도록)
+        try:
+            response = cached_invoke(llm, prompt_template, variables,
+                                     validate=lambda r: extraction.parse_course_json(r) is not None, span=span,
+                                     version=version, deadline=deadline)
+        except Exception as e:
+            span.fail(e)  # 청크 실패는 map_reduce_extract가 빈 결과로 처리하므로 사유만 남긴다
+            raise
+        return extraction.parse_course_json(response)
+
+    with track("course_candidates_json", major=major, grade=grade, semester=semester, term=term) as span:
+        try: return extraction.map_reduce_extract(chunks, _extract, cancelled=cancelled)
+        except Exception as e:
+            span.fail(e)
+            return []
+
+# 백그라운드 로딩이 끝날 때까지 이 조각만 주기적으로 확인하고, 준비되거나 실패하면 화면 전체를 다시 그린다
+@st.fragment(run_every=1.0)
+def wait_for_resource(name, message):
+    if RESOURCES.ready(name) or RESOURCES.error(name): st.rerun()
+    st.info(message, icon="⏳")
+
+# 로딩에 실패했으면 기다리지 않고 오류와 다시 시도 버튼을 보여 준다
+def show_resource_status(name, message):
+    error = RESOURCES.error(name)
+    if error is None: return wait_for_resource(name, message)
+    st.error(f"⚠️ 불러오지 못했습니다: {error}")
+    if st.button("🔄 다시 시도", key=f"retry_{name}"):
+        RESOURCES.retry(name)
+        st.rerun()
+
+# 자동 시간표 생성 작업이 끝날 때까지 이 조각만 주기적으로 재실행 (스크립트 전체는 막지 않음)
+@st.fragment(run_every=0.3)
+def wait_for_schedule_job():
+    job = st.session_state.schedule_job
+    if job is not None and job.done(): st.rerun()
+    st.caption("⏳ 시간표 조합을 탐색 중입니다...")
 
 # 성적 분석 함수들 (유지)
 def analyze_graduation_requirements(uploaded_images):
@@ -411,7 +663,6 @@ def analyze_graduation_requirements(uploaded_images):
     return "분석 기능은 현재 데모 모드입니다." # 실제 구현시 이전 코드 사용
 
 def chat_with_graduation_ai(current_analysis, user_input):
-    llm = get_llm()
     # (챗봇 로직 생략 - 이전과 동일)
     return "답변 생성 중..."
 
@@ -432,11 +683,40 @@ with st.sidebar:
                 else: st.error(e)
     else:
         st.info(f"👤 {st.session_state.user['email']}")
+        # 재시도를 모두 실패한 저장은 보관해 두었다가 사용자가 다시 보낼 수 있게 한다
+        unsaved = PERSISTENCE.failed(st.session_state.user['localId'])
+        if unsaved:
+            st.warning(f"💾 서버에 저장하지 못한 항목이 {len(unsaved)}개 있습니다.")
+            if st.button("다시 저장", use_container_width=True, key="retry_saves"):
+                PERSISTENCE.retry_failed(st.session_state.user['localId']); st.rerun()
         if st.button("Logout", use_container_width=True): st.session_state.clear(); st.rerun()
     
     st.markdown("---")
     if st.button("📡 Data Sync"):
         st.toast("Syncing..."); time.sleep(1); st.cache_resource.clear(); st.rerun()
+    # [관리자 패널] 캐시/저장/요청 상태, 기능별 지연 백분위수/토큰 사용량, 헬스 체크 (ADMIN_EMAILS 계정만)
+    if st.session_state.user and st.session_state.user.get('email') in ADMIN_EMAILS:
+        cache_stats = LLM_CACHE.stats()
+        st.caption(f"🗄️ AI 캐시: 적중 {cache_stats['hits']} · 미스 {cache_stats['misses']} · {cache_stats['entries']}건")
+        ps = PERSISTENCE.stats()
+        st.caption(f"💾 저장: 대기 {ps['pending']} · 기록 {ps.get('written', 0)}건/{ps.get('batches', 0)}회 · "
+                   f"재시도 {ps.get('retries', 0)} · 미기록 {ps['unsaved']} · 캐시 적중 {ps.get('cache_hits', 0)}")
+        if ps["last_error"]: st.caption(f"⚠️ 저장 오류: {ps['last_error']}")
+        rl = rate_limit.gemini.stats()
+        st.caption(f"🚦 AI 요청: 대기 {rl['queue_depth']} · 진행 {rl['in_flight']} · 제한 {rl['throttled']}회 · "
+                   f"속도 {rl['rate_scale']:.0%} · 서킷 {rl['circuit']}")
+        with st.expander("📊 성능 지표 (최근 24시간)"):
+            summary = TELEMETRY.summary()
+            if summary: st.dataframe(pd.DataFrame(summary).set_index("feature"), use_container_width=True)
+            else: st.caption("기록된 호출이 없습니다.")
+            health = CLIENTS.health(run_checks=st.button("🩺 헬스 체크", key="client_health"))
+            for name, h in {**health, **RESOURCES.health()}.items():
+                detail = f" · 체크 {h['check']} ({h['check_ms']}ms)" if "check" in h else ""
+                st.caption(f"🔌 {name}: {h['state']}" + (f" · {h['build_ms']}ms" if h['build_ms'] is not None else "")
+                           + detail + (f" · {h['error']}" if h['error'] else ""))
+            failures = [e for e in TELEMETRY.recent() if e["error"]][:5]
+            for e in failures:
+                st.caption(f"⚠️ {datetime.datetime.fromtimestamp(e['ts']).strftime('%H:%M:%S')} {e['feature']} · {e['error']}")
 
 # 헤더
 st.markdown('<h1 class="main-title">🦄 KW-Master Pro</h1>', unsafe_allow_html=True)
@@ -452,36 +732,80 @@ with st.container(border=True):
     if st.session_state.current_menu == "🤖 AI 지식인":
         # (지식인 코드 유지)
         st.subheader("🤖 무엇이든 물어보세요")
+        if RESOURCES.ready("retriever"):
+            retriever = RESOURCES.get("retriever")
+            scope = ", ".join(t for t in question_terms("", retriever) if t != kb.COMMON)
+            if scope: st.caption(f"🔎 {scope} 자료에서 찾습니다 · 질문에 '2025-1'처럼 학기를 적으면 그 학기 자료를 봅니다")
         chat_container = st.container(height=500)
         with chat_container:
             for msg in st.session_state.chat_history:
                 with st.chat_message(msg["role"]): st.markdown(msg["content"])
-        if prompt := st.chat_input("질문 입력..."):
+        kb_ready = RESOURCES.ready("retriever")
+        if not kb_ready: show_resource_status("retriever", "문서를 학습하는 중입니다. 잠시 후 질문할 수 있어요.")
+        if prompt := st.chat_input("질문 입력...", disabled=not kb_ready):
             st.session_state.chat_history.append({"role":"user","content":prompt})
             with chat_container:
                 st.chat_message("user").write(prompt)
                 with st.chat_message("assistant"):
-                    resp = ask_ai(prompt)
-                    st.write(resp)
+                    # 토큰이 도착하는 대로 표시, 완료된 전체 텍스트를 기록에 저장
+                    resp = st.write_stream(ask_ai_stream(prompt))
             st.session_state.chat_history.append({"role":"assistant","content":resp})
+            fb_manager.save_data("chats", st.session_state.chat_session_id,
+                                 {"menu": "지식인", "messages": list(st.session_state.chat_history)})
 
     elif st.session_state.current_menu == "📅 스마트 시간표":
         st.subheader("📅 AI Smart Timetable")
         
         # [설정 영역]
-        with st.expander("🛠️ 설정 (학과/학년)", expanded=not bool(st.session_state.candidate_courses)):
+        with st.expander("🛠️ 설정 (학과/학년)", expanded=not st.session_state.candidate_ids):
             c1, c2, c3 = st.columns(3)
-            major = c1.selectbox("학과", ["전자공학과", "소프트웨어학부", "컴퓨터정보공학부", "정보융합학부"], key="tt_major")
-            grade = c2.selectbox("학년", ["1학년", "2학년", "3학년", "4학년"], key="tt_grade")
-            semester = c3.selectbox("학기", ["1학기", "2학기"], key="tt_semester")
-            if st.button("🚀 강의 불러오기 (AI Scan)", type="primary", use_container_width=True):
-                with st.spinner("AI가 PDF 문서 전체를 스캔하여 교양/전공 과목을 추출합니다..."):
-                    res = get_course_candidates_json(major, grade, semester)
-                    if res: st.session_state.candidate_courses = res; st.session_state.my_schedule = []; st.rerun()
+            major = c1.selectbox("학과", course_catalog.MAJORS, key="tt_major")
+            grade = c2.selectbox("학년", course_catalog.GRADES, key="tt_grade")
+            semester = c3.selectbox("학기", course_catalog.SEMESTERS, key="tt_semester")
+            st.session_state.selected_semester = semester  # 지식인 검색 범위에도 사용
+            catalog_ready = RESOURCES.ready("course_catalog")
+            if not catalog_ready: show_resource_status("course_catalog", "강의시간표를 정리하는 중입니다...")
+            if catalog_ready: prefetch_candidates(major, grade, semester)
+            if st.button("🚀 강의 불러오기 (AI Scan)", type="primary", use_container_width=True, disabled=not catalog_ready):
+                with st.spinner("강의시간표에서 교양/전공 과목을 불러옵니다..."), track("course_scan") as span:
+                    future = prefetch_candidates(major, grade, semester, wait=True)
+                    span.meta["prefetched"] = future.done()
+                    res = future.result()
+                    if res:
+                        st.session_state.candidate_ids = res; set_schedule([])
+                        st.session_state.candidates_version += 1
+                        st.rerun()
                     else: st.error("강의를 찾지 못했습니다.")
 
+        # [자동 생성] 필수 과목 + 학점 범위 + 선호 조건으로 충돌 없는 시간표 상위 N개
+        if st.session_state.candidate_ids:
+            with st.expander("🤖 자동 시간표 생성", expanded=st.session_state.schedule_job is not None):
+                g1, g2, g3 = st.columns(3)
+                min_cr, max_cr = g1.slider("학점 범위", 3, 24, (15, 21), key="gen_credits")
+                free_days = g2.multiselect("공강 요일", list(timeslots.GRID_DAYS), key="gen_free_days")
+                no_first = g3.checkbox("1교시 제외", key="gen_no_first")
+                if st.button("✨ 시간표 생성", use_container_width=True):
+                    st.session_state.schedule_job = scheduler.submit(
+                        COURSES.courses(st.session_state.candidate_ids), min_credits=min_cr, max_credits=max_cr,
+                        free_days=free_days, no_first_period=no_first)
+
+                job = st.session_state.schedule_job
+                if job is not None and not job.done():
+                    wait_for_schedule_job()
+                elif job is not None:
+                    result = job.result()
+                    if not result["schedules"]: st.warning("조건을 만족하는 시간표가 없습니다.")
+                    for i, sch in enumerate(result["schedules"]):
+                        r1, r2 = st.columns([0.85, 0.15])
+                        r1.markdown(f"**#{i+1}** · {sch['credits']}학점 · 점수 {sch['score']}  \n"
+                                    + ", ".join(c['name'] for c in sch['courses']))
+                        if r2.button("적용", key=f"apply_schedule_{i}"):
+                            set_schedule(sch['courses']); st.rerun()
+                    st.caption(f"탐색 {result['nodes']:,}개 노드 · {result['elapsed']*1000:.0f}ms"
+                               + ("" if result["complete"] else " (시간 예산 초과, 현재까지 최선)"))
+
         # [메인 빌더 UI] - 좌우 분할 및 Sticky 적용
-        if st.session_state.candidate_courses:
+        if st.session_state.candidate_ids:
             st.write("---")
             # 비율 조정
             col_left, col_right = st.columns([1.2, 1], gap="medium")
@@ -489,74 +813,73 @@ with st.container(border=True):
             # [좌측] 강의 리스트 (Ultra-Compact View)
             with col_left:
                 st.markdown("##### 📚 강의 목록")
-                tab1, tab2, tab3 = st.tabs(["🔥 전공필수", "🏫 전공선택", "🧩 교양/기타"])
-                
-                # [Ultra-Compact 렌더링 함수]
-                def draw_compact_list(course_list, key_prefix):
-                    added_ids = [c['name'] for c in st.session_state.my_schedule]
-                    
-                    # 헤더 대신 리스트로 바로 나열
-                    for c in course_list:
-                        if c['name'] in added_ids: continue
-                        
-                        # 슬림한 Row 스타일 HTML
-                        st.markdown(f"""
-                        <div class="course-row">
-                            <div class="cr-left">
-                                <span class="cr-title">{c['name']}</span>
-                                <div class="cr-meta">
-                                    <span>{c['credits']}학점</span>
-                                    <span>|</span>
-                                    <span>{c['professor']}</span>
-                                </div>
-                            </div>
-                            <div class="cr-right">
-                                <span class="cr-time">{', '.join(c['time_slots']) if c['time_slots'] else '-'}</span>
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
+                # 검색어 + 탭별 페이지 단위로 보이는 행만 위젯을 만든다 (재실행 비용 ∝ 화면에 보이는 행 수)
+                query = st.text_input("검색", placeholder="🔍 과목명/교수 검색", key="course_search", label_visibility="collapsed")
+                view = get_course_view(query)
+                candidate_ids = st.session_state.candidate_ids
+                tab1, tab2, tab3 = st.tabs([f"🔥 전공필수 {len(view['tabs']['must'])}", f"🏫 전공선택 {len(view['tabs']['maj'])}",
+                                            f"🧩 교양/기타 {len(view['tabs']['etc'])}"])
+
+                def draw_compact_list(tab):
+                    rows = view["tabs"][tab]
+                    if not rows: st.caption("해당하는 과목이 없습니다."); return
+                    pages = -(-len(rows) // ROWS_PER_PAGE)
+                    page = min(st.session_state.get(f"page_{tab}", 0), pages - 1)
+                    for i in rows[page * ROWS_PER_PAGE:(page + 1) * ROWS_PER_PAGE]:
+                        c, conflict = COURSES[candidate_ids[i]], bool(view["blocked"][i])
+                        st.markdown(timetable_view.course_row_html(c, conflict), unsafe_allow_html=True)
+
                         # 버튼을 Row 바로 아래 배치하지 않고, CSS Flex와 섞어쓰기 어려우므로
                         # 기능 버튼은 바로 아래 아주 얇게 배치 (Streamlit 한계 극복)
                         btn_col1, btn_col2 = st.columns([0.88, 0.12])
-                        if btn_col2.button("➕", key=f"add_{key_prefix}_{c['id']}"):
-                            cf, cfn = check_time_conflict(c, st.session_state.my_schedule)
+                        if btn_col2.button("➕", key=f"add_{tab}_{c['id']}", disabled=conflict):
+                            cf, cfn = check_time_conflict(c, my_schedule())
                             if cf: st.toast(f"충돌: {cfn}", icon="🚫")
-                            else: st.session_state.my_schedule.append(c); st.rerun()
-                        
-                        st.markdown("<hr style='margin: 0; border: none; border-bottom: 1px solid #f0f0f0;'>", unsafe_allow_html=True)
-                
-                # 분류
-                must = [c for c in st.session_state.candidate_courses if c.get('priority') == 'High']
-                maj = [c for c in st.session_state.candidate_courses if c.get('priority') == 'Medium']
-                etc = [c for c in st.session_state.candidate_courses if c not in must and c not in maj]
-
-                with tab1: draw_compact_list(must, "must")
-                with tab2: draw_compact_list(maj, "maj")
-                with tab3: draw_compact_list(etc, "etc")
+                            else:
+                                st.session_state.schedule_ids.append(c.index)
+                                st.session_state.schedule_mask |= c.slot_mask; st.rerun()
+
+                    if pages > 1:
+                        p1, p2, p3 = st.columns([0.2, 0.6, 0.2])
+                        if p1.button("◀", key=f"prev_{tab}", disabled=page == 0):
+                            st.session_state[f"page_{tab}"] = page - 1; st.rerun()
+                        p2.caption(f"{page + 1} / {pages} 페이지 · {len(rows)}개")
+                        if p3.button("▶", key=f"next_{tab}", disabled=page == pages - 1):
+                            st.session_state[f"page_{tab}"] = page + 1; st.rerun()
+
+                with tab1: draw_compact_list("must")
+                with tab2: draw_compact_list("maj")
+                with tab3: draw_compact_list("etc")
 
             # [우측] 내 시간표 (Sticky 고정됨)
             with col_right:
                 st.markdown("##### 🗓️ 내 시간표")
                 
-                total_cr = sum([c['credits'] for c in st.session_state.my_schedule])
+                schedule = my_schedule()
+                total_cr = sum([c['credits'] for c in schedule])
                 st.caption(f"신청 학점: {total_cr}학점")
                 
                 # 삭제 리스트 (작은 칩 형태)
-                if st.session_state.my_schedule:
+                if schedule:
                     cols = st.columns(3)
-                    for i, c in enumerate(st.session_state.my_schedule):
+                    for i, c in enumerate(schedule):
                         if cols[i%3].button(f"✕ {c['name']}", key=f"del_{i}"):
-                            st.session_state.my_schedule.pop(i); st.rerun()
+                            set_schedule(schedule[:i] + schedule[i+1:]); st.rerun()
                 
-                html_tt = render_interactive_timetable(st.session_state.my_schedule)
+                html_tt = render_interactive_timetable(schedule)
                 st.markdown(html_tt, unsafe_allow_html=True)
                 
                 c1, c2 = st.columns(2)
                 if c1.button("💾 저장", use_container_width=True, type="primary"):
-                    st.toast("저장되었습니다! (데모)", icon="✅")
+                    term = kb.resolve_term(kb.terms(RESOURCES.get("knowledge_base")), semester) or semester
+                    courses = [{k: c[k] for k in ("id", "name", "professor", "credits", "classification")}
+                               | {"time_slots": list(c["time_slots"])} for c in schedule]
+                    saved = fb_manager.save_data("timetables", term, {"major": major, "grade": grade, "semester": term,
+                                                                      "credits": total_cr, "courses": courses})
+                    if saved: st.toast("저장했습니다! 서버 기록에 실패하면 사이드바에 알려 드립니다.", icon="✅")
+                    else: st.warning("로그인 후 저장할 수 있습니다.")
                 if c2.button("🔄 초기화", use_container_width=True):
-                    st.session_state.my_schedule = []; st.rerun()
+                    set_schedule([]); st.rerun()
 
     elif st.session_state.current_menu == "📈 성적 진단":
         st.subheader("📈 성적 및 진로 진단")
@@ -0,0 +1,446 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import datetime
+import platform
+import tempfile
+import subprocess
+import pandas as pd
+import knowledge_base as kb
+import course_catalog
+import course_store
+import timeslots
+import timetable_view
+import extraction
+import fakes
+from retrieval import Retriever
+
+# -----------------------------------------------------------------------------
+# [오프라인 벤치마크] Gemini 키/Firestore 없이 주요 경로의 성능을 측정해 JSON 보고서로 남긴다
+# -----------------------------------------------------------------------------
+# python benchmark.py                      # 전체, bench_report.json
+# python benchmark.py --quick --suite conflict,json
+# python benchmark.py --baseline old.json  # p50이 기준보다 threshold 이상 느려지면 종료 코드 1
+#
+# 앱 수준 측정(list/ask/firestore)은 Streamlit AppTest로 app.py를 실제로 실행하며,
+# LLM/Firestore 클라이언트만 fakes의 결정적 대역으로 바꾼다. LLM 캐시/계측 DB는 임시 폴더를 쓴다.
+
+SUITES = ("kb", "catalog", "conflict", "timetable", "json", "list", "ask", "firestore")
+SIZES = (100, 1000, 10000, 50000)
+QUICK_SIZES = (100, 1000)
+MAJORS = ("전자공학과", "소프트웨어학부", "컴퓨터정보공학부", "정보융합학부")
+
+
+# [측정 도구]
+def timed(func, repeat=5, warmup=1):
+    for _ in range(warmup): func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def result(name, params, samples, **extra):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))]
+    return dict({"name": name, "params": params, "n": len(samples),
+                 "mean_ms": round(sum(samples) / len(samples), 3), "p50_ms": round(pick(50), 3),
+                 "p95_ms": round(pick(95), 3), "min_ms": round(samples[0], 3), "max_ms": round(samples[-1], 3)},
+                **extra)
+
+
+def skipped(name, params, reason):
+    return {"name": name, "params": params, "skipped": reason}
+
+
+# [합성 데이터]
+def synthetic_courses(n, seed=0):
+    """강의 카탈로그 행(dict) n개. 과목당 분반 3개, 전공 60% / 교양 40%, 일부 토요일·야간·시간미정."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        grade = rng.randint(1, 4)
+        day = "토" if rng.random() < 0.03 else rng.choice(timeslots.GRID_DAYS)
+        start = rng.randint(1, 11) if rng.random() < 0.05 else rng.randint(1, 8)
+        if rng.random() < 0.05: slots = []
+        elif rng.random() < 0.7: slots = [f"{day}{start}", f"{day}{start + 1}"]
+        else: slots = [f"{day}{start}", f"{rng.choice(timeslots.GRID_DAYS)}{rng.randint(1, 9)}"]
+        general = rng.random() < 0.4
+        classification = "교양" if general else rng.choice(("전필", "전선", "전선"))
+        rows.append({
+            "id": f"B{i // 1000000:03d}-{grade}-{(i // 100) % 10000:04d}-{i % 100:02d}",
+            "name": f"과목{i // 3}", "professor": f"교수{rng.randint(1, 500)}",
+            "credits": rng.choice((1, 2, 3, 3, 3)), "hours": 3, "time_slots": slots,
+            "classification": classification,
+            "college": "교양" if general else "전자정보공과대학",
+            "department": rng.choice(("인문", "사회", "과학")) if general else rng.choice(MAJORS),
+            "grade": grade, "semester": "2025-2", "note": "", "doc": "synthetic.pdf", "page": i // 40 + 1,
+        })
+    return rows
+
+
+def synthetic_catalog(n, seed=0):
+    catalog = pd.DataFrame(synthetic_courses(n, seed), columns=course_catalog.COLUMNS)
+    catalog["slot_mask"] = catalog["time_slots"].map(timeslots.encode_slots).astype(object)
+    return catalog
+
+
+def synthetic_candidates(n, seed=0):
+    """앱 세션에 들어가는 후보 dict 형태 (query_candidates 결과와 같은 키)."""
+    candidates = []
+    for row in synthetic_courses(n, seed):
+        priority = "Normal" if row["college"] == "교양" else "High" if row["classification"] == "전필" else "Medium"
+        candidates.append(dict(row, slot_mask=timeslots.encode_slots(row["time_slots"]), priority=priority,
+                               reason=f"{row['doc']} p.{row['page']}"))
+    return candidates
+
+
+_PDF_HEADER = ["학정번호", "과목명", "분반", "연계", "이수", "학점", "시수", "담당교수", "강의시간(요일,교시)", "강의유형"]
+_PDF_WIDTHS = [90, 80, 20, 20, 25, 20, 20, 45, 75, 35]
+
+
+def write_timetable_pdf(path, pages, rows_per_page=40, seed=0):
+    """강의시간표와 같은 구조(제목 + 선으로 그린 표)의 PDF. course_catalog.extract_courses로 파싱된다."""
+    import pymupdf
+    courses = iter(synthetic_courses(pages * rows_per_page, seed))
+    doc = pymupdf.open()
+    for p in range(pages):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text((40, 30), "2025학년도 2학기", fontname="korea", fontsize=8)
+        page.insert_text((40, 45), f"전자정보공과대학 {MAJORS[p % len(MAJORS)]} 강의시간표", fontname="korea", fontsize=9)
+        y = 55
+        for r in range(rows_per_page + 1):
+            if r == 0: cells = _PDF_HEADER
+            else:
+                c = next(courses)
+                cells = [c["id"], c["name"], "01", "", c["classification"], str(c["credits"]), "3", c["professor"],
+                         ",".join(c["time_slots"]), "이론"]
+            x = 40
+            for width, text in zip(_PDF_WIDTHS, cells):
+                page.draw_rect(pymupdf.Rect(x, y, x + width, y + 18), color=(0, 0, 0), width=0.5)
+                page.insert_text((x + 2, y + 12), text, fontname="korea", fontsize=6)
+                x += width
+            y += 18
+    doc.save(path)
+    doc.close()
+
+
+def write_text_pdf(path, pages, seed=0):
+    """수강신청 자료집처럼 문단 위주의 PDF."""
+    import pymupdf
+    rng = random.Random(seed)
+    words = ("졸업", "학점", "이수", "전공필수", "교양", "수강신청", "재수강", "성적", "학기", "휴학", "복학", "장학금",
+             "계절학기", "융합전공", "부전공", "교직", "영어강의", "온라인", "출석", "평가")
+    doc = pymupdf.open()
+    for p in range(pages):
+        page = doc.new_page(width=595, height=842)
+        text = f"제{p + 1}장 학사 안내\n" + "\n".join(
+            " ".join(rng.choice(words) for _ in range(12)) + "." for _ in range(40))
+        page.insert_textbox(pymupdf.Rect(40, 40, 555, 800), text, fontname="korea", fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+# [벤치마크 묶음]
+def bench_kb(tmp, quick):
+    """합성 PDF → 지식 베이스 빌드(콜드/무변경), 검색 인덱스, 강의 카탈로그 빌드/로딩."""
+    results = []
+    for docs, pages in ((2, 10),) if quick else ((2, 10), (6, 30)):
+        data_dir, kb_dir = os.path.join(tmp, f"pdf-{docs}x{pages}"), os.path.join(tmp, f"kb-{docs}x{pages}")
+        os.makedirs(data_dir, exist_ok=True)
+        for d in range(docs):
+            if d % 2: write_text_pdf(os.path.join(data_dir, f"자료집{d}.pdf"), pages, seed=d)
+            else: write_timetable_pdf(os.path.join(data_dir, f"{d} 강의시간표.pdf"), pages, seed=d)
+        params = {"docs": docs, "pages": pages}
+
+        def cold():
+            shutil.rmtree(kb_dir, ignore_errors=True)
+            kb.build_knowledge_base(data_dir, kb_dir, log=None)
+        results.append(result("kb_build_cold", params, timed(cold, repeat=2, warmup=0)))
+        results.append(result("kb_build_unchanged", params,
+                              timed(lambda: kb.build_knowledge_base(data_dir, kb_dir, log=None), repeat=3)))
+        results.append(result("kb_needs_rebuild", params, timed(lambda: kb.needs_rebuild(data_dir, kb_dir), repeat=10)))
+        results.append(result("retriever_build", params,
+                              timed(lambda: Retriever.from_knowledge_base(kb_dir), repeat=2, warmup=0)))
+
+        def catalog_cold():
+            shutil.rmtree(os.path.join(kb_dir, "courses"), ignore_errors=True)
+            course_catalog.build_catalog(data_dir=data_dir, kb_dir=kb_dir, log=None)
+        results.append(result("catalog_build_cold", params, timed(catalog_cold, repeat=2, warmup=0),
+                              courses=len(course_catalog.load_catalog(kb_dir))))
+        results.append(result("catalog_load", params, timed(lambda: course_catalog.load_catalog(kb_dir), repeat=5)))
+    return results
+
+
+def bench_catalog(sizes):
+    results = []
+    for n in sizes:
+        catalog = synthetic_catalog(n)
+        count = len(course_catalog.query_candidates(catalog, MAJORS[0], "1학년", "2학기"))
+        results.append(result("query_candidates", {"sections": n},
+                              timed(lambda: course_catalog.query_candidates(catalog, MAJORS[0], "1학년", "2학기")),
+                              candidates=count))
+    return results
+
+
+def bench_conflict(sizes):
+    results = []
+    for n in sizes:
+        courses = synthetic_candidates(n)
+        schedule = random.Random(1).sample(courses, 7)
+        per_call = [ms / n * 1000 for ms in timed(lambda: [timeslots.find_conflict(c, schedule) for c in courses])]
+        results.append(result("check_time_conflict", {"sections": n}, per_call, unit="us_per_call"))
+        masks = [c["slot_mask"] for c in courses]
+        schedule_mask = timeslots.sum_masks(schedule)
+        results.append(result("conflicts_with", {"sections": n},
+                              timed(lambda: timeslots.conflicts_with(masks, schedule_mask))))
+    return results
+
+
+def bench_timetable(sizes):
+    results = []
+    courses = synthetic_candidates(max(sizes))
+    rng = random.Random(2)
+    schedules = [rng.sample(courses, 7) for _ in range(50)]
+
+    def cold():
+        timetable_view.render_fingerprint.cache_clear()
+        timetable_view._row_html.cache_clear()
+        timetable_view._cell_html.cache_clear()
+        for s in schedules: timetable_view.render_timetable(s)
+    results.append(result("render_timetable_cold", {"schedules": len(schedules)},
+                          [ms / len(schedules) for ms in timed(cold)]))
+    results.append(result("render_timetable_cached", {"schedules": len(schedules)},
+                          [ms / len(schedules) for ms in timed(lambda: [timetable_view.render_timetable(s) for s in schedules])]))
+
+    def add_one():
+        # 한 과목만 다른 시간표: 바뀐 행만 새로 만든다
+        timetable_view.render_fingerprint.cache_clear()
+        for s in schedules: timetable_view.render_timetable(s + [courses[0]])
+    results.append(result("render_timetable_add_course", {"schedules": len(schedules)},
+                          [ms / len(schedules) for ms in timed(add_one)]))
+    return results
+
+
+def bench_json(sizes):
+    results = []
+    for n in sizes:
+        courses = [{k: c[k] for k in ("id", "name", "professor", "credits", "time_slots", "classification", "priority",
+                                      "reason")} for c in synthetic_candidates(n)]
+        response = "```json\n" + json.dumps(courses, ensure_ascii=False) + "\n```"
+        results.append(result("parse_course_json", {"courses": n, "bytes": len(response.encode())},
+                              timed(lambda: extraction.parse_course_json(response))))
+        # 청크 4개로 나뉜 응답의 병합
+        chunks = [courses[i::4] for i in range(4)]
+        results.append(result("merge_courses", {"courses": n}, timed(lambda: extraction.merge_courses(chunks))))
+    return results
+
+
+# [앱 수준 측정] AppTest + 가짜 클라이언트
+def install_fakes(llm, db):
+    import clients
+    clients.make_gemini = lambda api_key, **kwargs: llm
+    clients.make_firestore = lambda service_account: db
+
+
+def app_test():
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.abspath("app.py"), default_timeout=600)
+    at.secrets["GOOGLE_API_KEY"] = "offline-benchmark"
+    at.secrets["firebase_service_account"] = {"type": "service_account"}
+    return at
+
+
+def wait_ready(at, timeout=600):
+    """지식인 입력창이 활성화될 때까지 (백그라운드 로딩 완료) 다시 실행."""
+    start = time.time()
+    while True:
+        at.run()
+        if at.chat_input and not at.chat_input[0].disabled: return time.time() - start
+        if time.time() - start > timeout: raise TimeoutError("knowledge base did not become ready")
+        time.sleep(0.2)
+
+
+def bench_list(sizes):
+    results = []
+    at = app_test()
+    wait_ready(at)
+    at.radio(key="menu_radio").set_value("📅 스마트 시간표").run()
+    for n in sizes:
+        params = {"candidates": n}
+        at.session_state["candidate_ids"] = course_store.STORE.intern_list(synthetic_candidates(n))
+        at.session_state["candidates_version"] = n
+        at.session_state["schedule_ids"] = course_store.STORE.index_array([])
+        at.session_state["schedule_mask"] = 0
+        start = time.perf_counter()
+        at.run()
+        results.append(result("list_first_render", params, [(time.perf_counter() - start) * 1000],
+                              widgets=len(at.button)))
+        results.append(result("list_rerun", params, timed(at.run, repeat=5)))
+        add = next(b for b in at.button if b.key and b.key.startswith("add_") and not b.disabled)
+        start = time.perf_counter()
+        add.click().run()
+        results.append(result("list_add_course", params, [(time.perf_counter() - start) * 1000]))
+    return results
+
+
+def bench_ask(llm, questions):
+    import telemetry
+    at = app_test()
+    ready_s = wait_ready(at)
+    results = [result("app_ready", {}, [ready_s * 1000])]
+    params = {"first_token_latency_s": llm.first_token_latency, "tokens_per_second": llm.tokens_per_second}
+
+    def ask(question):
+        at.session_state["chat_history"] = []
+        at.chat_input[0].set_value(question).run()
+    cold = timed(lambda: ask(f"벤치마크 질문 {time.perf_counter_ns()} 졸업 학점은?"), repeat=questions, warmup=0)
+    results.append(result("ask_ai_cold", params, cold))
+    results.append(result("ask_ai_cached", params, timed(lambda: ask("벤치마크 질문 캐시 졸업 학점은?"), repeat=questions)))
+
+    summary = {s["feature"]: s for s in telemetry.TelemetryStore().summary()}
+    stream = summary.get("ask_ai_stream")
+    if stream:
+        # 앱 계측(telemetry)이 기록한 스트리밍 지표: 첫 토큰까지 시간과 토큰 수
+        results.append(dict({"name": "ask_ai_stream_telemetry", "params": params},
+                            **{k: stream[k] for k in ("calls", "p50_ms", "p95_ms", "ttft_p50_ms", "prompt_tokens",
+                                                      "response_tokens")}))
+    return results
+
+
+def bench_firestore(db, repeat):
+    at = app_test()
+    wait_ready(at)
+
+    def submit(mode, email):
+        at.sidebar.radio[0].set_value(mode)
+        at.sidebar.text_input[0].set_value(email)
+        at.sidebar.text_input[1].set_value("pw")
+        next(b for b in at.sidebar.button if b.label == "Go").click().run()
+
+    submit("회원가입", "bench@kw.ac.kr")
+    at.sidebar.button[0].click().run()  # Logout
+
+    def login():
+        submit("로그인", "bench@kw.ac.kr")
+        if not at.session_state["user"]: raise RuntimeError("fake firestore login failed")
+        next(b for b in at.sidebar.button if b.label == "Logout").click().run()
+    return [result("firestore_login_logout", {"latency_s": db.latency}, timed(login, repeat=repeat))]
+
+
+def bench_write_behind(latency=0.02, writes=200, docs=20):
+    """지연 쓰기: put() 지연(요청 스레드가 기다리는 시간)과 flush까지 걸리는 시간. 동작 확인은 tests/test_persistence.py."""
+    import persistence
+    db = fakes.FakeFirestore(latency=latency)
+    store = persistence.WriteBehindStore(lambda: db, flush_interval=0.02)
+    samples = []
+    for i in range(writes):
+        start = time.perf_counter()
+        store.put("bench", "chats", f"c{i % docs}", {"n": i, "updated_at": persistence.now()})
+        samples.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    flushed = store.flush(timeout=30)
+    flush_ms = (time.perf_counter() - start) * 1000
+    return [result("firestore_write_behind_put", {"writes": writes, "docs": docs, "latency_s": latency}, samples,
+                   flush_ms=round(flush_ms, 1), flushed=flushed, commits=db.commits)]
+
+
+# [보고서]
+def git_revision():
+    try: return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError: return None
+
+
+def _key(r):
+    return r["name"], json.dumps(r["params"], sort_keys=True)
+
+
+def compare(results, baseline_path, threshold):
+    """기준 보고서 대비 p50이 threshold 비율 이상 (그리고 0.5ms 이상) 느려진 항목."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {_key(r): r for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        b = baseline.get(_key(r))
+        if not b or "p50_ms" not in r or "p50_ms" not in b or b["p50_ms"] is None: continue
+        if r["p50_ms"] > b["p50_ms"] * (1 + threshold) and r["p50_ms"] - b["p50_ms"] > 0.5:
+            regressions.append({"name": r["name"], "params": r["params"], "baseline_p50_ms": b["p50_ms"],
+                                "p50_ms": r["p50_ms"], "ratio": round(r["p50_ms"] / max(b["p50_ms"], 1e-9), 2)})
+    return regressions
+
+
+def print_table(results):
+    print(f"{'항목':<30} {'조건':<40} {'p50(ms)':>10} {'p95(ms)':>10}")
+    for r in results:
+        params = ", ".join(f"{k}={v}" for k, v in r["params"].items())
+        if r.get("unit"): params += f" [{r['unit']}]"
+        if "p50_ms" not in r or r["p50_ms"] is None: print(f"{r['name']:<30} {params:<40} {'건너뜀':>10}  {r.get('skipped') or ''}")
+        else: print(f"{r['name']:<30} {params:<40} {r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f}")
+
+
+def run(suites, quick, output, baseline=None, threshold=0.2, llm_latency=0.3, llm_tps=200.0, questions=5):
+    tmp = tempfile.mkdtemp(prefix="kw-bench-")
+    # 실제 캐시/계측 DB를 건드리지 않고, 앱 자체 속도 제한(분당 요청)이 측정을 가리지 않게 한다
+    os.environ["LLM_CACHE_PATH"] = os.path.join(tmp, "llm_cache.sqlite3")
+    os.environ["TELEMETRY_PATH"] = os.path.join(tmp, "telemetry.sqlite3")
+    os.environ.setdefault("GEMINI_RPM", "1000000")
+    sizes = QUICK_SIZES if quick else SIZES
+    llm = fakes.FakeLLM(first_token_latency=llm_latency, tokens_per_second=llm_tps)
+    db = fakes.FakeFirestore(latency=0.02)
+    install_fakes(llm, db)
+
+    started = time.time()
+    results = []
+    try:
+        for suite in suites:
+            print(f"▶ {suite}")
+            if suite == "kb": results += bench_kb(tmp, quick)
+            elif suite == "catalog": results += bench_catalog(sizes)
+            elif suite == "conflict": results += bench_conflict(sizes)
+            elif suite == "timetable": results += bench_timetable(sizes)
+            elif suite == "json": results += bench_json(sizes)
+            elif suite == "list": results += bench_list(sizes)
+            elif suite == "ask": results += bench_ask(llm, questions)
+            elif suite == "firestore": results += bench_firestore(db, questions) + bench_write_behind()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    report = {
+        "meta": {"created_at": datetime.datetime.now().isoformat(timespec="seconds"), "git": git_revision(),
+                 "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+                 "suites": list(suites), "quick": quick, "seconds": round(time.time() - started, 1)},
+        "results": results,
+    }
+    if baseline: report["regressions"] = compare(results, baseline, threshold)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print_table(results)
+    print(f"\n📄 {output} ({report['meta']['seconds']}초)")
+    for r in report.get("regressions", []):
+        print(f"⚠️ 성능 저하: {r['name']} {r['params']} {r['baseline_p50_ms']} → {r['p50_ms']}ms (x{r['ratio']})")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="오프라인 성능 벤치마크 (가짜 LLM/Firestore, 합성 카탈로그/PDF)")
+    parser.add_argument("--suite", default=",".join(SUITES), help=f"쉼표 구분 ({', '.join(SUITES)})")
+    parser.add_argument("--quick", action="store_true", help=f"작은 크기만 ({', '.join(map(str, QUICK_SIZES))})")
+    parser.add_argument("-o", "--output", default="bench_report.json")
+    parser.add_argument("--baseline", help="비교할 이전 보고서 (JSON)")
+    parser.add_argument("--threshold", type=float, default=0.2, help="허용 저하 비율 (기본 0.2 = 20%%)")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="가짜 LLM 첫 토큰 지연(초)")
+    parser.add_argument("--llm-tps", type=float, default=200.0, help="가짜 LLM 초당 토큰 수")
+    parser.add_argument("--questions", type=int, default=5, help="지식인/로그인 반복 횟수")
+    args = parser.parse_args()
+    suites = [s.strip() for s in args.suite.split(",") if s.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown: parser.error(f"알 수 없는 suite: {', '.join(sorted(unknown))}")
+    report = run(suites, args.quick, args.output, args.baseline, args.threshold, args.llm_latency, args.llm_tps,
+                 args.questions)
+    sys.exit(1 if report.get("regressions") else 0)
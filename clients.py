@@ -0,0 +1,123 @@
+import os
+import time
+import threading
+
+# -----------------------------------------------------------------------------
+# [공유 클라이언트 레지스트리] LLM/Firestore 클라이언트를 프로세스당 한 번만 생성
+# -----------------------------------------------------------------------------
+# 스크립트는 상호작용마다 처음부터 다시 실행되므로, 클라이언트 생성과 무거운 import
+# (langchain_google_genai, firebase_admin)는 여기 팩토리 안으로 미룬다.
+# - get(name)  : 처음 요청될 때 한 번 생성 (같은 이름은 동시에 여러 번 만들지 않음)
+# - warmup()   : 서버 시작 시 백그라운드 스레드에서 미리 생성 → 첫 화면은 기다리지 않는다
+# - health()   : 생성 상태/소요 시간, 선택적으로 헬스 체크 결과
+# 생성에 실패하면 그 오류를 RETRY_AFTER초 동안 기억해 두고 팩토리를 다시 부르지 않는다
+# (자격 증명이 잘못된 Firestore를 rerun마다 다시 만들며 기다리지 않도록).
+# app.py는 같은 레지스트리로 지식 베이스/카탈로그 같은 문서 기반 리소스도 백그라운드 로딩한다 (ready()로 대기 없이 확인).
+
+GEMINI_MODEL = "gemini-2.5-flash-preview-09-2025"
+RETRY_AFTER = float(os.environ.get("CLIENT_RETRY_AFTER", "30"))
+
+
+def make_gemini(api_key, model=GEMINI_MODEL, temperature=0, timeout=None):
+    # 재시도는 rate_limit이 담당하므로 클라이언트 자체 재시도는 끈다
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(model=model, google_api_key=api_key, temperature=temperature,
+                                  timeout=timeout, max_retries=0)
+
+
+def make_firestore(service_account):
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app(credentials.Certificate(dict(service_account)))
+    return firestore.client()
+
+
+def check_firestore(db):
+    db.collection('users').limit(1).get()
+
+
+class ClientRegistry:
+    def __init__(self, retry_after=RETRY_AFTER):
+        self.retry_after = retry_after
+        self._entries = {}
+        self.lock = threading.Lock()
+
+    def register(self, name, factory, check=None):
+        with self.lock:
+            self._entries[name] = {"factory": factory, "check": check, "client": None, "state": "cold",
+                                   "error": None, "build_ms": None, "lock": threading.Lock(),
+                                   "failure": None, "retry_at": 0.0}
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def get(self, name):
+        entry = self._entries[name]
+        if entry["client"] is not None: return entry["client"]
+        with entry["lock"]:
+            if entry["client"] is None:
+                # 최근에 실패했으면 다시 만들지 않고 같은 오류를 낸다
+                if entry["failure"] is not None and time.monotonic() < entry["retry_at"]:
+                    raise entry["failure"].with_traceback(None)
+                entry["state"] = "building"
+                start = time.perf_counter()
+                try:
+                    entry["client"] = entry["factory"]()
+                except Exception as e:
+                    entry["state"], entry["error"] = "error", f"{type(e).__name__}: {e}"
+                    entry["failure"], entry["retry_at"] = e, time.monotonic() + self.retry_after
+                    raise
+                finally:
+                    entry["build_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                entry["state"], entry["error"], entry["failure"] = "ready", None, None
+        return entry["client"]
+
+    def ready(self, name):
+        """기다리지 않고 생성 완료 여부만 확인."""
+        entry = self._entries.get(name)
+        return entry is not None and entry["client"] is not None
+
+    def error(self, name):
+        """마지막 생성이 실패했으면 그 오류 (아직 만드는 중이거나 성공했으면 None)."""
+        entry = self._entries.get(name)
+        return entry["error"] if entry is not None and entry["state"] == "error" else None
+
+    def retry(self, name):
+        """실패 기억을 지우고 백그라운드에서 다시 만든다 (함께 실패한 의존 리소스도 다시 시도)."""
+        for entry in self._entries.values():
+            if entry["state"] == "error": entry["retry_at"] = 0.0
+        self._entries[name]["state"] = "cold"
+        return self.warmup([name])
+
+    def get_or_none(self, name):
+        """등록되지 않았거나 생성에 실패하면 None."""
+        if name not in self._entries: return None
+        try: return self.get(name)
+        except Exception: return None
+
+    def warmup(self, names=None):
+        """백그라운드 스레드에서 클라이언트를 미리 만든다. 실패는 health()에 남는다."""
+        names = list(names or self._entries)
+        def _run():
+            for name in names: self.get_or_none(name)
+        thread = threading.Thread(target=_run, name="client-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def health(self, run_checks=False):
+        report = {}
+        for name, entry in list(self._entries.items()):
+            status = {"state": entry["state"], "build_ms": entry["build_ms"], "error": entry["error"]}
+            if entry["failure"] is not None:
+                status["retry_in_s"] = round(max(0.0, entry["retry_at"] - time.monotonic()), 1)
+            if run_checks and entry["client"] is not None and entry["check"] is not None:
+                start = time.perf_counter()
+                try:
+                    entry["check"](entry["client"])
+                    status["check"] = "ok"
+                except Exception as e:
+                    status["check"] = f"{type(e).__name__}: {str(e)[:200]}"
+                status["check_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            report[name] = status
+        return report
@@ -0,0 +1,279 @@
+import os
+import re
+import json
+import glob
+import collections
+import pandas as pd
+import knowledge_base as kb
+import timeslots
+
+# -----------------------------------------------------------------------------
+# [강의 카탈로그] 강의시간표 PDF → 정형 테이블 (PyMuPDF 표 추출, LLM 없음)
+# -----------------------------------------------------------------------------
+# 빌드 시 문서 해시별로 data/kb/courses/<sha256>-p<버전>.parquet 을 만들고,
+# 앱에서는 이를 합쳐 DataFrame 하나로 조회한다 (과목 후보 조회 = 로컬 쿼리).
+# 시간표 화면에서 고를 수 있는 학과 × 학년 × 학기 조합(32개)의 후보 목록은 generate.py에서 미리 만들어
+# data/kb/candidates.json 하나에 담는다 (강좌 표 1개 + 조합별 행 번호/우선순위).
+
+PARSER_VERSION = 1
+CANDIDATES_FORMAT = 1
+MAJORS = ("전자공학과", "소프트웨어학부", "컴퓨터정보공학부", "정보융합학부")
+GRADES = ("1학년", "2학년", "3학년", "4학년")
+SEMESTERS = ("1학기", "2학기")
+COLUMNS = ["id", "name", "professor", "credits", "hours", "time_slots", "classification",
+           "college", "department", "grade", "semester", "note", "doc", "page"]
+
+# 표 헤더 → 컬럼 (헤더 셀의 앞부분으로 매칭)
+_HEADER_MAP = {"학정번호": "id", "과목명": "name", "이수": "classification", "학점": "credits",
+               "시수": "hours", "담당교수": "professor", "강의시간": "time", "강의유형": "note"}
+_COURSE_ID = re.compile(r"^[0-9A-Z]{4}-(\d)-\d{4}-\d{2}$")
+_TERM = re.compile(r"(\d{4})학년도\s*(\d)학기")
+_DEPT_TITLE = re.compile(r"^(\S+대학)\s+(\S+)\s+강의시간표$")
+_AREA = re.compile(r"-\s*(.+?)\s*영역|\((.+?)영역\)")
+_DAYS = "월화수목금토일"
+
+
+def is_timetable(filename):
+    return "강의시간표" in filename
+
+
+def _catalog_path(kb_dir, sha):
+    return os.path.join(kb_dir, "courses", f"{sha}-p{PARSER_VERSION}.parquet")
+
+
+def parse_time_slots(text):
+    """'월2,수1' / '수3,4' / '월7,8,9' → ['월2', '수1'] 형태. 요일이 생략된 교시는 앞 요일을 따른다."""
+    slots, day = [], None
+    for token in re.sub(r"\s+", "", text or "").split(","):
+        m = re.match(rf"^([{_DAYS}])?(\d+)$", token)
+        if not m: continue
+        day = m.group(1) or day
+        if day: slots.append(f"{day}{int(m.group(2))}")
+    return slots
+
+
+def parse_title(title):
+    """페이지 제목 → (college, department)."""
+    m = _DEPT_TITLE.match(title)
+    if m: return m.group(1), m.group(2)
+    if "교양" in title:
+        area = _AREA.search(title)
+        return "교양", (area.group(1) or area.group(2)).strip() if area else "교양"
+    return "기타", title.replace("강의시간표", "").strip()
+
+
+def _to_int(value):
+    m = re.match(r"\d+", (value or "").strip())
+    return int(m.group()) if m else 0
+
+
+def extract_courses(pdf_path):
+    """강의시간표 PDF 한 개를 파싱해 과목 행(dict) 목록을 돌려준다."""
+    import pymupdf
+
+    rows, title = [], None
+    doc_name = os.path.basename(pdf_path)
+    with pymupdf.open(pdf_path) as doc:
+        terms = collections.Counter(m for page in doc for m in _TERM.findall(page.get_text()))
+        semester = "-".join(terms.most_common(1)[0][0]) if terms else ""
+
+        for page in doc:
+            # 제목 블록: (y 좌표, 텍스트). 표 바로 위의 제목이 그 표의 소속 학과
+            titles = sorted(
+                (b[3], line.strip())
+                for b in page.get_text("blocks")
+                for line in b[4].splitlines()
+                if line.strip().endswith("강의시간표")
+            )
+            for table in page.find_tables().tables:
+                above = [t for y, t in titles if y <= table.bbox[1] + 1]
+                if above: title = above[-1]
+                elif title is None and titles: title = titles[0][1]
+                college, department = parse_title(title or "")
+
+                cells = table.extract()
+                if not cells: continue
+                columns = {}
+                for i, header in enumerate(cells[0]):
+                    header = (header or "").replace("\n", "")
+                    for prefix, field in _HEADER_MAP.items():
+                        if header.startswith(prefix) and field not in columns: columns[field] = i
+                if "id" not in columns or "name" not in columns: continue
+
+                for cell_row in cells[1:]:
+                    get = lambda f: (cell_row[columns[f]] or "").strip() if f in columns else ""
+                    course_id = get("id").replace("\n", "")
+                    m = _COURSE_ID.match(course_id)
+                    if not m: continue
+                    rows.append({
+                        "id": course_id,
+                        "name": get("name").replace("\n", ""),
+                        "professor": get("professor").replace("\n", " "),
+                        "credits": _to_int(get("credits")),
+                        "hours": _to_int(get("hours")),
+                        "time_slots": parse_time_slots(get("time")),
+                        "classification": get("classification").replace("\n", ""),
+                        "college": college,
+                        "department": department,
+                        "grade": int(m.group(1)),
+                        "semester": semester,
+                        "note": get("note").replace("\n", " "),
+                        "doc": doc_name,
+                        "page": page.number + 1,
+                    })
+    return rows
+
+
+def build_catalog(manifest=None, data_dir=kb.DATA_DIR, kb_dir=kb.KB_DIR, log=print):
+    """manifest의 강의시간표 문서마다 parquet을 만든다. 이미 있는 문서(같은 해시/파서 버전)는 건너뜀."""
+    log = log or (lambda *a, **k: None)
+    manifest = manifest or kb.load_manifest(kb_dir)
+    if manifest is None: return []
+    os.makedirs(os.path.join(kb_dir, "courses"), exist_ok=True)
+
+    live = set()
+    for doc in manifest["documents"]:
+        if not is_timetable(doc["file"]): continue
+        path = _catalog_path(kb_dir, doc["sha256"])
+        live.add(path)
+        if os.path.exists(path): continue
+        try:
+            log(f"   - 강의 추출 중: {doc['file']}")
+            rows = extract_courses(os.path.join(data_dir, doc["file"]))
+        except Exception as e:
+            log(f"⚠️ 강의 추출 실패 ({doc['file']}): {e}")
+            live.discard(path)
+            continue
+        pd.DataFrame(rows, columns=COLUMNS).to_parquet(f"{path}.tmp", index=False)
+        os.replace(f"{path}.tmp", path)
+        log(f"     {len(rows)}개 강좌")
+
+    for path in glob.glob(os.path.join(kb_dir, "courses", "*.parquet")):
+        if path not in live: os.remove(path)
+    return sorted(live)
+
+
+def load_catalog(kb_dir=kb.KB_DIR):
+    manifest = kb.load_manifest(kb_dir)
+    paths = [] if manifest is None else [
+        _catalog_path(kb_dir, d["sha256"]) for d in manifest["documents"] if is_timetable(d["file"])
+    ]
+    frames = [pd.read_parquet(p) for p in paths if os.path.exists(p)]
+    if not frames: return pd.DataFrame(columns=COLUMNS + ["slot_mask"])
+    catalog = pd.concat(frames, ignore_index=True)
+    catalog["time_slots"] = catalog["time_slots"].map(list)
+    # 슬롯 비트마스크는 로딩 시 한 번만 계산 (45비트 기본 격자 + 격자 밖 상위 비트)
+    catalog["slot_mask"] = catalog["time_slots"].map(timeslots.encode_slots).astype(object)
+    return catalog
+
+
+def resolve_semester(catalog, semester):
+    """'2학기' → 카탈로그에 있는 가장 최근 '2025-2'."""
+    return kb.resolve_term(catalog["semester"].unique(), semester)
+
+
+def query_candidates(catalog, major, grade, semester):
+    """학과/학년/학기 후보 과목 목록 (get_course_candidates_json 과 같은 dict 형태).
+
+    - 학과 전공과목 + 소속 단과대 공통과목 (대상 학년 일치): 전필 → High, 그 외 → Medium
+    - 교양 과목: 학년 제한 없이 전부 → Normal
+    """
+    if catalog.empty: return []
+    term = resolve_semester(catalog, semester)
+    if term is None: return []
+    target_grade = _to_int(grade)
+    df = catalog[catalog["semester"] == term]
+
+    colleges = df.loc[df["department"] == major, "college"].unique()
+    major_mask = ((df["department"] == major) | (df["college"].isin(colleges) & (df["department"] == "공통"))) \
+        & (df["grade"] == target_grade)
+    general_mask = df["college"] == "교양"
+
+    result = []
+    for priority, part in (("major", df[major_mask]), ("Normal", df[general_mask])):
+        for row in part.itertuples(index=False):
+            if priority == "major": p = "High" if row.classification == "전필" else "Medium"
+            else: p = "Normal"
+            result.append({
+                "id": row.id, "name": row.name, "professor": row.professor, "credits": int(row.credits),
+                "time_slots": list(row.time_slots), "slot_mask": row.slot_mask,
+                "classification": row.classification,
+                "department": row.department, "grade": int(row.grade), "semester": row.semester,
+                "priority": p, "reason": f"{row.doc} p.{row.page}",
+            })
+    return result
+
+
+def validate_candidates(courses):
+    """학정번호/과목명이 없는 행은 버리고, 같은 학정번호는 먼저 나온 것(전공 > 교양)만 남긴다."""
+    seen, valid = set(), []
+    for course in courses:
+        if not course.get("name") or not _COURSE_ID.match(str(course.get("id", ""))): continue
+        if course["id"] in seen: continue
+        seen.add(course["id"]); valid.append(course)
+    return valid
+
+
+def _candidates_path(kb_dir):
+    return os.path.join(kb_dir, "candidates.json")
+
+
+def candidate_key(major, grade, semester):
+    return f"{major}/{grade}/{semester}"
+
+
+def candidate_version(manifest, term):
+    """후보 목록이 기준으로 삼은 학기 파티션 + 파서 버전. 다르면 미리 만든 목록은 낡은 것."""
+    return f"p{PARSER_VERSION}/{kb.partition_version(manifest, [term])}"
+
+
+_PRIORITY_CODES = {"High": "H", "Medium": "M", "Normal": "N"}
+_STORED = ("id", "name", "professor", "credits", "time_slots", "classification", "department", "grade",
+           "semester", "reason")
+
+
+def build_candidate_lists(manifest=None, kb_dir=kb.KB_DIR, log=print):
+    """모든 학과 × 학년 × 학기 조합의 후보 목록을 검증해 candidates.json에 저장. 빈 조합은 빼고 기록한다
+    (앱에서 그 조합만 즉석 조회/AI 추출로 처리)."""
+    log = log or (lambda *a, **k: None)
+    manifest = manifest or kb.load_manifest(kb_dir)
+    catalog = load_catalog(kb_dir)
+    table, positions, lists, missing = [], {}, {}, []
+    for major in MAJORS:
+        for grade in GRADES:
+            for semester in SEMESTERS:
+                key = candidate_key(major, grade, semester)
+                term = resolve_semester(catalog, semester) if not catalog.empty else None
+                courses = validate_candidates(query_candidates(catalog, major, grade, semester))
+                if not courses:
+                    missing.append(key); continue
+                rows = []
+                for c in courses:
+                    record = tuple(c[f] if f != "time_slots" else ",".join(c[f]) for f in _STORED)
+                    if record not in positions: positions[record] = len(table); table.append(record)
+                    rows.append(positions[record])
+                lists[key] = {"term": term, "version": candidate_version(manifest, term), "rows": rows,
+                              "priority": "".join(_PRIORITY_CODES[c["priority"]] for c in courses)}
+
+    data = {"format": CANDIDATES_FORMAT, "kb_version": (manifest or {}).get("kb_version", ""),
+            "fields": list(_STORED), "courses": table, "lists": lists}
+    path = _candidates_path(kb_dir)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f: json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(f"{path}.tmp", path)
+    log(f"   후보 목록 {len(lists)}개 조합, 강좌 {len(table)}개" + (f" (없음: {', '.join(missing)})" if missing else ""))
+    return lists
+
+
+def load_candidate_lists(kb_dir=kb.KB_DIR):
+    """candidates.json → {조합 키: {"term", "version", "courses": [dict]}}. 없거나 형식이 다르면 {}."""
+    try:
+        with open(_candidates_path(kb_dir), encoding="utf-8") as f: data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("format") != CANDIDATES_FORMAT: return {}
+    priorities = {code: name for name, code in _PRIORITY_CODES.items()}
+    table = [dict(zip(data["fields"], record)) for record in data["courses"]]
+    for course in table: course["time_slots"] = [s for s in course["time_slots"].split(",") if s]
+    return {key: {"term": entry["term"], "version": entry["version"],
+                  "courses": [dict(table[i], priority=priorities[p]) for i, p in zip(entry["rows"], entry["priority"])]}
+            for key, entry in data["lists"].items()}
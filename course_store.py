@@ -0,0 +1,178 @@
+import os
+import array
+import weakref
+import threading
+import collections
+import numpy as np
+import timeslots
+
+# -----------------------------------------------------------------------------
+# [공유 강의 저장소] 프로세스당 하나의 불변 강좌 테이블, 세션은 정수 인덱스만 보관
+# -----------------------------------------------------------------------------
+# - Course    : __slots__ 레코드. c['name'], c.get('priority')처럼 dict와 같은 방식으로 읽을 수 있어
+#               시간표/스케줄러 코드는 그대로 쓰고, 만든 뒤에는 바꿀 수 없다.
+# - intern()  : 같은 내용의 강좌(카탈로그 행이든 AI 추출 결과든)는 한 번만 저장하고 인덱스를 돌려준다.
+#               추가만 하므로 한 번 받은 인덱스는 프로세스가 끝날 때까지 유효하다.
+# - intern_list(): 내용이 같은 후보 목록은 같은 array 객체를 돌려준다 → 같은 조건으로 불러온 세션들이 공유.
+# - 시간 마스크는 uint64 두 워드 배열로도 보관해 세션별 충돌 표시를 인덱스 벡터 연산으로 계산한다.
+# - AI 추출 결과는 호출마다 내용이 조금씩 달라 계속 쌓이므로, 강좌 수가 max_courses를 넘으면 collect()가
+#   세션/리소스가 들고 있는 인덱스 배열(intern_list/index_array로 받은 것, 약한 참조로 추적)에 없는 강좌를
+#   비우고 그 자리를 재사용한다. 그래서 인덱스는 이 두 함수가 돌려준 배열에 담아 두어야 유효하다.
+# 프로세스 전체에서 STORE 하나를 쓴다 (app.py, benchmark.py가 같은 인덱스를 공유).
+
+FIELDS = ("id", "name", "professor", "credits", "time_slots", "slot_mask", "classification",
+          "department", "grade", "semester", "priority", "reason")
+MAX_SHARED_LISTS = 512
+MAX_COURSES = int(os.environ.get("COURSE_STORE_MAX", "50000"))
+_WORD = (1 << 64) - 1
+
+
+class Course:
+    __slots__ = FIELDS + ("index", "__weakref__")
+
+    def __init__(self, index, fields):
+        for name in FIELDS: object.__setattr__(self, name, fields[name])
+        object.__setattr__(self, "index", index)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Course is immutable")
+
+    def __getitem__(self, key):
+        try: return getattr(self, key)
+        except AttributeError: raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in FIELDS}
+
+    def __repr__(self):
+        return f"Course({self.index}, {self.id!r}, {self.name!r})"
+
+
+def _normalize(course):
+    slots = tuple(s for s in course.get("time_slots") or () if isinstance(s, str))
+    return {
+        "id": str(course.get("id") or ""), "name": str(course.get("name") or ""),
+        "professor": str(course.get("professor") or ""), "credits": int(course.get("credits") or 0),
+        "time_slots": slots, "slot_mask": timeslots.encode_slots(slots),
+        "classification": str(course.get("classification") or ""), "department": str(course.get("department") or ""),
+        "grade": int(course.get("grade") or 0), "semester": str(course.get("semester") or ""),
+        "priority": course.get("priority") or "Normal", "reason": str(course.get("reason") or ""),
+    }
+
+
+def _key(fields):
+    return tuple(fields[name] for name in FIELDS)
+
+
+class CourseStore:
+    def __init__(self, max_lists=MAX_SHARED_LISTS, max_courses=MAX_COURSES):
+        self._courses = []  # 비운 자리는 None (free 목록에서 재사용)
+        self._free = []
+        self._by_key = {}
+        self._lo, self._hi = array.array("Q"), array.array("Q")
+        self._mask_arrays = (None, np.zeros(0, np.uint64), np.zeros(0, np.uint64))
+        self._version = 0
+        self._lists = collections.OrderedDict()
+        self._arrays = []  # 내보낸 인덱스 배열의 약한 참조
+        self.max_lists, self.max_courses = max_lists, max_courses
+        self._collect_at = max_courses
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._courses) - len(self._free)
+
+    def __getitem__(self, index):
+        return self._courses[index]
+
+    def intern(self, course):
+        """강좌 → 인덱스. 반환값은 intern_list/index_array 배열에 담기 전까지는 collect()로 비워질 수 있다."""
+        if isinstance(course, Course):
+            if course.index < len(self._courses) and self._courses[course.index] is course: return course.index
+            course = course.to_dict()  # 비워진 뒤 남아 있던 레코드 → 내용으로 다시 등록
+        fields = _normalize(course)
+        key = _key(fields)
+        index = self._by_key.get(key)
+        if index is not None: return index
+        with self.lock:
+            index = self._by_key.get(key)
+            if index is None:
+                mask = fields["slot_mask"]
+                if self._free:
+                    index = self._free.pop()
+                    self._courses[index] = Course(index, fields)
+                    self._lo[index], self._hi[index] = mask & _WORD, mask >> 64
+                else:
+                    index = len(self._courses)
+                    self._courses.append(Course(index, fields))
+                    self._lo.append(mask & _WORD); self._hi.append(mask >> 64)
+                self._by_key[key] = index
+                self._version += 1
+        return index
+
+    def index_array(self, courses):
+        """세션이 고쳐 쓸 수 있는 개인 인덱스 배열 (내 시간표처럼 append 하는 목록)."""
+        with self.lock:
+            if len(self) > self._collect_at: self.collect()
+            ids = array.array("i", (self.intern(c) for c in courses))
+            self._arrays.append(weakref.ref(ids))
+        return ids
+
+    def intern_list(self, courses):
+        """강좌 목록 → 공유 인덱스 배열 (읽기 전용으로 쓴다). 내용이 같으면 같은 객체."""
+        with self.lock:
+            if len(self) > self._collect_at: self.collect()
+            ids = array.array("i", (self.intern(c) for c in courses))
+            key = ids.tobytes()
+            shared = self._lists.get(key)
+            if shared is None:
+                shared = self._lists[key] = ids
+                self._arrays.append(weakref.ref(ids))
+                if len(self._lists) > self.max_lists: self._lists.popitem(last=False)
+            else: self._lists.move_to_end(key)
+        return shared
+
+    def collect(self):
+        """살아 있는 인덱스 배열 어디에도 없는 강좌를 비운다. 비운 개수."""
+        with self.lock:
+            arrays = [a for a in (ref() for ref in self._arrays) if a is not None]
+            self._arrays = [weakref.ref(a) for a in arrays]
+            live = np.zeros(len(self._courses), bool)
+            for ids in arrays:
+                if len(ids): live[np.frombuffer(ids, dtype=np.int32)] = True
+            freed = 0
+            for index, course in enumerate(self._courses):
+                if course is None or live[index]: continue
+                del self._by_key[_key(course.to_dict())]
+                self._courses[index] = None
+                self._free.append(index); freed += 1
+            if freed: self._version += 1
+            self._collect_at = max(self.max_courses, 2 * len(self))
+            return freed
+
+    def courses(self, ids):
+        return [self._courses[i] for i in ids]
+
+    def _masks(self):
+        version, lo, hi = self._mask_arrays
+        if version != self._version:
+            with self.lock:
+                version, lo, hi = self._version, np.array(self._lo, np.uint64), np.array(self._hi, np.uint64)
+            self._mask_arrays = (version, lo, hi)
+        return lo, hi
+
+    def conflicts_with(self, ids, schedule_mask):
+        """ids의 각 강좌가 시간표 마스크와 겹치는지 (len(ids)개 bool)."""
+        if not schedule_mask or not len(ids): return np.zeros(len(ids), bool)
+        lo, hi = self._masks()
+        index = np.frombuffer(ids, dtype=np.int32) if isinstance(ids, array.array) else np.asarray(ids, np.int32)
+        return ((lo[index] & np.uint64(schedule_mask & _WORD)) | (hi[index] & np.uint64(schedule_mask >> 64))) != 0
+
+    def stats(self):
+        return {"courses": len(self), "free_slots": len(self._free), "shared_lists": len(self._lists),
+                "tracked_arrays": len(self._arrays)}
+
+
+STORE = CourseStore()
@@ -0,0 +1,128 @@
+import os
+import re
+import json
+from concurrent.futures import ThreadPoolExecutor
+from tokens import count_tokens
+
+# -----------------------------------------------------------------------------
+# [Map-Reduce 강의 추출] 토큰 예산 단위 청크 → 청크별 병렬 추출 → 병합/중복 제거
+# -----------------------------------------------------------------------------
+# 코퍼스 전체를 한 프롬프트에 넣으면 출력 길이 제한에 걸려 JSON이 잘린다.
+# 청크마다 따로 추출하면 응답이 짧아지고, 병렬 실행으로 전체 시간도 줄어든다.
+
+CHUNK_TOKENS = int(os.environ.get("EXTRACTION_CHUNK_TOKENS", "8000"))
+MAX_WORKERS = int(os.environ.get("EXTRACTION_WORKERS", "4"))  # 동시 요청 수 (API 속도 제한 고려)
+
+_PRIORITY_RANK = {"High": 0, "Medium": 1, "Normal": 2}
+_COURSE_ID = re.compile(r"^[0-9A-Z]{4}-\d-\d{4}-\d{2}$")  # 학정번호 형식일 때만 id로 병합
+
+
+class PageChunk:
+    """청크를 이루는 페이지 바이트 구간 목록. 텍스트는 str()로 보낼 때만 페이지 파일(mmap)에서 만든다."""
+    __slots__ = ("spans",)
+
+    def __init__(self, spans):
+        self.spans = spans  # [(문서, 페이지 파일, 페이지, 시작, 끝, 머리말 포함 여부)]
+
+    def __str__(self):
+        return "".join((f"\n--- [문서: {doc} | p.{page}] ---\n" if header else "") + pages.text(page, start, end)
+                       for doc, pages, page, start, end, header in self.spans)
+
+
+def split_pages(documents, max_tokens=CHUNK_TOKENS):
+    """(문서, 페이지 파일) → 토큰 예산 이하의 PageChunk 목록. 페이지 경계를 유지하고,
+    모든 구간에 [문서/페이지] 머리말을 붙인다 (큰 페이지를 나눈 뒤쪽 청크도 출처를 안다). 빈 페이지는 건너뛴다."""
+    chunks, parts, used = [], [], 0
+
+    def flush():
+        nonlocal parts, used
+        if parts: chunks.append(PageChunk(parts))
+        parts, used = [], 0
+
+    for doc, pages in documents:
+        for page, text in pages:
+            if not text.strip(): continue
+            header = f"\n--- [문서: {doc} | p.{page}] ---\n"
+            size = len(text.encode("utf-8"))
+            cost = count_tokens(header + text)
+            if cost > max_tokens:
+                # 한 페이지가 예산보다 크면 줄 단위로 나눈다 (연속된 줄은 한 구간, 청크마다 머리말 반복)
+                flush()
+                header_cost, pos, start, body = count_tokens(header), 0, 0, False
+                for line in text.splitlines(keepends=True):
+                    line_cost, line_size = count_tokens(line), len(line.encode("utf-8"))
+                    if body and used + line_cost > max_tokens:
+                        parts.append((doc, pages, page, start, pos, True)); flush()
+                        start, body = pos, False
+                    if not used: used = header_cost
+                    used += line_cost; pos += line_size
+                    body = body or bool(line.strip())
+                if body: parts.append((doc, pages, page, start, pos, True))
+                flush()
+                continue
+            if used + cost > max_tokens: flush()
+            parts.append((doc, pages, page, 0, size, True)); used += cost
+    flush()
+    return chunks
+
+
+def parse_course_json(response):
+    """LLM 응답에서 JSON 리스트를 꺼낸다 (코드 블록/앞뒤 설명 제거). 파싱 실패 시 None."""
+    cleaned_json = response.replace("```json", "").replace("```", "").strip()
+    if not cleaned_json.startswith("["):
+        start = cleaned_json.find("[")
+        end = cleaned_json.rfind("]")
+        if start != -1 and end != -1: cleaned_json = cleaned_json[start:end+1]
+    try: return json.loads(cleaned_json)
+    except ValueError: return None
+
+
+def _course_key(course):
+    name = "".join(str(course.get("name", "")).split())
+    professor = "".join(str(course.get("professor", "")).split())
+    return name, professor
+
+
+def merge_courses(course_lists):
+    """청크별 결과 병합. 같은 학정번호 또는 같은 (과목명, 교수)는 하나로 합친다.
+    LLM이 예시 그대로 'unique_id' 같은 값을 내는 경우가 있어 형식이 맞는 id만 병합 기준으로 쓴다."""
+    merged, by_id, by_key = [], {}, {}
+    for courses in course_lists:
+        for course in courses or []:
+            if not isinstance(course, dict) or not course.get("name"): continue
+            cid = course.get("id") if _COURSE_ID.match(str(course.get("id", ""))) else None
+            key = _course_key(course)
+            existing = by_id.get(cid) if cid else None
+            existing = existing or by_key.get(key)
+            if existing is None:
+                course = dict(course)
+                merged.append(course)
+                if cid: by_id[cid] = course
+                by_key[key] = course
+                continue
+            # 비어 있는 필드는 채우고, 우선순위는 더 높은 쪽을 따른다
+            for field, value in course.items():
+                if value and not existing.get(field): existing[field] = value
+            if _PRIORITY_RANK.get(course.get("priority"), 3) < _PRIORITY_RANK.get(existing.get("priority"), 3):
+                existing["priority"] = course["priority"]
+
+    # LLM이 만든 id가 겹치면 버튼 key가 충돌하므로 유일하게 보정
+    seen = set()
+    for i, course in enumerate(merged):
+        if not course.get("id") or course["id"] in seen: course["id"] = f"{course.get('id') or 'course'}_{i}"
+        seen.add(course["id"])
+    return merged
+
+
+def map_reduce_extract(chunks, extract_fn, max_workers=MAX_WORKERS, cancelled=None):
+    """extract_fn(청크 텍스트) → 과목 목록. 실패한 청크는 빈 결과로 취급하고 나머지는 계속 진행.
+    cancelled(threading.Event)가 세워지면 아직 시작하지 않은 청크는 호출하지 않는다."""
+    def _safe(chunk):
+        if cancelled is not None and cancelled.is_set(): return []
+        try: return extract_fn(str(chunk)) or []
+        except Exception: return []
+
+    if not chunks: return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks))), thread_name_prefix="extract") as pool:
+        results = list(pool.map(_safe, chunks))
+    return merge_courses(results)
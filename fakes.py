@@ -0,0 +1,145 @@
+import time
+import uuid
+import hashlib
+import threading
+from tokens import count_tokens
+
+# -----------------------------------------------------------------------------
+# [오프라인 대역] Gemini/Firestore 없이 앱을 돌리기 위한 결정적 가짜 클라이언트 (벤치마크/부하 테스트용)
+# -----------------------------------------------------------------------------
+# FakeLLM        : ChatGoogleGenerativeAI처럼 invoke()/stream()을 제공. 첫 토큰 지연과 초당 토큰 수로
+#                  응답 시간을 흉내 내고, 같은 프롬프트에는 항상 같은 답을 낸다.
+# FakeFirestore  : FirebaseManager/persistence가 쓰는 collection/document/where/order_by/stream/set/batch만
+#                  메모리로 구현. fail_commits만큼 batch commit을 실패시켜 재시도 경로도 돌려볼 수 있다.
+
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeLLM:
+    def __init__(self, model="fake-gemini", temperature=0, first_token_latency=0.3, tokens_per_second=200.0,
+                 response=None, response_tokens=120):
+        self.model, self.temperature = model, temperature
+        self.first_token_latency, self.tokens_per_second = first_token_latency, tokens_per_second
+        self.response, self.response_tokens = response, response_tokens
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def _answer(self, prompt):
+        if self.response is not None: return self.response(prompt) if callable(self.response) else self.response
+        digest = hashlib.sha256(str(prompt).encode("utf-8")).hexdigest()
+        words = [digest[i:i + 4] for i in range(0, len(digest), 4)]
+        return " ".join(words[i % len(words)] for i in range(self.response_tokens))
+
+    def _pieces(self, text, size=8):
+        return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+    def invoke(self, prompt):
+        with self.lock: self.calls += 1
+        text = self._answer(prompt)
+        time.sleep(self.first_token_latency + count_tokens(text) / self.tokens_per_second)
+        return FakeMessage(text)
+
+    def stream(self, prompt):
+        with self.lock: self.calls += 1
+        text = self._answer(prompt)
+        time.sleep(self.first_token_latency)
+        for piece in self._pieces(text):
+            time.sleep(count_tokens(piece) / self.tokens_per_second)
+            yield FakeMessage(piece)
+
+
+class _Snapshot:
+    def __init__(self, doc_id, data):
+        self.id, self._data = doc_id, data
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class _Document:
+    def __init__(self, store, path):
+        self._store, self._path = store, path
+        self.id = path[-1]
+
+    def set(self, data):
+        with self._store.lock: self._store.docs[self._path] = dict(data)
+
+    def get(self):
+        with self._store.lock: return _Snapshot(self.id, self._store.docs.get(self._path))
+
+    def collection(self, name):
+        return _Query(self._store, self._path + (name,))
+
+
+class _Query:
+    def __init__(self, store, path, filters=(), order=None, limit=None):
+        self._store, self._path = store, path
+        self._filters, self._order, self._limit = filters, order, limit
+
+    def document(self, doc_id=None):
+        return _Document(self._store, self._path + (doc_id or uuid.uuid4().hex[:20],))
+
+    def where(self, field, op, value):
+        if op != "==": raise NotImplementedError(op)
+        return _Query(self._store, self._path, self._filters + ((field, value),), self._order, self._limit)
+
+    def order_by(self, field, direction="ASCENDING"):
+        return _Query(self._store, self._path, self._filters, (field, direction), self._limit)
+
+    def limit(self, count):
+        return _Query(self._store, self._path, self._filters, self._order, count)
+
+    def stream(self):
+        time.sleep(self._store.latency)
+        with self._store.lock:
+            docs = [(p[-1], d) for p, d in self._store.docs.items()
+                    if len(p) == len(self._path) + 1 and p[:-1] == self._path
+                    and all(d.get(f) == v for f, v in self._filters)]
+        if self._order:
+            field, direction = self._order
+            docs.sort(key=lambda item: str(item[1].get(field, "")), reverse=str(direction).upper().startswith("DESC"))
+        if self._limit is not None: docs = docs[:self._limit]
+        return iter([_Snapshot(doc_id, data) for doc_id, data in docs])
+
+    def get(self):
+        return list(self.stream())
+
+
+class _Batch:
+    def __init__(self, store):
+        self._store, self._writes = store, []
+
+    def set(self, ref, data):
+        self._writes.append((ref._path, dict(data)))
+
+    def commit(self):
+        time.sleep(self._store.latency)
+        with self._store.lock:
+            if self._store.fail_commits > 0:
+                self._store.fail_commits -= 1
+                raise RuntimeError("503 UNAVAILABLE (fake)")
+            for path, data in self._writes: self._store.docs[path] = data
+            self._store.commits += 1
+
+
+class FakeFirestore:
+    """경로(튜플) → 문서 dict. 읽기/commit마다 latency(초)만큼 지연."""
+
+    def __init__(self, latency=0.0, fail_commits=0):
+        self.docs = {}
+        self.latency = latency
+        self.fail_commits, self.commits = fail_commits, 0
+        self.lock = threading.Lock()
+
+    def collection(self, name):
+        return _Query(self, (name,))
+
+    def batch(self):
+        return _Batch(self)
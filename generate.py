@@ -1,42 +1,37 @@
 import os
-import glob
-from langchain_community.document_loaders import PyPDFLoader
+import argparse
+import knowledge_base as kb
+import ingest
+import course_catalog
 
-def generate_cache():
+def generate_cache(workers=ingest.DEFAULT_WORKERS):
     print("🔄 PDF 문서를 텍스트로 변환(학습) 중입니다...")
-    
+
     # 데이터 폴더 확인
-    if not os.path.exists("data"):
+    if not os.path.exists(kb.DATA_DIR):
         print("❌ 'data' 폴더가 없습니다. PDF 파일을 data 폴더에 넣어주세요.")
         return
 
-    pdf_files = glob.glob("data/*.pdf")
-    if not pdf_files:
+    if not kb.list_pdfs():
         print("❌ 'data' 폴더에 PDF 파일이 없습니다.")
         return
 
-    all_content = ""
-    # 모든 PDF 읽기
-    for pdf_file in pdf_files:
-        try:
-            print(f"   - 읽는 중: {pdf_file}")
-            loader = PyPDFLoader(pdf_file)
-            pages = loader.load_and_split()
-            filename = os.path.basename(pdf_file)
-            all_content += f"\n\n--- [문서: {filename}] ---\n"
-            for page in pages:
-                all_content += page.page_content
-        except Exception as e:
-            print(f"⚠️ 에러 발생 ({pdf_file}): {e}")
-            continue
+    # 해시 기반 증분 빌드 (중복/변경 없는 문서는 건너뜀)
+    manifest = kb.build_knowledge_base(workers=workers)
+    # 강의시간표 PDF → 정형 강의 카탈로그 (parquet)
+    course_catalog.build_catalog(manifest)
+    # 학과 × 학년 × 학기 전 조합의 후보 목록 (앱은 '강의 불러오기' 시 바로 사용)
+    course_catalog.build_candidate_lists(manifest)
 
-    # 결과 저장
-    cache_path = "data/cached_knowledge.txt"
-    with open(cache_path, "w", encoding="utf-8") as f:
-        f.write(all_content)
-    
-    print(f"\n✅ 학습 완료! '{cache_path}' 파일이 생성되었습니다.")
-    print("🚀 이제 이 파일(cached_knowledge.txt)을 GitHub에 함께 올리면, 웹사이트가 즉시 로딩됩니다.")
+    print(f"\n✅ 학습 완료! '{kb.KB_DIR}' (버전 {manifest['kb_version']}) 이 생성되었습니다.")
+    print(f"   문서 {len(manifest['documents'])}개, 중복 {len(manifest['duplicates'])}개")
+    for key, part in manifest["partitions"].items():
+        print(f"   - {key}: 문서 {len(part['documents'])}개 (버전 {part['version']})")
+    print("🚀 이제 이 폴더(data/kb)를 GitHub에 함께 올리면, 웹사이트가 즉시 로딩됩니다.")
 
 if __name__ == "__main__":
-    generate_cache()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="data/*.pdf → data/kb 지식 베이스 빌드")
+    parser.add_argument("-j", "--workers", type=int, default=ingest.DEFAULT_WORKERS,
+                        help=f"PDF 추출 병렬 프로세스 수 (기본 {ingest.DEFAULT_WORKERS})")
+    args = parser.parse_args()
+    generate_cache(workers=args.workers)
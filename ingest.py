@@ -0,0 +1,67 @@
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import page_store
+
+# -----------------------------------------------------------------------------
+# [PDF 추출 엔진] 프로세스 풀 병렬 추출, PyMuPDF 우선 → 실패 시 파일 단위 pypdf 대체
+# -----------------------------------------------------------------------------
+# 페이지를 읽는 즉시 페이지 파일(page_store)에 이어 쓰므로 문서 전체를 문자열로 모으지 않는다.
+# 작업 결과는 파일별 소요 시간/백엔드/페이지 수 보고서로 돌려준다.
+
+DEFAULT_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+
+def _iter_pymupdf(pdf_path):
+    import pymupdf
+    with pymupdf.open(pdf_path) as doc:
+        for page in doc:
+            yield page.get_text()
+
+
+def _iter_pypdf(pdf_path):
+    from pypdf import PdfReader
+    for page in PdfReader(pdf_path).pages:
+        yield page.extract_text() or ""
+
+
+BACKENDS = [("pymupdf", _iter_pymupdf), ("pypdf", _iter_pypdf)]
+
+
+def extract_to_file(pdf_path, out_path):
+    """PDF 한 개를 페이지 파일(out_path, page_store 형식)로 추출. 작업 프로세스에서 실행된다."""
+    start = time.perf_counter()
+    errors = []
+    for backend, iter_pages in BACKENDS:
+        try:
+            with page_store.PageWriter(out_path) as writer:
+                for text in iter_pages(pdf_path): writer.add(text)
+            return {"file": os.path.basename(pdf_path), "backend": backend, "pages": len(writer), "chars": writer.chars,
+                    "seconds": round(time.perf_counter() - start, 3), "error": "; ".join(errors) or None}
+        except Exception as e:
+            errors.append(f"{backend}: {e}")
+    return {"file": os.path.basename(pdf_path), "backend": None, "pages": 0, "chars": 0,
+            "seconds": round(time.perf_counter() - start, 3), "error": "; ".join(errors)}
+
+
+def ingest_files(jobs, workers=DEFAULT_WORKERS):
+    """jobs: [(pdf_path, out_path)] → 입력 순서대로 보고서 목록.
+
+    Streamlit 서버처럼 스레드가 많은 프로세스에서도 안전하도록 spawn 컨텍스트를 쓴다.
+    """
+    if not jobs: return []
+    if workers <= 1 or len(jobs) == 1:
+        return [extract_to_file(pdf, out) for pdf, out in jobs]
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=ctx) as pool:
+        futures = [pool.submit(extract_to_file, pdf, out) for pdf, out in jobs]
+        return [f.result() for f in futures]
+
+
+def format_report(reports):
+    lines = [f"   {'파일':<44} {'백엔드':>8} {'페이지':>6} {'초':>7}"]
+    for r in reports:
+        lines.append(f"   {r['file'][:44]:<44} {r['backend'] or '실패':>8} {r['pages']:>6} {r['seconds']:>7.2f}")
+        if r["error"]: lines.append(f"     ⚠️ {r['error']}")
+    return "\n".join(lines)
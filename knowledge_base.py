@@ -0,0 +1,283 @@
+import os
+import re
+import glob
+import json
+import hashlib
+import collections
+import datetime
+import ingest
+import page_store
+
+# -----------------------------------------------------------------------------
+# [지식 베이스 빌드] PDF → 페이지 텍스트 아티팩트 (generate.py / app.py 공용)
+# -----------------------------------------------------------------------------
+# data/kb/
+#   manifest.json          : 문서 목록(학기/종류 포함), 해시, 중복 정보, kb_version, 학기별 파티션
+#   pages/<sha256>.pages   : 문서별 페이지 텍스트 + 오프셋 테이블 (page_store 형식, mmap으로 읽음)
+# 내용 해시(sha256)로 문서를 식별하므로 바이트가 같은 파일은 한 번만 추출하고,
+# 이전 빌드에서 추출된 문서는 다시 파싱하지 않는다.
+#
+# [학기 파티션] 문서마다 학기(term, 예: "2025-2")와 종류(kind: timetable/handbook/other)를 붙이고
+# 학기별로 묶는다. 학기를 알 수 없는 문서는 공통 파티션(COMMON)에 들어가 모든 학기와 함께 쓰인다.
+# 파티션 버전은 그 파티션 문서의 해시로만 정해지므로, 새 학기 자료를 넣어도 기존 학기의
+# 버전(= LLM 캐시 키)과 검색 인덱스는 그대로 유지된다.
+
+DATA_DIR = "data"
+KB_DIR = os.path.join(DATA_DIR, "kb")
+FORMAT_VERSION = 2  # 2: PyMuPDF 추출 (이전 pypdf 추출본은 다시 추출)
+COMMON = "common"
+
+_FILE_TERM = re.compile(r"(20\d{2})\s*-\s*([12])(?!\d)")
+_TEXT_TERM = re.compile(r"(20\d{2})\s*학년도\s*(?:제\s*)?([12])\s*학기")
+_KINDS = (("timetable", ("강의시간표",)), ("handbook", ("자료집", "요람", "편람")))
+
+
+def _manifest_path(kb_dir):
+    return os.path.join(kb_dir, "manifest.json")
+
+
+def _pages_path(kb_dir, sha):
+    return os.path.join(kb_dir, "pages", f"{sha}{page_store.SUFFIX}")
+
+
+def _legacy_pages_path(kb_dir, sha):
+    return os.path.join(kb_dir, "pages", f"{sha}.jsonl")
+
+
+def file_sha256(path, block_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _stat_signature(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime": int(st.st_mtime)}
+
+
+def _write_atomic(path, text):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def load_manifest(kb_dir=KB_DIR):
+    try:
+        with open(_manifest_path(kb_dir), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format") != FORMAT_VERSION: return None
+    return manifest
+
+
+def list_pdfs(data_dir=DATA_DIR):
+    return sorted(glob.glob(os.path.join(data_dir, "*.pdf")))
+
+
+def open_pages(sha, kb_dir=KB_DIR):
+    """문서의 페이지 파일 (mmap, 프로세스당 한 번 열림)."""
+    return page_store.open_file(_pages_path(kb_dir, sha))
+
+
+def read_pages(sha, kb_dir=KB_DIR):
+    """문서의 페이지 레코드를 한 페이지씩 돌려준다 (전체를 메모리에 올리지 않음)."""
+    for page, text in open_pages(sha, kb_dir):
+        yield {"page": page, "text": text}
+
+
+def document_kind(filename):
+    for kind, words in _KINDS:
+        if any(w in filename for w in words): return kind
+    return "other"
+
+
+def detect_document_term(filename, pages=()):
+    """파일명의 '2025-2' / '(2025-1)'을 우선, 없으면 앞쪽 페이지의 'YYYY학년도 N학기' 최빈값.
+    자료집 본문에는 다음 학기 일정도 적혀 있으므로 본문은 파일명에 학기가 없을 때만 본다."""
+    m = _FILE_TERM.search(filename)
+    if m: return f"{m.group(1)}-{m.group(2)}"
+    counts = collections.Counter(f"{y}-{t}" for text in pages for y, t in _TEXT_TERM.findall(text))
+    return counts.most_common(1)[0][0] if counts else None
+
+
+def _classify(entry, kb_dir, first_pages=5):
+    pages = (p["text"] for _, p in zip(range(first_pages), read_pages(entry["sha256"], kb_dir)))
+    entry["term"] = detect_document_term(entry["file"], pages)
+    entry["kind"] = document_kind(entry["file"])
+
+
+def _partition_key(doc):
+    return doc.get("term") or COMMON
+
+
+def build_partitions(documents):
+    """{학기 또는 COMMON: {"documents": [sha256...], "version": ...}}"""
+    groups = collections.defaultdict(list)
+    for doc in documents: groups[_partition_key(doc)].append(doc["sha256"])
+    return {
+        key: {"documents": shas,
+              "version": hashlib.sha256(f"{FORMAT_VERSION}:{key}:{''.join(shas)}".encode()).hexdigest()[:16]}
+        for key, shas in sorted(groups.items())
+    }
+
+
+def terms(manifest):
+    """manifest에 있는 학기 목록 (오래된 순)."""
+    return sorted(k for k in (manifest or {}).get("partitions", {}) if k != COMMON)
+
+
+def resolve_term(available, semester):
+    """'2학기' / '2' → available 중 가장 최근 '2025-2'. 이미 'YYYY-N'이면 있는 경우 그대로."""
+    semester = str(semester or "")
+    if semester in available: return semester
+    m = re.search(r"[12]", semester)
+    matches = sorted(t for t in available if m and t.endswith(f"-{m.group()}"))
+    return matches[-1] if matches else None
+
+
+_Q_FULL = re.compile(r"(20\d{2}|\d{2})\s*(?:년도?|학년도)?\s*[-./]?\s*(?:제\s*)?([12])\s*학기")
+_Q_DASH = re.compile(r"(20\d{2})\s*-\s*([12])(?!\d)")
+_Q_TERM = re.compile(r"(?<!\d)([12])\s*학기")
+
+
+def detect_terms(question, available):
+    """질문에 적힌 학기 → available 안의 학기 목록 (언급이 없으면 빈 튜플).
+    '2025년 2학기', '25-1학기', '2025-2' 는 그대로, '1학기'처럼 연도가 없으면 가장 최근 해당 학기."""
+    found = []
+    for pattern in (_Q_FULL, _Q_DASH):
+        for year, term in pattern.findall(question):
+            found.append(f"{'20' + year if len(year) == 2 else year}-{term}")
+    if not found: found = [resolve_term(available, t) for t in _Q_TERM.findall(question)]
+    return tuple(dict.fromkeys(t for t in found if t in available))
+
+
+def partition_version(manifest, keys):
+    """선택한 파티션들의 버전 (LLM 캐시 키용). 다른 학기 자료가 추가/변경되어도 바뀌지 않는다."""
+    partitions = (manifest or {}).get("partitions", {})
+    return "+".join(f"{k}:{partitions[k]['version']}" for k in sorted(keys) if k in partitions)
+
+
+def needs_rebuild(data_dir=DATA_DIR, kb_dir=KB_DIR):
+    """PDF 목록이 다르거나 내용이 바뀌었으면 True. 크기/수정시각이 같은 파일은 해시를 계산하지 않는다.
+    학기 파티션이 없는 이전 manifest도 True (페이지는 재사용하고 분류만 다시 한다)."""
+    manifest = load_manifest(kb_dir)
+    if manifest is None or "partitions" not in manifest: return True
+    if any(not os.path.exists(_pages_path(kb_dir, d["sha256"])) for d in manifest["documents"]): return True
+    recorded = {e["file"]: e for e in manifest["documents"] + manifest["duplicates"]}
+    pdfs = {os.path.basename(p): p for p in list_pdfs(data_dir)}
+    if set(recorded) != set(pdfs): return True
+    # 크기/수정시각만 다르면(새로 clone/배포한 경우 등) 내용 해시로 다시 확인
+    return any(recorded[name]["stat"] != _stat_signature(path) and recorded[name]["sha256"] != file_sha256(path)
+               for name, path in pdfs.items())
+
+
+def build_knowledge_base(data_dir=DATA_DIR, kb_dir=KB_DIR, log=print, workers=ingest.DEFAULT_WORKERS):
+    log = log or (lambda *a, **k: None)
+    os.makedirs(os.path.join(kb_dir, "pages"), exist_ok=True)
+
+    previous = load_manifest(kb_dir) or {"documents": [], "duplicates": []}
+    prev_by_file = {e["file"]: e for e in previous["documents"] + previous["duplicates"]}
+    prev_docs = {e["sha256"]: e for e in previous["documents"]}
+
+    # 1단계: 해시로 중복/변경 여부 판정, 추출이 필요한 문서만 모은다
+    documents, duplicates, seen, jobs = [], [], {}, []
+    for pdf_path in list_pdfs(data_dir):
+        filename = os.path.basename(pdf_path)
+        stat = _stat_signature(pdf_path)
+
+        # 크기/수정시각이 같으면 이전 해시를 재사용
+        prev = prev_by_file.get(filename)
+        sha = prev["sha256"] if prev and prev["stat"] == stat else file_sha256(pdf_path)
+
+        if sha in seen:
+            log(f"   - 중복 건너뜀: {filename} (= {seen[sha]})")
+            duplicates.append({"file": filename, "sha256": sha, "stat": stat, "same_as": seen[sha]})
+            continue
+        seen[sha] = filename
+
+        if sha in prev_docs and not os.path.exists(_pages_path(kb_dir, sha)) \
+                and os.path.exists(_legacy_pages_path(kb_dir, sha)):
+            # 이전 JSONL 형식은 다시 추출하지 않고 페이지 파일로 옮긴다
+            log(f"   - 형식 변환: {filename}")
+            page_store.convert_jsonl(_legacy_pages_path(kb_dir, sha), _pages_path(kb_dir, sha))
+        if sha in prev_docs and os.path.exists(_pages_path(kb_dir, sha)):
+            log(f"   - 변경 없음: {filename}")
+            documents.append(dict(prev_docs[sha], file=filename, stat=stat))
+        else:
+            log(f"   - 읽는 중: {filename}")
+            entry = {"file": filename, "sha256": sha, "stat": stat}
+            documents.append(entry)
+            jobs.append((entry, pdf_path))
+
+    # 2단계: 프로세스 풀에서 병렬 추출 (페이지 레코드는 작업 프로세스가 바로 디스크에 기록)
+    reports = ingest.ingest_files([(pdf, _pages_path(kb_dir, e["sha256"])) for e, pdf in jobs], workers=workers)
+    for (entry, _), report in zip(jobs, reports):
+        if report["backend"] is None:
+            log(f"⚠️ 에러 발생 ({entry['file']}): {report['error']}")
+            documents.remove(entry)
+            continue
+        entry.update(pages=report["pages"], chars=report["chars"], backend=report["backend"])
+    if reports: log(ingest.format_report(reports))
+
+    # 3단계: 학기/종류 분류 (이전 빌드에서 분류된 문서는 그대로)
+    for entry in documents:
+        if "term" not in entry or "kind" not in entry: _classify(entry, kb_dir)
+
+    # 더 이상 참조되지 않는 페이지 파일과 변환이 끝난 JSONL 정리
+    live = {_pages_path(kb_dir, d["sha256"]) for d in documents}
+    for path in glob.glob(os.path.join(kb_dir, "pages", "*.*")):
+        if path not in live and not path.endswith(".tmp"): os.remove(path)
+    page_store.evict(live)
+
+    kb_version = hashlib.sha256(
+        f"{FORMAT_VERSION}:".encode() + "".join(d["sha256"] for d in documents).encode()
+    ).hexdigest()[:16]
+    manifest = {
+        "format": FORMAT_VERSION,
+        "kb_version": kb_version,
+        "built_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "documents": documents,
+        "duplicates": duplicates,
+        "partitions": build_partitions(documents),
+        "ingest": reports,
+    }
+    _write_atomic(_manifest_path(kb_dir), json.dumps(manifest, ensure_ascii=False, indent=2))
+    return manifest
+
+
+def select_documents(manifest, partitions=None, kinds=None):
+    """partitions(학기/COMMON 목록)와 kinds로 문서를 고른다. None이면 전부."""
+    docs = (manifest or {}).get("documents", [])
+    if partitions is not None: docs = [d for d in docs if _partition_key(d) in partitions]
+    if kinds is not None: docs = [d for d in docs if d.get("kind") in kinds]
+    return docs
+
+
+def iter_documents(kb_dir=KB_DIR, partitions=None, kinds=None):
+    """(파일명, 페이지 파일)을 manifest 순서대로. 페이지 텍스트는 필요할 때 페이지 파일에서 읽는다."""
+    for doc in select_documents(load_manifest(kb_dir), partitions, kinds):
+        yield doc["file"], open_pages(doc["sha256"], kb_dir)
+
+
+def iter_pages(kb_dir=KB_DIR, partitions=None, kinds=None):
+    """(파일명, 페이지 번호, 텍스트)를 manifest 순서대로 돌려준다."""
+    manifest = load_manifest(kb_dir)
+    if manifest is None: return
+    for doc in select_documents(manifest, partitions, kinds):
+        for p in read_pages(doc["sha256"], kb_dir):
+            yield doc["file"], p["page"], p["text"]
+
+
+def load_text(kb_dir=KB_DIR, partitions=None):
+    """manifest 순서대로 문서 텍스트를 이어 붙인 코퍼스 문자열 (기존 PRE_LEARNED_DATA 형식)."""
+    manifest = load_manifest(kb_dir)
+    if manifest is None: return ""
+    parts = []
+    for doc in select_documents(manifest, partitions):
+        parts.append(f"\n\n--- [문서: {doc['file']}] ---\n")
+        parts.extend(p["text"] for p in read_pages(doc["sha256"], kb_dir))
+    return "".join(parts)
@@ -0,0 +1,104 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+# -----------------------------------------------------------------------------
+# [LLM 응답 캐시] SQLite 기반, 세션/프로세스 간 공유
+# -----------------------------------------------------------------------------
+# 키 = sha256(정규화된 프롬프트, 모델명, temperature, 지식 베이스 버전)
+# → 문서가 바뀌면(kb_version 변경) 자동으로 새 키가 되어 이전 답변을 쓰지 않는다.
+# 크기 상한(LRU: 마지막 접근 시각 기준)과 TTL을 넘은 항목은 제거한다.
+
+CACHE_PATH = os.environ.get("LLM_CACHE_PATH", os.path.join("data", "llm_cache.sqlite3"))
+MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "5000"))
+TTL_SECONDS = int(os.environ.get("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY, value TEXT NOT NULL, model TEXT, created REAL NOT NULL, accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+
+def normalize_prompt(prompt):
+    return " ".join(prompt.split())
+
+
+def make_key(prompt, model, temperature, kb_version):
+    payload = json.dumps([normalize_prompt(prompt), model, float(temperature or 0), kb_version], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS):
+        self.path, self.max_entries, self.ttl = path, max_entries, ttl
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._conn() as conn: conn.executescript(_SCHEMA)
+
+    def _conn(self):
+        # sqlite3 연결은 스레드별로 하나 (Streamlit 세션마다 스레드가 다름)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, conn, name):
+        conn.execute("INSERT INTO counters(name, value) VALUES (?, 1) "
+                     "ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,))
+
+    def get(self, key):
+        now = time.time()
+        with self._conn() as conn:
+            row = conn.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None: conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._count(conn, "misses")
+                return None
+            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self._count(conn, "hits")
+            return row[0]
+
+    def put(self, key, value, model=None):
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO entries(key, value, model, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                         (key, value, model, now, now))
+            conn.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl,))
+            conn.execute("DELETE FROM entries WHERE key IN "
+                         "(SELECT key FROM entries ORDER BY accessed DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    # 캐시 장애(잠금, 디스크 등)는 LLM 호출 자체를 막지 않는다
+    def try_get(self, key):
+        try: return self.get(key)
+        except sqlite3.Error: return None
+
+    def try_put(self, key, value, model=None):
+        try: self.put(key, value, model)
+        except sqlite3.Error: pass
+
+    def get_or_call(self, prompt, model, temperature, kb_version, func, validate=None):
+        """캐시에 있으면 그대로, 없으면 func() 결과를 저장 후 반환. validate가 False면 저장하지 않음."""
+        key = make_key(prompt, model, temperature, kb_version)
+        cached = self.try_get(key)
+        if cached is not None: return cached
+        value = func()
+        if validate is None or validate(value): self.try_put(key, value, model)
+        return value
+
+    def stats(self):
+        try:
+            with self._conn() as conn:
+                counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+                entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        except sqlite3.Error:
+            counters, entries = {}, 0
+        return {"hits": counters.get("hits", 0), "misses": counters.get("misses", 0), "entries": entries}
@@ -0,0 +1,364 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import datetime
+import platform
+import tempfile
+import threading
+import subprocess
+import urllib.request
+import benchmark
+import fakes
+try: from websockets.sync.client import connect  # 부하 테스트 전용 (앱 requirements에는 넣지 않는다)
+except ImportError: connect = None
+
+# -----------------------------------------------------------------------------
+# [부하 테스트] 실제 Streamlit 서버(단일 프로세스) + 헤드리스 웹소켓 세션 N개
+# -----------------------------------------------------------------------------
+# python loadtest.py --sessions 1,5,10,20 --iterations 2
+#
+# 1) 같은 스크립트를 --serve 모드로 띄운다: LLM/Firestore는 fakes로 바꾼 뒤 `streamlit run app.py`.
+# 2) 브라우저 대신 /_stcore/stream 웹소켓에 직접 붙는 세션을 동시성 단계별로 N개 실행한다.
+#    시나리오: 접속 → 로그인(가입) → 📅 스마트 시간표 → AI Scan → 과목 추가 2회 → 삭제 → 지식인 질문
+# 3) 단계별 지연 분포, 처리량(시나리오/초), 서버 프로세스의 최대 RSS를 JSON 보고서로 남기고,
+#    동시 세션을 늘려도 처리량이 늘지 않는 지점(포화)을 표시한다.
+# AppTest는 프로세스 전역 Runtime을 공유해 스레드 동시 실행이 안 되므로 실제 서버에 붙는다.
+
+LEVELS = (1, 5, 10, 20)
+STEPS = ("connect", "login", "open_timetable", "scan", "add_course", "remove_course", "chat")
+QUESTIONS = ("졸업 학점은 몇 학점인가요?", "재수강 규정 알려줘", "수강신청 기간은 언제야?", "교양 필수 과목은?",
+             "계절학기 최대 학점은?", "휴학 신청 방법은?", "복수전공 조건은?", "성적 평가 방식은?")
+SATURATION_GAIN = 1.1  # 동시 세션을 늘렸을 때 처리량이 이 배율 미만으로 늘면 포화로 본다
+_WIDGETS = ("button", "radio", "text_input", "chat_input", "selectbox", "checkbox", "slider", "multiselect")
+
+
+# [헤드리스 세션] 브라우저처럼 위젯 상태를 보내고 스크립트 실행 완료(script_finished)까지 기다린다
+class HeadlessSession:
+    def __init__(self, url, timeout=180):
+        self.ws = connect(url, subprotocols=["streamlit"], max_size=None, open_timeout=timeout)
+        self.timeout = timeout
+        self.widgets = []   # 마지막 실행에서 그려진 (종류, proto)
+        self.values = {}    # 위젯 id → 다시 보낼 WidgetState (브라우저가 유지하는 값)
+        self.errors = []
+
+    def close(self):
+        self.ws.close()
+
+    def rerun(self, triggers=()):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        msg = BackMsg()
+        msg.rerun_script.SetInParent()
+        for state in list(self.values.values()) + list(triggers):
+            msg.rerun_script.widget_states.widgets.add().CopyFrom(state)
+        self.ws.send(msg.SerializeToString())
+        self._wait_finished()
+
+    def _wait_finished(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        deadline = time.monotonic() + self.timeout
+        while True:
+            fm = ForwardMsg()
+            fm.ParseFromString(self.ws.recv(timeout=max(0.1, deadline - time.monotonic())))
+            kind = fm.WhichOneof("type")
+            if kind == "new_session": self.widgets = []
+            elif kind == "delta" and fm.delta.WhichOneof("type") == "new_element":
+                element = fm.delta.new_element
+                el_type = element.WhichOneof("type")
+                if el_type in _WIDGETS: self.widgets.append((el_type, getattr(element, el_type)))
+                elif el_type == "exception": self.errors.append(element.exception.message)
+            elif kind == "script_finished":
+                if fm.script_finished in (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_WITH_COMPILE_ERROR):
+                    return
+
+    def find(self, el_type, label=None, key=None, enabled=True):
+        for kind, widget in self.widgets:
+            if kind != el_type: continue
+            if key is not None and not widget.id.endswith(f"-{key}"): continue
+            if label is not None and label not in getattr(widget, "label", ""): continue
+            if enabled and getattr(widget, "disabled", False): continue
+            return widget
+        return None
+
+    def need(self, el_type, **kwargs):
+        widget = self.find(el_type, **kwargs)
+        if widget is None: raise LookupError(f"{el_type} {kwargs} not found")
+        return widget
+
+    def find_all(self, el_type, key_prefix):
+        return [w for kind, w in self.widgets if kind == el_type and f"-{key_prefix}" in w.id and not w.disabled]
+
+    def _state(self, widget):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        state = WidgetState()
+        state.id = widget.id
+        return state
+
+    def set_value(self, widget, **value):
+        """값 위젯(radio/text_input...): 이후 실행에도 계속 보낸다."""
+        state = self._state(widget)
+        for field, v in value.items(): setattr(state, field, v)
+        self.values[widget.id] = state
+
+    def select(self, widget, index):
+        """radio/selectbox: 옵션 문자열로 보낸다 (Streamlit 1.5x 이후)."""
+        self.set_value(widget, string_value=widget.options[index])
+
+    def click(self, widget):
+        state = self._state(widget)
+        state.trigger_value = True
+        self.rerun([state])
+
+    def chat(self, widget, text):
+        state = self._state(widget)
+        state.chat_input_value.data = text
+        self.rerun([state])
+
+
+def run_scenario(session, email, rng, record):
+    """한 세션의 시나리오 1회. record(step, ms) 로 단계별 지연을 남긴다."""
+    def step(name, func):
+        start = time.perf_counter()
+        func()
+        record(name, (time.perf_counter() - start) * 1000)
+
+    def login():
+        session.select(session.need("radio", label="Mode"), 1)  # 회원가입
+        session.rerun()
+        session.set_value(session.need("text_input", label="Email"), string_value=email)
+        session.set_value(session.need("text_input", label="PW"), string_value="pw")
+        session.click(session.need("button", label="Go"))
+
+    def open_menu(index):
+        session.select(session.need("radio", key="menu_radio"), index)
+        session.rerun()
+
+    def add_course():
+        buttons = session.find_all("button", "add_")
+        if buttons: session.click(rng.choice(buttons[:5]))
+
+    def remove_course():
+        button = session.find("button", key="del_0")
+        if button: session.click(button)
+
+    def chat():
+        open_menu(0)
+        session.chat(session.need("chat_input"), rng.choice(QUESTIONS))
+
+    if session.find("button", label="Go"): step("login", login)
+    step("open_timetable", lambda: open_menu(1))
+    step("scan", lambda: session.click(session.need("button", label="강의 불러오기")))
+    step("add_course", add_course)
+    step("add_course", add_course)
+    step("remove_course", remove_course)
+    step("chat", chat)
+
+
+# [서버]
+def serve(port, secrets_path):
+    """--serve: 가짜 클라이언트를 심은 뒤 이 프로세스에서 Streamlit 서버를 실행."""
+    benchmark.install_fakes(
+        fakes.FakeLLM(first_token_latency=float(os.environ["LOADTEST_LLM_LATENCY"]),
+                      tokens_per_second=float(os.environ["LOADTEST_LLM_TPS"])),
+        fakes.FakeFirestore(latency=float(os.environ["LOADTEST_FIRESTORE_LATENCY"])))
+    from streamlit.web import cli
+    sys.argv = ["streamlit", "run", "app.py", "--server.port", str(port), "--server.headless", "true",
+                "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false",
+                "--secrets.files", secrets_path]
+    cli.main()
+
+
+def start_server(port, tmp, llm_latency, llm_tps, firestore_latency, gemini_rpm):
+    secrets_path = os.path.join(tmp, "secrets.toml")
+    with open(secrets_path, "w", encoding="utf-8") as f:
+        f.write('GOOGLE_API_KEY = "offline-loadtest"\n[firebase_service_account]\ntype = "service_account"\n')
+    env = dict(os.environ, LLM_CACHE_PATH=os.path.join(tmp, "llm_cache.sqlite3"),
+               TELEMETRY_PATH=os.path.join(tmp, "telemetry.sqlite3"), GEMINI_RPM=str(gemini_rpm),
+               LOADTEST_LLM_LATENCY=str(llm_latency), LOADTEST_LLM_TPS=str(llm_tps),
+               LOADTEST_FIRESTORE_LATENCY=str(firestore_latency))
+    log = open(os.path.join(tmp, "server.log"), "w")
+    proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port),
+                             "--secrets", secrets_path], env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if proc.poll() is not None: raise RuntimeError(f"server exited ({proc.returncode}), see {log.name}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=2) as r:
+                if r.status == 200: return proc
+        except OSError:
+            time.sleep(0.5)
+    proc.kill()
+    raise TimeoutError("server did not start")
+
+
+def wait_until_ready(url, timeout=600):
+    """지식인 입력창과 강의 불러오기 버튼이 활성화될 때까지 (백그라운드 로딩 완료)."""
+    session = HeadlessSession(url)
+    start = time.time()
+    try:
+        while time.time() - start < timeout:
+            session.rerun()
+            if session.find("chat_input"):
+                session.select(session.need("radio", key="menu_radio"), 1)
+                session.rerun()
+                if session.find("button", label="강의 불러오기"): return time.time() - start
+                session.values.clear()
+            time.sleep(0.5)
+    finally:
+        session.close()
+    raise TimeoutError("app did not become ready")
+
+
+class RssSampler:
+    """서버 프로세스의 RSS를 주기적으로 읽어 최대값을 기록 (/proc, 리눅스)."""
+
+    def __init__(self, pid, interval=0.25):
+        self.pid, self.interval = pid, interval
+        self.peak_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _read_kb(self, field="VmRSS"):
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith(field + ":"): return int(line.split()[1])
+        except OSError:
+            return None
+        return None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_kb = max(self.peak_kb, self._read_kb() or 0)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_level(url, sessions, iterations, think_time, server_pid, level_seed):
+    samples = {name: [] for name in STEPS}
+    errors, lock = [], threading.Lock()
+    completed = [0]
+
+    def record(name, ms):
+        with lock: samples[name].append(ms)
+
+    def worker(i):
+        rng = random.Random(level_seed * 1000 + i)
+        try:
+            start = time.perf_counter()
+            session = HeadlessSession(url)
+            session.rerun()
+            record("connect", (time.perf_counter() - start) * 1000)
+            try:
+                for it in range(iterations):
+                    run_scenario(session, f"load{level_seed}-{i}@kw.ac.kr", rng, record)
+                    with lock: completed[0] += 1
+                    if think_time: time.sleep(rng.uniform(0, 2 * think_time))
+            finally:
+                with lock: errors.extend(session.errors)
+                session.close()
+        except Exception as e:
+            with lock: errors.append(f"{type(e).__name__}: {e}")
+
+    with RssSampler(server_pid) as rss:
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(sessions)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        wall = time.perf_counter() - started
+
+    steps = [benchmark.result(name, {"sessions": sessions}, values) for name, values in samples.items() if values]
+    return {
+        "sessions": sessions, "iterations": iterations, "wall_s": round(wall, 2),
+        "scenarios": completed[0], "scenarios_per_s": round(completed[0] / wall, 3),
+        "steps_per_s": round(sum(len(v) for v in samples.values()) / wall, 2),
+        "peak_rss_mb": round(rss.peak_kb / 1024, 1), "errors": errors[:20], "error_count": len(errors),
+        "steps": steps,
+    }
+
+
+def find_saturation(levels):
+    """처리량이 더 이상 늘지 않기 시작한 동시 세션 수 (없으면 None)."""
+    for prev, cur in zip(levels, levels[1:]):
+        if cur["scenarios_per_s"] < prev["scenarios_per_s"] * SATURATION_GAIN: return prev["sessions"]
+    return None
+
+
+def print_level(level):
+    print(f"\n■ 동시 세션 {level['sessions']}: 시나리오 {level['scenarios']}개 / {level['wall_s']}초 "
+          f"= {level['scenarios_per_s']}/s · 최대 RSS {level['peak_rss_mb']}MB · 오류 {level['error_count']}")
+    for s in level["steps"]:
+        print(f"   {s['name']:<16} n={s['n']:<4} p50 {s['p50_ms']:>9.1f}ms  p95 {s['p95_ms']:>9.1f}ms  "
+              f"max {s['max_ms']:>9.1f}ms")
+
+
+def main(args):
+    if connect is None: sys.exit("loadtest.py에는 websockets 패키지가 필요합니다: pip install 'websockets>=11'")
+    tmp = tempfile.mkdtemp(prefix="kw-load-")
+    port = args.port
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    proc = start_server(port, tmp, args.llm_latency, args.llm_tps, args.firestore_latency, args.gemini_rpm)
+    levels = []
+    try:
+        ready_s = wait_until_ready(url)
+        print(f"✅ 서버 준비 완료 ({ready_s:.1f}초, pid {proc.pid})")
+        for n, sessions in enumerate(args.sessions):
+            levels.append(run_level(url, sessions, args.iterations, args.think_time, proc.pid, n + 1))
+            print_level(levels[-1])
+        import telemetry
+        features = telemetry.TelemetryStore(os.path.join(tmp, "telemetry.sqlite3")).summary()
+    finally:
+        proc.terminate()
+        try: proc.wait(timeout=10)
+        except subprocess.TimeoutExpired: proc.kill()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    saturation = find_saturation(levels)
+    report = {
+        "meta": {"created_at": datetime.datetime.now().isoformat(timespec="seconds"), "git": benchmark.git_revision(),
+                 "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+                 "llm_latency_s": args.llm_latency, "llm_tps": args.llm_tps, "gemini_rpm": args.gemini_rpm,
+                 "firestore_latency_s": args.firestore_latency, "think_time_s": args.think_time},
+        "server_ready_s": round(ready_s, 2),
+        "levels": levels,
+        "saturation_sessions": saturation,
+        "server_telemetry": features,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print("\n📈 처리량: " + " → ".join(f"{l['sessions']}세션 {l['scenarios_per_s']}/s" for l in levels))
+    print(f"⚠️ 포화 지점: 동시 세션 약 {saturation}개" if saturation else "포화 지점 없음 (측정 범위 내)")
+    print(f"📄 {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="다중 세션 부하 테스트 (실제 Streamlit 서버 + 가짜 LLM/Firestore)")
+    parser.add_argument("--sessions", default=",".join(map(str, LEVELS)), help="동시 세션 단계 (쉼표 구분)")
+    parser.add_argument("--iterations", type=int, default=2, help="세션당 시나리오 반복 횟수")
+    parser.add_argument("--think-time", type=float, default=0.0, help="시나리오 사이 평균 대기(초)")
+    parser.add_argument("--port", type=int, default=8599)
+    parser.add_argument("-o", "--output", default="loadtest_report.json")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="가짜 LLM 첫 토큰 지연(초)")
+    parser.add_argument("--llm-tps", type=float, default=200.0, help="가짜 LLM 초당 토큰 수")
+    parser.add_argument("--firestore-latency", type=float, default=0.02, help="가짜 Firestore 읽기 지연(초)")
+    parser.add_argument("--gemini-rpm", type=float, default=1000000,
+                        help="앱의 분당 요청 한도 (실제 할당량을 흉내 내려면 낮춘다)")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--secrets", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.port, args.secrets)
+    else:
+        args.sessions = [int(s) for s in args.sessions.split(",") if s.strip()]
+        main(args)
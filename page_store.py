@@ -0,0 +1,121 @@
+import os
+import mmap
+import json
+import array
+import struct
+import threading
+
+# -----------------------------------------------------------------------------
+# [페이지 저장소] 문서별 페이지 텍스트 파일 + 오프셋 테이블, mmap으로 열어 페이지 단위로 잘라 읽는다
+# -----------------------------------------------------------------------------
+# 파일 구조 (pages/<sha256>.pages):
+#   MAGIC(8) | 페이지 1 UTF-8 | 페이지 2 UTF-8 | ... | 오프셋 uint64 × (n+1) | n uint64 | MAGIC(8)
+# 추출하면서 페이지를 바로 이어 쓰고 오프셋 테이블은 마지막에 붙이므로 한 번에 스트리밍으로 기록된다.
+# 읽을 때는 파일 전체를 mmap으로 열어 (문서, 페이지) → 바이트 구간을 복사 없이 잘라낸다.
+# 텍스트는 필요한 구간만 그때 디코딩하므로 상주 메모리가 코퍼스 크기에 비례하지 않고,
+# 여러 서버 프로세스가 같은 파일을 열면 OS 페이지 캐시를 함께 쓴다.
+
+MAGIC = b"KWPAGES1"
+SUFFIX = ".pages"
+_FOOTER = struct.Struct("<Q8s")
+
+
+class PageWriter:
+    """with PageWriter(path) as w: w.add(text) ... → 임시 파일에 쓰고 닫을 때 교체."""
+
+    def __init__(self, path):
+        self.path, self.tmp = path, f"{path}.{os.getpid()}.tmp"
+        self.offsets = array.array("Q", [0])
+        self.chars = 0
+
+    def __enter__(self):
+        self._file = open(self.tmp, "wb")
+        self._file.write(MAGIC)
+        return self
+
+    def add(self, text):
+        data = text.encode("utf-8")
+        self._file.write(data)
+        self.offsets.append(self.offsets[-1] + len(data))
+        self.chars += len(text)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._file.write(self.offsets.tobytes())
+                self._file.write(_FOOTER.pack(len(self), MAGIC))
+        finally:
+            self._file.close()
+        if exc_type is None: os.replace(self.tmp, self.path)
+        elif os.path.exists(self.tmp): os.remove(self.tmp)
+
+
+class PageFile:
+    """읽기 전용 mmap 페이지 파일. page_bytes()는 복사 없는 memoryview, text()는 필요한 구간만 디코딩."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        count, magic = _FOOTER.unpack_from(self._mm, len(self._mm) - _FOOTER.size)
+        if self._mm[:len(MAGIC)] != MAGIC or magic != MAGIC: raise ValueError(f"not a page file: {path}")
+        table = len(self._mm) - _FOOTER.size - 8 * (count + 1)
+        self._view = memoryview(self._mm)
+        self._offsets = self._view[table:table + 8 * (count + 1)].cast("Q")
+        self._data = self._view[len(MAGIC):table]
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def page_bytes(self, page, start=0, end=None):
+        """1부터 시작하는 페이지 번호, 페이지 안의 바이트 구간 [start, end)."""
+        lo, hi = self._offsets[page - 1], self._offsets[page]
+        return self._data[lo + start:hi if end is None else lo + end]
+
+    def text(self, page, start=0, end=None):
+        return str(self.page_bytes(page, start, end), "utf-8")
+
+    def __iter__(self):
+        for page in range(1, len(self) + 1): yield page, self.text(page)
+
+
+_open_files = {}
+_lock = threading.Lock()
+
+
+def open_file(path):
+    """같은 파일(경로+수정시각)은 프로세스에서 한 번만 mmap한다. 다시 쓰인 파일을 열면 이전 것은 놓는다."""
+    key = (path, os.stat(path).st_mtime_ns)
+    pages = _open_files.get(key)
+    if pages is None:
+        with _lock:
+            pages = _open_files.get(key)
+            if pages is None:
+                for old in [k for k in _open_files if k[0] == path]: del _open_files[old]
+                pages = _open_files[key] = PageFile(path)
+    return pages
+
+
+def evict(live_paths=None):
+    """live_paths에 없거나 지워졌거나 다시 쓰인 파일의 mmap을 놓는다 (아직 쓰는 곳이 있으면 그쪽이 끝날 때 해제).
+    놓은 개수."""
+    with _lock:
+        stale = [(path, mtime) for path, mtime in _open_files
+                 if (live_paths is not None and path not in live_paths) or _mtime(path) != mtime]
+        for key in stale: del _open_files[key]
+    return len(stale)
+
+
+def _mtime(path):
+    try: return os.stat(path).st_mtime_ns
+    except OSError: return None
+
+
+def convert_jsonl(jsonl_path, path):
+    """이전 형식(pages/<sha>.jsonl)을 다시 추출하지 않고 페이지 파일로 옮긴다."""
+    with PageWriter(path) as writer, open(jsonl_path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip(): writer.add(json.loads(line)["text"])
+    return len(writer)
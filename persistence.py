@@ -0,0 +1,192 @@
+import os
+import time
+import atexit
+import random
+import datetime
+import threading
+import collections
+
+# -----------------------------------------------------------------------------
+# [Firestore 저장 계층] 지연 쓰기(write-behind) 큐 + 일괄 기록 + 사용자별 TTL 읽기 캐시
+# -----------------------------------------------------------------------------
+# - put()      : 요청 스레드에서는 큐에 넣고 바로 반환. 같은 문서 경로에 대한 쓰기는 마지막 것만 남긴다
+#                (대화 저장처럼 자주 덮어쓰는 문서는 flush 주기마다 한 번만 기록).
+# - 기록 스레드 : flush_interval마다 모아서 batch(최대 batch_size개, Firestore 한도 500) 한 번으로 commit.
+#                실패하면 지수 백오프 + 지터로 다시 시도하고, max_attempts를 넘긴 문서는 failed에 보관한다
+#                (버리지 않음). 사용자 화면/관리자 패널에 개수와 마지막 오류를 보여 주고 retry_failed()로 다시 큐에 넣는다.
+# - load_collection(): (사용자, 컬렉션) 단위로 ttl초 동안 캐시. 아직 기록되지 않은 쓰기도 반영해서
+#                돌려주므로 저장 직후 목록에 바로 보인다.
+# - find_user() : 가입 시 이메일 중복 조회 결과를 ttl초 동안 캐시 (없는 이메일은 캐시하지 않는다).
+#                비밀번호 같은 SECRET_FIELDS는 캐시에 남기지 않는다 (로그인은 캐시 없이 서버에서 확인).
+# db는 호출할 때마다 get_db()로 받는다 (firestore 클라이언트, Firestore 에뮬레이터
+# (FIRESTORE_EMULATOR_HOST), 또는 fakes.FakeFirestore 어느 것이든 같은 방식으로 동작).
+
+FLUSH_INTERVAL = float(os.environ.get("PERSIST_FLUSH_INTERVAL", "0.5"))
+BATCH_SIZE = min(500, int(os.environ.get("PERSIST_BATCH_SIZE", "400")))
+CACHE_TTL = float(os.environ.get("PERSIST_CACHE_TTL", "60"))
+MAX_ATTEMPTS = int(os.environ.get("PERSIST_MAX_ATTEMPTS", "5"))
+MAX_CACHED = 1024
+MAX_BACKOFF = 30.0
+SECRET_FIELDS = ("password",)
+
+
+def now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _ref(db, path):
+    ref = db
+    for i, part in enumerate(path): ref = ref.collection(part) if i % 2 == 0 else ref.document(part)
+    return ref
+
+
+def _public(data):
+    return {k: v for k, v in data.items() if k not in SECRET_FIELDS}
+
+
+class WriteBehindStore:
+    def __init__(self, get_db, flush_interval=FLUSH_INTERVAL, batch_size=BATCH_SIZE, ttl=CACHE_TTL,
+                 max_attempts=MAX_ATTEMPTS):
+        self._get_db = get_db
+        self.flush_interval, self.batch_size, self.ttl, self.max_attempts = flush_interval, batch_size, ttl, max_attempts
+        self._pending = collections.OrderedDict()  # 문서 경로 → (data, 시도 횟수)
+        self._in_flight = {}  # commit 중인 문서 경로 → data
+        self._collections = collections.OrderedDict()  # (uid, 컬렉션) → (만료 시각, {doc_id: data})
+        self._users = collections.OrderedDict()  # email → (만료 시각, doc_id, data)
+        self._failed = {}  # 포기한 쓰기: 문서 경로 → data (같은 경로에 새로 저장하거나 retry_failed() 하면 다시 큐로)
+        self.lock = threading.Lock()
+        self._idle = threading.Condition(self.lock)
+        self._wake = threading.Event()
+        self._thread = None
+        self.counts = collections.Counter()  # queued / written / batches / retries / failed / cache_hits
+        self.last_error = None
+
+    # [쓰기] 큐에 넣고 캐시에 바로 반영
+    def put(self, uid, collection, doc_id, data):
+        path = ("users", uid, collection, doc_id)
+        with self.lock:
+            self._pending[path] = (dict(data), 0)
+            self._pending.move_to_end(path)
+            self._failed.pop(path, None)
+            cached = self._collections.get((uid, collection))
+            if cached is not None: cached[1][doc_id] = dict(data)
+            self.counts["queued"] += 1
+            self._start()
+        self._wake.set()
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="persistence", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush, timeout=5.0)
+
+    def retry_failed(self, uid=None):
+        """포기했던 쓰기를 다시 큐에 넣는다 (uid를 주면 그 사용자 것만). 넣은 개수."""
+        with self.lock:
+            paths = [p for p in self._failed if uid is None or p[1] == uid]
+            for path in paths:
+                if path not in self._pending: self._pending[path] = (self._failed[path], 0)
+                del self._failed[path]
+            if paths: self._start()
+        if paths: self._wake.set()
+        return len(paths)
+
+    def failed(self, uid=None):
+        """아직 기록하지 못한 문서 경로 목록."""
+        with self.lock: return [p for p in self._failed if uid is None or p[1] == uid]
+
+    def _loop(self):
+        while True:
+            self._wake.wait(); self._wake.clear()
+            time.sleep(self.flush_interval)  # 짧은 시간 동안 들어온 쓰기를 한 batch로 모은다
+            attempts = 0
+            while self._pending:
+                attempts = 0 if self._flush_once() else attempts + 1
+                if attempts: time.sleep(random.uniform(0, min(MAX_BACKOFF, self.flush_interval * 2 ** attempts)))
+
+    def _flush_once(self):
+        """pending 앞쪽 batch_size개를 commit. 성공하면 True."""
+        with self.lock:
+            items = [self._pending.popitem(last=False) for _ in range(min(self.batch_size, len(self._pending)))]
+            self._in_flight.update((path, data) for path, (data, _) in items)
+        ok = False
+        try:
+            db = self._get_db()
+            if db is None: raise RuntimeError("Firestore 연결 없음")
+            batch = db.batch()
+            for path, (data, _) in items: batch.set(_ref(db, path), data)
+            batch.commit()
+            ok = True
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+        with self.lock:
+            for path, _ in items: self._in_flight.pop(path, None)
+            if ok: self.counts["written"] += len(items); self.counts["batches"] += 1
+            else:
+                for path, (data, attempts) in reversed(items):
+                    if path in self._pending: continue  # 그 사이 새로 저장된 내용이 있으면 그것을 기록
+                    if attempts + 1 >= self.max_attempts:
+                        self._failed[path] = data; self.counts["failed"] += 1
+                        continue
+                    self._pending[path] = (data, attempts + 1)
+                    self._pending.move_to_end(path, last=False)
+                    self.counts["retries"] += 1
+            if not self._pending and not self._in_flight: self._idle.notify_all()
+        return ok
+
+    def flush(self, timeout=None):
+        """대기 중인 쓰기가 모두 기록(또는 failed로 보관)될 때까지 기다린다. 종료 시/테스트용."""
+        self._wake.set()
+        with self.lock:
+            return self._idle.wait_for(lambda: not self._pending and not self._in_flight, timeout)
+
+    # [읽기] TTL 캐시
+    def load_collection(self, uid, collection, order_by="updated_at"):
+        key = (uid, collection)
+        with self.lock:
+            cached = self._collections.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                self.counts["cache_hits"] += 1
+                docs = dict(cached[1])
+            else: docs = None
+        if docs is None:
+            db = self._get_db()
+            if db is None: return []
+            stream = _ref(db, ("users", uid, collection)).order_by(order_by, direction="DESCENDING").stream()
+            docs = {doc.id: doc.to_dict() for doc in stream}
+            with self.lock:
+                # 아직 기록되지 않은(또는 기록에 실패한) 쓰기가 서버 내용보다 최신
+                for path, data in [*self._failed.items(), *self._in_flight.items(),
+                                   *((p, d) for p, (d, _) in self._pending.items())]:
+                    if path[1:3] == key: docs[path[3]] = data
+                self._remember(self._collections, key, (time.monotonic() + self.ttl, docs))
+                docs = dict(docs)
+        rows = sorted(docs.items(), key=lambda item: str(item[1].get(order_by, "")), reverse=True)
+        return [{"id": doc_id, **data} for doc_id, data in rows]
+
+    def find_user(self, email):
+        """이메일 → (doc_id, data). 없으면 (None, None)."""
+        with self.lock:
+            cached = self._users.get(email)
+            if cached is not None and cached[0] > time.monotonic():
+                self.counts["cache_hits"] += 1
+                return cached[1], dict(cached[2])
+        db = self._get_db()
+        if db is None: raise RuntimeError("Firestore 연결 없음")
+        for doc in db.collection("users").where("email", "==", email).limit(1).stream():
+            self.remember_user(email, doc.id, doc.to_dict())
+            return doc.id, _public(doc.to_dict())
+        return None, None
+
+    def remember_user(self, email, doc_id, data):
+        with self.lock: self._remember(self._users, email, (time.monotonic() + self.ttl, doc_id, _public(data)))
+
+    def _remember(self, cache, key, value):
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > MAX_CACHED: cache.popitem(last=False)
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counts, pending=len(self._pending) + len(self._in_flight), unsaved=len(self._failed),
+                        last_error=self.last_error)
@@ -0,0 +1,89 @@
+import threading
+import weakref
+import collections
+from concurrent.futures import ThreadPoolExecutor
+
+# -----------------------------------------------------------------------------
+# [추측 선로딩] 설정을 고르는 동안 백그라운드에서 미리 불러오고, 버튼을 누르면 결과만 받는다
+# -----------------------------------------------------------------------------
+# - 작업은 키(학과, 학년, 학기)별로 프로세스에 하나 → 같은 조합을 고른 세션들은 같은 Future를 공유한다.
+# - 세션(owner)마다 지금 보고 있는 키 하나만 기억한다. 다른 키로 바뀌었을 때 이전 작업을 원하는
+#   세션이 더 없으면 취소한다: 시작 전이면 Future.cancel(), 실행 중이면 cancelled 이벤트를 세워
+#   아직 보내지 않은 LLM 청크 호출을 건너뛰게 한다 (할당량 절약). 취소된 작업의 결과는 버린다.
+# - 끝난 작업은 최근 keep개까지 결과 캐시로 남는다. owner는 약한 참조라 세션이 끝나면 함께 사라진다.
+
+MAX_WORKERS = 2
+KEEP_RESULTS = 64
+
+
+class CancelledPrefetch(Exception):
+    pass
+
+
+class Owner:
+    """세션별 식별자 (session_state에 하나 보관). 약한 참조가 가능하도록 별도 클래스로 둔다."""
+    __slots__ = ("__weakref__",)
+
+
+class _Job:
+    __slots__ = ("future", "cancelled")
+
+    def __init__(self):
+        self.future, self.cancelled = None, threading.Event()
+
+
+class Prefetcher:
+    def __init__(self, max_workers=MAX_WORKERS, keep=KEEP_RESULTS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._jobs = collections.OrderedDict()
+        self._owners = weakref.WeakKeyDictionary()
+        self.keep = keep
+        self.lock = threading.Lock()
+        self.counts = collections.Counter()  # started / shared / cancelled
+
+    def request(self, owner, key, fn):
+        """owner가 key를 보고 있음을 알리고 (필요하면 fn(cancelled) 작업을 시작) Future를 돌려준다.
+        이미 있는 작업은 끝났든 진행 중이든 그대로 공유한다."""
+        return self._acquire(owner, key, fn, retry=False)
+
+    def get(self, owner, key, fn):
+        """버튼처럼 명시적인 요청: 끝난 작업이 실패했거나 빈 결과였다면 다시 실행한다."""
+        return self._acquire(owner, key, fn, retry=True)
+
+    def _acquire(self, owner, key, fn, retry):
+        with self.lock:
+            previous = self._owners.get(owner)
+            self._owners[owner] = key
+            if previous is not None and previous != key: self._release(previous)
+            job = self._jobs.get(key)
+            if job is not None and retry and job.future.done() and (job.future.exception() or not job.future.result()):
+                job = None
+            if job is None:
+                job = self._jobs[key] = _Job()
+                job.future = self._executor.submit(self._run, job, fn)
+                self.counts["started"] += 1
+                self._trim()
+            elif previous != key: self.counts["shared"] += 1
+            self._jobs.move_to_end(key)
+            return job.future
+
+    def _run(self, job, fn):
+        result = fn(job.cancelled)
+        if job.cancelled.is_set(): raise CancelledPrefetch()
+        return result
+
+    def _release(self, key):
+        job = self._jobs.get(key)
+        if job is None or job.future.done() or key in self._owners.values(): return
+        job.cancelled.set(); job.future.cancel()
+        del self._jobs[key]
+        self.counts["cancelled"] += 1
+
+    def _trim(self):
+        done = [k for k, j in self._jobs.items() if j.future.done()]
+        for key in done[:max(0, len(self._jobs) - self.keep)]: del self._jobs[key]
+
+    def stats(self):
+        with self.lock:
+            running = sum(not j.future.done() for j in self._jobs.values())
+            return dict(self.counts, jobs=len(self._jobs), running=running)
@@ -0,0 +1,197 @@
+import re
+import collections
+import timeslots
+import knowledge_base as kb
+
+# -----------------------------------------------------------------------------
+# [질문 라우터] 강좌/교수/학과 조회 질문은 강의 카탈로그로 바로 답하고, 나머지만 LLM으로
+# -----------------------------------------------------------------------------
+# - 과목명   : "데이터구조 몇 시야?", "C프로그래밍 몇 학점?"   → 분반별 교수/시간/학점/이수구분
+# - 교수     : "김OO 교수 강의 목록"                        → 그 교수의 개설 과목
+# - 목록     : "전자공학과 2학년 전공필수", "월요일 3교시 수업 뭐 있어?", "3학점 교양 과목 알려줘"
+#              → 학과/학년/이수구분/요일·교시/학점으로 거른 과목
+# 과목명이 들어 있어도 시간/학점/교수처럼 카탈로그에 있는 내용을 묻는 말(LOOKUP_CUES)이 있을 때만 답한다
+# ("자료구조 교재 뭐 써?", "회로이론 중간고사 언제?"는 LLM으로). 규정/방법/추천처럼 설명이 필요한
+# 질문도 조회 대상이 있어도 LLM으로 넘긴다 (None 반환).
+# 답변에는 카탈로그 행의 출처(문서, 페이지)를 붙인다. 학기는 질문에 적힌 학기 → 기본 학기 → 최근 학기.
+
+MAX_ROWS = 15
+OPEN_ENDED = ("왜", "어떻게", "방법", "규정", "조건", "추천", "비교", "차이", "의미", "뜻", "설명", "신청",
+              "재수강", "졸업", "기간", "가능", "되나", "될까", "돼", "할수", "해야", "좋아", "어때", "어려",
+              "시험", "중간고사", "기말고사", "범위", "과제", "교재", "선수", "공부", "어디서")
+LOOKUP_CUES = ("몇시", "시간", "교시", "요일", "학점", "교수", "분반", "강의실", "학정번호", "목록")
+_LISTING_CUES = ("과목", "강의", "수업", "목록", "리스트", "뭐", "무엇", "알려")
+_CLASSIFICATIONS = (("전공필수", ("전필",)), ("전공선택", ("전선",)), ("교양필수", ("교필",)), ("교양선택", ("교선",)),
+                    ("전필", ("전필",)), ("전선", ("전선",)), ("교필", ("교필",)), ("교선", ("교선",)),
+                    ("교양", ("교선", "교필")), ("전공", ("전필", "전선")))
+_PROFESSOR = re.compile(r"([가-힣]{2,4})\s*교수")
+_GRADE = re.compile(r"([1-4])\s*학년")
+_CREDITS = re.compile(r"([1-9])\s*학점")
+_DAY = re.compile(r"([월화수목금토])요일")
+_PERIOD = re.compile(r"(?:([월화수목금토])(?:요일)?\s*)?(\d{1,2})\s*교시")
+_HANGUL = re.compile(r"[가-힣]")
+_PARTICLES = "은는이가을를의도랑와과"
+
+Answer = collections.namedtuple("Answer", ["intent", "text", "rows"])
+
+
+def _normalize(text):
+    return "".join(str(text).split()).lower()
+
+
+def split_professors(value):
+    """'김재요/김지 혜/이슬기' → ['김재요', '김지혜', '이슬기'] (줄바꿈이 공백으로 들어간 이름도 붙인다)."""
+    names = []
+    for part in re.split(r"[/,]", str(value or "")):
+        part = part.strip()
+        if not part: continue
+        joined = "".join(part.split())
+        names.extend(part.split() if len(joined) > 4 else [joined])
+    return names
+
+
+class CourseIndex:
+    """카탈로그 위의 조회용 색인 (과목명/교수/학과 → 행 번호). 카탈로그가 바뀌면 새로 만든다."""
+
+    def __init__(self, catalog):
+        self.catalog = catalog.reset_index(drop=True)
+        self.semesters = sorted(self.catalog["semester"].unique()) if len(self.catalog) else []
+        self.by_name, self.by_professor = collections.defaultdict(list), collections.defaultdict(list)
+        for i, (name, professor) in enumerate(zip(self.catalog["name"], self.catalog["professor"])):
+            if name: self.by_name[_normalize(name)].append(i)
+            for p in split_professors(professor): self.by_professor[p].append(i)
+        # 긴 이름부터 찾아야 '대학물리및실험1' 안의 '대학물리' 같은 부분 일치를 피한다
+        self.names = sorted((n for n in self.by_name if len(n) >= 2), key=len, reverse=True)
+        self.departments = sorted((d for d in self.catalog["department"].unique() if d not in ("", "공통", "교양")),
+                                  key=len, reverse=True)
+
+    def match_courses(self, question):
+        text = _normalize(question)
+        found = []
+        for name in self.names:
+            at = text.find(name)
+            if at < 0: continue
+            if len(name) <= 2 and not _is_word(text, at, len(name)): continue
+            found.append(name)
+            text = text[:at] + " " * len(name) + text[at + len(name):]
+        return found
+
+    def match_professors(self, question):
+        return [n for n in dict.fromkeys(_PROFESSOR.findall(question)) if n in self.by_professor]
+
+    def match_department(self, question):
+        text = _normalize(question)
+        return next((d for d in self.departments if _normalize(d) in text), None)
+
+    def scope(self, question, default_semester=None):
+        """조회할 학기: 질문에 적힌 학기 → default_semester('2학기' 등) → 가장 최근 학기."""
+        terms = kb.detect_terms(question, self.semesters)
+        if not terms and default_semester: terms = tuple(t for t in [kb.resolve_term(self.semesters, default_semester)] if t)
+        return terms or tuple(self.semesters[-1:])
+
+
+def _is_word(text, at, length):
+    """두 글자 과목명('요가', '역학')은 앞뒤가 다른 한글 단어의 일부가 아닐 때만 인정."""
+    before = text[at - 1] if at > 0 else ""
+    after = text[at + length:at + length + 1]
+    return not _HANGUL.match(before) and (not after or not _HANGUL.match(after) or after in _PARTICLES
+                                         or text[at + length:].startswith(("수업", "강의", "과목", "몇")))
+
+
+def _classification(question):
+    """질문의 이수구분 → (표시 이름, 코드 목록). '교양'은 교선/교필 전체."""
+    text = _normalize(question)
+    return next(((word, codes) for word, codes in _CLASSIFICATIONS if word in text), None)
+
+
+def _slot_filter(question):
+    """'월요일 3교시' / '월3교시' / '화요일' / '5교시' → (표시 이름, 슬롯 비트마스크). 없으면 None."""
+    period, day = _PERIOD.search(question), _DAY.search(question)
+    day = (period and period.group(1)) or (day and day.group(1))
+    if period and day:
+        bit = timeslots.SLOT_BITS.get(f"{day}{int(period.group(2))}")
+        return f"{day}요일 {int(period.group(2))}교시", 0 if bit is None else 1 << bit
+    if period: return f"{int(period.group(2))}교시", timeslots.period_mask(int(period.group(2)))
+    if day: return f"{day}요일", timeslots.day_mask(day)
+    return None
+
+
+def _unique(index, rows):
+    """같은 분반이 여러 학과 페이지(교양/공통 등)에 실린 경우 처음 것만 남긴다."""
+    seen, unique = set(), []
+    for i in rows:
+        key = (index.catalog.at[i, "id"], index.catalog.at[i, "semester"])
+        if key not in seen: seen.add(key); unique.append(i)
+    return unique
+
+
+def _select(index, rows, terms):
+    """학기 범위 안의 행, 없으면 다른 학기 행이라도. → (행, 보여 주는 학기 라벨, 안내 문구)."""
+    scoped = [i for i in rows if index.catalog.at[i, "semester"] in terms]
+    if scoped: return _unique(index, scoped), ", ".join(terms), ""
+    rows = _unique(index, rows)
+    shown = ", ".join(sorted({index.catalog.at[i, "semester"] for i in rows}))
+    return rows, shown, f"ℹ️ {', '.join(terms)} 강의시간표에는 개설되지 않았습니다. 다른 학기 개설 정보입니다.\n\n"
+
+
+def _format(index, title, rows):
+    df = index.catalog.iloc[rows[:MAX_ROWS]]
+    lines = [title, "", "| 과목명 | 학정번호 | 교수 | 시간 | 학점 | 이수 | 개설 | 학기 | 출처 |",
+             "|---|---|---|---|---|---|---|---|---|"]
+    for r in df.itertuples(index=False):
+        slots = ", ".join(r.time_slots) if len(r.time_slots) else "-"
+        lines.append(f"| {r.name} | {r.id} | {r.professor or '-'} | {slots} | {r.credits} | {r.classification} "
+                     f"| {r.department} {r.grade}학년 | {r.semester} | p.{r.page} |")
+    if len(rows) > MAX_ROWS: lines.append(f"\n…외 {len(rows) - MAX_ROWS}개 (조건을 더 구체적으로 적어 주세요)")
+    pages = collections.defaultdict(list)
+    for doc, page in zip(df["doc"], df["page"]):
+        if page not in pages[doc]: pages[doc].append(page)
+    lines.append("\n📄 출처: " + " · ".join(f"{doc} (p.{', p.'.join(map(str, sorted(p)))})" for doc, p in pages.items()))
+    return "\n".join(lines)
+
+
+def route(index, question, default_semester=None):
+    """카탈로그로 답할 수 있으면 Answer, 아니면 None (LLM으로)."""
+    if index is None or not len(index.catalog): return None
+    text = _normalize(question)
+    if any(word in text for word in OPEN_ENDED): return None
+    terms = index.scope(question, default_semester)
+    label = ", ".join(terms)
+
+    courses = index.match_courses(question)
+    if courses and any(cue in text for cue in LOOKUP_CUES):
+        rows, shown, note = _select(index, [i for name in courses for i in index.by_name[name]], terms)
+        names = ", ".join(index.catalog.at[index.by_name[n][0], "name"] for n in courses)
+        return Answer("course", note + _format(index, f"📚 **{names}** 개설 정보 ({shown} 강의시간표 기준)", rows), len(rows))
+
+    professors = index.match_professors(question)
+    if professors and any(cue in text for cue in _LISTING_CUES):
+        rows, shown, note = _select(index, [i for p in professors for i in index.by_professor[p]], terms)
+        title = f"👩‍🏫 **{', '.join(professors)} 교수** 개설 과목 ({shown} 강의시간표 기준)"
+        return Answer("professor", note + _format(index, title, rows), len(rows))
+
+    if courses: return None  # 과목에 대한 다른 질문 (교재/시험/과제 등)은 LLM으로
+    department = index.match_department(question)
+    grade = _GRADE.search(question)
+    classification = _classification(question)
+    slots = _slot_filter(question)
+    credits = _CREDITS.search(question)
+    listing = any(cue in text for cue in _LISTING_CUES)
+    # 학과 없이도 요일·교시/학점/이수구분 조건 + 목록을 묻는 말이 있으면 전체 카탈로그에서 거른다
+    if (department and (grade or classification or listing)) or ((slots or credits or classification) and listing):
+        df = index.catalog
+        mask = df["semester"].isin(terms)
+        if department: mask &= df["department"] == department
+        if grade: mask &= df["grade"] == int(grade.group(1))
+        if classification:
+            kind = df["classification"].isin(classification[1])
+            if classification[0] == "교양": kind |= df["college"] == "교양"
+            mask &= kind
+        if slots: mask &= df["slot_mask"].map(lambda m: bool(int(m) & slots[1])).astype(bool)
+        if credits: mask &= df["credits"] == int(credits.group(1))
+        rows = _unique(index, df.index[mask])
+        conditions = " ".join(x for x in (department, grade and f"{grade.group(1)}학년", slots and slots[0],
+                                          credits and f"{credits.group(1)}학점", classification and classification[0]) if x)
+        if not rows: return Answer("listing", f"🔎 {conditions} 조건의 과목이 {label} 강의시간표에 없습니다.", 0)
+        return Answer("listing", _format(index, f"🏫 **{conditions}** 과목 ({label} 강의시간표 기준)", rows), len(rows))
+    return None
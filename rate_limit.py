@@ -0,0 +1,202 @@
+import os
+import re
+import time
+import random
+import threading
+
+# -----------------------------------------------------------------------------
+# [요청 제어] 프로세스 공용 토큰 버킷 + 적응형 속도(AIMD) + 서킷 브레이커 + 데드라인
+# -----------------------------------------------------------------------------
+# 세션마다 따로 sleep 하며 같은 박자로 재시도하던 방식 대신, 프로세스의 모든 세션이
+# 하나의 한도(분당 요청/토큰)를 나눠 쓴다.
+# - 429/503을 받으면 허용 속도를 절반으로 줄이고, 성공할 때마다 조금씩 회복한다.
+# - 재시도 대기는 지수 백오프 + full jitter, 서버가 알려준 Retry-After가 있으면 그 값을 따른다.
+# - 연속 실패가 임계치를 넘으면 서킷을 열어 cooldown 동안 즉시 실패(fail fast)한다.
+# - 한도 대기와 재시도 대기는 데드라인을 넘지 않는다. 요청 한 번의 시간 제한은 여기서 걸지 않고
+#   클라이언트(clients.make_gemini의 timeout=LLM_DEADLINE)가 건다.
+
+GEMINI_RPM = float(os.environ.get("GEMINI_RPM", "60"))
+GEMINI_TPM = float(os.environ.get("GEMINI_TPM", "1000000"))
+LLM_DEADLINE = float(os.environ.get("LLM_DEADLINE", "60"))
+# 진입점별 전체 예산(초): 이 시각이 지나면 재시도/대기/남은 청크 호출을 시작하지 않는다
+ASK_DEADLINE = float(os.environ.get("ASK_DEADLINE", "45"))
+SCAN_DEADLINE = float(os.environ.get("SCAN_DEADLINE", "120"))
+
+_THROTTLE_MARKERS = ("429", "RESOURCE_EXHAUSTED", "503", "UNAVAILABLE")
+_RETRY_AFTER = re.compile(r"retry(?:[ _-]?after|[ _-]?delay|\s+in)['\"]?\s*[:=]?\s*['\"]?(\d+(?:\.\d+)?)\s*s?", re.I)
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+def is_throttle(error):
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status in (429, 503): return True
+    message = str(error)
+    return any(marker in message for marker in _THROTTLE_MARKERS)
+
+
+def retry_after(error):
+    """예외에서 서버가 알려준 재시도 대기(초)를 찾는다. 없으면 None."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if value:
+        try: return float(value)
+        except ValueError: pass
+    m = _RETRY_AFTER.search(str(error))
+    return float(m.group(1)) if m else None
+
+
+class TokenBucket:
+    """예약 방식 토큰 버킷: 먼저 온 호출이 먼저 차례를 받고, 대기 시간만큼만 잔다."""
+
+    def __init__(self, rate_per_sec, capacity):
+        self.rate = rate_per_sec
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, amount, deadline):
+        amount = min(amount, self.capacity)
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = max(0.0, (amount - self.tokens) / self.rate)
+            if now + wait > deadline: raise DeadlineExceeded("rate limit wait exceeds deadline")
+            self.tokens -= amount
+            return wait
+
+    def refund(self, amount):
+        """쓰지 못한 예약을 돌려준다 (다음 버킷에서 데드라인 초과 등)."""
+        with self.lock: self.tokens = min(self.capacity, self.tokens + min(amount, self.capacity))
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, cooldown=30.0):
+        self.failure_threshold, self.cooldown = failure_threshold, cooldown
+        self.state, self.failures, self.opened_at = "closed", 0, 0.0
+        self.probe_in_flight = False
+        self.lock = threading.Lock()
+
+    def before_call(self):
+        with self.lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    raise CircuitOpenError("upstream saturated; failing fast")
+                self.state = "half_open"
+            if self.state == "half_open":
+                if self.probe_in_flight: raise CircuitOpenError("circuit half-open; probe in flight")
+                self.probe_in_flight = True
+
+    def record_success(self):
+        with self.lock:
+            self.state, self.failures, self.probe_in_flight = "closed", 0, False
+
+    def cancel_probe(self):
+        with self.lock: self.probe_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probe_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state, self.opened_at = "open", time.monotonic()
+
+
+class AdaptiveLimiter:
+    def __init__(self, rpm, tpm, max_attempts=5, base_delay=1.0, max_delay=16.0, default_budget=LLM_DEADLINE,
+                 min_scale=0.1, breaker=None):
+        self.base_rps, self.base_tps = rpm / 60.0, tpm / 60.0
+        self.requests = TokenBucket(self.base_rps, max(1.0, rpm / 10.0))
+        self.tokens = TokenBucket(self.base_tps, max(1.0, tpm / 10.0))
+        self.breaker = breaker or CircuitBreaker()
+        self.max_attempts, self.base_delay, self.max_delay = max_attempts, base_delay, max_delay
+        self.default_budget, self.min_scale = default_budget, min_scale
+        self.scale = 1.0
+        self.lock = threading.Lock()
+        self.counters = {"calls": 0, "throttled": 0, "retries": 0, "fast_fails": 0, "deadline_exceeded": 0}
+        self.queue_depth = 0
+        self.in_flight = 0
+
+    def _bump(self, name, delta=1):
+        with self.lock: self.counters[name] += delta
+
+    def _set_scale(self, scale):
+        with self.lock:
+            self.scale = min(1.0, max(self.min_scale, scale))
+            self.requests.rate = self.base_rps * self.scale
+            self.tokens.rate = self.base_tps * self.scale
+
+    def _sleep(self, seconds):
+        if seconds <= 0: return
+        with self.lock: self.queue_depth += 1
+        try: time.sleep(seconds)
+        finally:
+            with self.lock: self.queue_depth -= 1
+
+    def _backoff(self, attempt, error):
+        hinted = retry_after(error)
+        if hinted is not None: return hinted + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, func, tokens=0, budget=None, deadline=None):
+        """func()를 한도/서킷 안에서 실행. 429/503은 재시도, 그 외 예외는 그대로 전달.
+        budget(기본 default_budget초)과 deadline 중 이른 시각을 넘기는 한도 대기/재시도는 시작하지 않고
+        DeadlineExceeded를 낸다. 이미 실행 중인 func()를 끊지는 않는다."""
+        self._bump("calls")
+        deadline = min(deadline or float("inf"), time.monotonic() + (budget or self.default_budget))
+        for attempt in range(self.max_attempts):
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                self._bump("fast_fails"); raise
+            request_wait = None
+            try:
+                request_wait = self.requests.reserve(1, deadline)
+                token_wait = self.tokens.reserve(tokens, deadline) if tokens else 0.0
+            except DeadlineExceeded:
+                if request_wait is not None: self.requests.refund(1)  # 요청 한도는 쓰지 않았으므로 반납
+                self.breaker.cancel_probe()
+                self._bump("deadline_exceeded"); raise
+            self._sleep(max(request_wait, token_wait))
+
+            with self.lock: self.in_flight += 1
+            try: result, error = func(), None
+            except Exception as e: result, error = None, e
+            finally:
+                with self.lock: self.in_flight -= 1
+
+            if error is None:
+                self.breaker.record_success()
+                self._set_scale(self.scale + 0.05)
+                return result
+            if not is_throttle(error):
+                self.breaker.cancel_probe()  # 업스트림 포화가 아닌 오류는 서킷 상태를 바꾸지 않음 (탐침 자리만 반납)
+                raise error
+            self._bump("throttled")
+            self.breaker.record_failure()
+            self._set_scale(self.scale * 0.5)
+            if attempt == self.max_attempts - 1: raise error
+            delay = self._backoff(attempt, error)
+            if time.monotonic() + delay > deadline:
+                self._bump("deadline_exceeded")
+                raise DeadlineExceeded("retry backoff exceeds deadline") from error
+            self._bump("retries")
+            self._sleep(delay)
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, queue_depth=self.queue_depth, in_flight=self.in_flight,
+                        rate_scale=round(self.scale, 2), circuit=self.breaker.state)
+
+
+# 프로세스 전체에서 공유하는 Gemini 한도 (모든 세션/스레드 공용)
+gemini = AdaptiveLimiter(GEMINI_RPM, GEMINI_TPM)
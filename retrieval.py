@@ -0,0 +1,208 @@
+import os
+import re
+import math
+import zlib
+import threading
+import collections
+import numpy as np
+import knowledge_base as kb
+from tokens import count_tokens
+
+# -----------------------------------------------------------------------------
+# [검색 인덱스] 페이지 단위 청크 + BM25 (한글 바이그램) + 선택적 FAISS 벡터 인덱스
+# -----------------------------------------------------------------------------
+# 외부 임베딩 API 없이 완전히 오프라인으로 빌드/질의한다.
+# 벡터 인덱스는 n-gram 해싱 벡터를 faiss(IndexFlatIP)에 넣은 것으로, faiss가 없으면 BM25만 사용.
+# PartitionedRetriever는 학기 파티션마다 인덱스를 따로 두고, 질문에 필요한 학기만 검색한다.
+# 청크는 페이지 파일(mmap)의 바이트 구간만 가리키므로 인덱스가 코퍼스 텍스트를 복사해 두지 않는다.
+
+TOP_K = int(os.environ.get("RETRIEVAL_TOP_K", "8"))
+TOKEN_BUDGET = int(os.environ.get("RETRIEVAL_TOKEN_BUDGET", "8000"))
+CHUNK_CHARS = 1500      # 페이지가 이보다 길면 창 단위로 나눔
+CHUNK_OVERLAP = 200
+VECTOR_DIM = 4096
+
+class Chunk(collections.namedtuple("Chunk", ["doc", "page", "start", "end", "pages"])):
+    """페이지 파일 안의 바이트 구간. 텍스트는 보관하지 않고 필요할 때 mmap에서 잘라 디코딩한다."""
+    __slots__ = ()
+
+    @property
+    def text(self):
+        return self.pages.text(self.page, self.start, self.end)
+
+_WORD = re.compile(r"[가-힣]+|[a-z]+|\d+")
+
+
+def tokenize(text):
+    """한글은 음절 바이그램, 영문/숫자는 단어 단위로 나눈다 (형태소 분석기 없이 한국어 대응)."""
+    terms = []
+    for w in _WORD.findall(text.lower()):
+        if "가" <= w[0] <= "힣" and len(w) > 1:
+            terms.extend(w[i:i + 2] for i in range(len(w) - 1))
+        else:
+            terms.append(w)
+    return terms
+
+
+def chunk_pages(documents):
+    """(문서, 페이지 파일) → Chunk 목록. 출처(문서/페이지)는 청크마다 유지된다."""
+    chunks = []
+    for doc, pages in documents:
+        for page, text in pages:
+            stripped = text.strip()
+            if not stripped: continue
+            base = len(text[:len(text) - len(text.lstrip())].encode("utf-8"))
+            start = 0
+            while True:
+                window = stripped[start:start + CHUNK_CHARS]
+                offset = base + len(stripped[:start].encode("utf-8"))
+                chunks.append(Chunk(doc, page, offset, offset + len(window.encode("utf-8")), pages))
+                if start + CHUNK_CHARS >= len(stripped): break
+                start += CHUNK_CHARS - CHUNK_OVERLAP
+    return chunks
+
+
+class BM25Index:
+    def __init__(self, docs_terms, k1=1.5, b=0.75):
+        self.k1, self.b = k1, b
+        self.n = len(docs_terms)
+        self.doc_len = np.array([len(t) for t in docs_terms], dtype=np.float32)
+        self.avgdl = float(self.doc_len.mean()) if self.n else 0.0
+        postings = collections.defaultdict(lambda: ([], []))
+        for i, terms in enumerate(docs_terms):
+            for term, tf in collections.Counter(terms).items():
+                ids, tfs = postings[term]
+                ids.append(i); tfs.append(tf)
+        self.postings = {
+            term: (np.array(ids, dtype=np.int32), np.array(tfs, dtype=np.float32))
+            for term, (ids, tfs) in postings.items()
+        }
+
+    def scores(self, query_terms):
+        scores = np.zeros(self.n, dtype=np.float32)
+        for term in set(query_terms):
+            if term not in self.postings: continue
+            ids, tfs = self.postings[term]
+            idf = math.log(1 + (self.n - len(ids) + 0.5) / (len(ids) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self.doc_len[ids] / self.avgdl)
+            scores[ids] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+        return scores
+
+
+def _hashed_vector(terms, dim=VECTOR_DIM):
+    vec = np.zeros(dim, dtype=np.float32)
+    for term, tf in collections.Counter(terms).items():
+        vec[zlib.crc32(term.encode("utf-8")) % dim] += 1 + math.log(tf)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+class VectorIndex:
+    def __init__(self, docs_terms, dim=VECTOR_DIM):
+        import faiss
+        self.dim = dim
+        self.index = faiss.IndexFlatIP(dim)
+        if docs_terms:
+            self.index.add(np.stack([_hashed_vector(t, dim) for t in docs_terms]))
+
+    def search(self, query_terms, k):
+        if self.index.ntotal == 0: return []
+        sims, ids = self.index.search(_hashed_vector(query_terms, self.dim)[None, :], min(k, self.index.ntotal))
+        return [int(i) for i, s in zip(ids[0], sims[0]) if i >= 0 and s > 0]
+
+
+class Retriever:
+    def __init__(self, chunks, use_vectors=True):
+        self.chunks = chunks
+        docs_terms = [tokenize(c.text) for c in chunks]
+        self.bm25 = BM25Index(docs_terms)
+        self.vectors = None
+        if use_vectors:
+            try: self.vectors = VectorIndex(docs_terms)
+            except ImportError: self.vectors = None
+
+    @classmethod
+    def from_knowledge_base(cls, kb_dir=kb.KB_DIR, use_vectors=True, partitions=None):
+        return cls(chunk_pages(kb.iter_documents(kb_dir, partitions)), use_vectors=use_vectors)
+
+    def search(self, query, k=TOP_K):
+        """(Chunk, 점수) 목록. 벡터 인덱스가 있으면 BM25와 Reciprocal Rank Fusion으로 합친다."""
+        terms = tokenize(query)
+        if not terms or not self.chunks: return []
+        bm25 = self.bm25.scores(terms)
+        pool = max(k * 4, 20)
+        bm25_rank = [int(i) for i in np.argsort(-bm25)[:pool] if bm25[i] > 0]
+        if self.vectors is None:
+            return [(self.chunks[i], float(bm25[i])) for i in bm25_rank[:k]]
+
+        fused = collections.defaultdict(float)
+        for ranking in (bm25_rank, self.vectors.search(terms, pool)):
+            for rank, i in enumerate(ranking):
+                fused[i] += 1.0 / (60 + rank)
+        best = sorted(fused.items(), key=lambda x: -x[1])[:k]
+        return [(self.chunks[i], score) for i, score in best]
+
+    def build_context(self, query, k=TOP_K, token_budget=TOKEN_BUDGET):
+        """상위 k개 청크를 토큰 예산 안에서 출처 표기와 함께 이어 붙인다."""
+        return format_context(self.search(query, k), token_budget)
+
+
+def format_context(results, token_budget=TOKEN_BUDGET):
+    parts, used = [], 0
+    for chunk, _ in results:
+        block = f"--- [문서: {chunk.doc} | p.{chunk.page}] ---\n{chunk.text}\n"
+        cost = count_tokens(block)
+        if used + cost > token_budget: continue
+        parts.append(block); used += cost
+    return "\n".join(parts)
+
+
+class PartitionedRetriever:
+    """학기 파티션별 Retriever. 파티션 인덱스는 처음 필요할 때 한 번 만든다 (같은 파티션 동시 생성 방지)."""
+
+    def __init__(self, kb_dir=kb.KB_DIR, use_vectors=True):
+        self.kb_dir, self.use_vectors = kb_dir, use_vectors
+        self.manifest = kb.load_manifest(kb_dir) or {}
+        self.terms = kb.terms(self.manifest)
+        self._indexes = {}
+        self._locks = collections.defaultdict(threading.Lock)
+
+    @property
+    def latest_term(self):
+        return self.terms[-1] if self.terms else None
+
+    def scope(self, terms):
+        """검색할 파티션: 고른 학기 + 공통. 학기가 없으면 가장 최근 학기."""
+        terms = [t for t in terms or () if t in self.terms] or [t for t in [self.latest_term] if t]
+        return tuple(terms) + ((kb.COMMON,) if kb.COMMON in self.manifest.get("partitions", {}) else ())
+
+    def index(self, key):
+        if key not in self._indexes:
+            with self._locks[key]:
+                if key not in self._indexes:
+                    self._indexes[key] = Retriever.from_knowledge_base(self.kb_dir, self.use_vectors, partitions=(key,))
+        return self._indexes[key]
+
+    def warmup(self, keys=None):
+        """최근 학기부터 파티션 인덱스를 백그라운드에서 미리 만든다."""
+        keys = list(keys or self.scope(None) + tuple(reversed(self.terms)))
+        thread = threading.Thread(target=lambda: [self.index(k) for k in dict.fromkeys(keys)],
+                                  name="retriever-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def version(self, terms):
+        return kb.partition_version(self.manifest, self.scope(terms))
+
+    def search(self, query, terms=None, k=TOP_K):
+        """파티션별 순위를 Reciprocal Rank Fusion으로 합친다 (BM25 점수는 인덱스마다 척도가 달라 직접 비교하지 않음)."""
+        keys = self.scope(terms)
+        if len(keys) == 1: return self.index(keys[0]).search(query, k)
+        fused = {}
+        for key in keys:
+            for rank, (chunk, _) in enumerate(self.index(key).search(query, k)):
+                fused[chunk] = fused.get(chunk, 0.0) + 1.0 / (60 + rank)
+        return sorted(fused.items(), key=lambda x: -x[1])[:k]
+
+    def build_context(self, query, terms=None, k=TOP_K, token_budget=TOKEN_BUDGET):
+        return format_context(self.search(query, terms, k), token_budget)
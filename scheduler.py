@@ -0,0 +1,131 @@
+import time
+import heapq
+import collections
+from concurrent.futures import ThreadPoolExecutor
+import timeslots
+
+# -----------------------------------------------------------------------------
+# [자동 시간표 생성] 충돌 없는 시간표 상위 N개 (분기 한정 탐색)
+# -----------------------------------------------------------------------------
+# - 같은 과목명의 분반은 하나의 그룹으로 묶고, 그룹당 최대 한 분반만 고른다.
+# - 필수 과목(priority High)은 반드시 포함, 나머지는 선택.
+# - 점수 = Σ(우선순위 가중치 × 학점) + 공강 요일 보너스.
+# - 가지치기: 학점 상한, 남은 학점 × 최대 가중치 기반 상한(bound), 시간 예산.
+# - 메모이제이션: (다음 그룹, 사용 마스크, 학점)이 같은 상태에 이미 더 높은 점수로
+#   top_n번 도달했다면, 이후 어떤 선택도 상위 N에 들 수 없으므로 건너뛴다.
+
+PRIORITY_WEIGHT = {"High": 3, "Medium": 2, "Normal": 1}
+FREE_DAY_BONUS = 2
+WEEKDAY_MASKS = [timeslots.day_mask(d) for d in timeslots.GRID_DAYS]
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="scheduler")
+
+
+class _Timeout(Exception):
+    pass
+
+
+def _free_weekdays(mask):
+    return sum(1 for m in WEEKDAY_MASKS if not mask & m)
+
+
+def forbidden_mask(free_days=(), no_first_period=False):
+    mask = 0
+    for day in free_days: mask |= timeslots.day_mask(day)
+    if no_first_period: mask |= timeslots.period_mask(1)
+    return mask
+
+
+def _build_groups(candidates, forbidden):
+    by_name = collections.OrderedDict()
+    for c in candidates: by_name.setdefault(c["name"], []).append(c)
+
+    required, optional = [], []
+    for name, sections in by_name.items():
+        is_required = any(c.get("priority") == "High" for c in sections)
+        weight = max(PRIORITY_WEIGHT.get(c.get("priority"), 1) for c in sections)
+        options, seen_masks = [], set()
+        for c in sections:
+            mask = timeslots.course_mask(c)
+            if mask in seen_masks: continue  # 같은 시간대 분반은 하나만 (결과 다양성)
+            seen_masks.add(mask)
+            options.append((mask, int(c.get("credits") or 0), c))
+        allowed = [o for o in options if not o[0] & forbidden]
+        if is_required: required.append((weight, allowed or options))
+        elif allowed: optional.append((weight, allowed))
+
+    required.sort(key=lambda g: len(g[1]))  # 선택지가 적은 필수 과목부터
+    optional.sort(key=lambda g: (-g[0], -max(o[1] for o in g[1])))
+    return required, optional
+
+
+def generate_schedules(candidates, min_credits=15, max_credits=21, free_days=(), no_first_period=False,
+                       top_n=5, time_budget=0.2):
+    """조건에 맞는 시간표 상위 top_n개.
+
+    반환: {"schedules": [{"courses", "credits", "score"}...], "complete": 탐색 완료 여부,
+           "nodes": 방문 노드 수, "elapsed": 초}
+    """
+    start = time.perf_counter()
+    deadline = start + time_budget
+    required, optional = _build_groups(candidates, forbidden_mask(free_days, no_first_period))
+    weights = [w for w, _ in optional]
+
+    best = []  # (score, seq, courses, credits) 최소 힙
+    memo = {}
+    counter, nodes = [0], [0]
+
+    def record(score, credits, chosen):
+        counter[0] += 1
+        item = (score, counter[0], chosen, credits)
+        if len(best) < top_n: heapq.heappush(best, item)
+        elif score > best[0][0]: heapq.heapreplace(best, item)
+
+    def dominated(key, score):
+        scores = memo.setdefault(key, [])
+        if len(scores) >= top_n and scores[0] >= score: return True
+        heapq.heappush(scores, score)
+        if len(scores) > top_n: heapq.heappop(scores)
+        return False
+
+    def tick():
+        nodes[0] += 1
+        if nodes[0] & 255 == 0 and time.perf_counter() > deadline: raise _Timeout
+
+    def search_optional(j0, mask, credits, base, chosen):
+        tick()
+        bonus = FREE_DAY_BONUS * _free_weekdays(mask)
+        if credits >= min_credits: record(base + bonus, credits, chosen)
+        if dominated((j0, mask, credits), base): return
+        for j in range(j0, len(optional)):
+            # 가중치 내림차순 정렬이므로 이 그룹의 상한이 부족하면 뒤쪽도 모두 부족
+            if len(best) == top_n and base + (max_credits - credits) * weights[j] + bonus <= best[0][0]: break
+            for mask_o, cr, course in optional[j][1]:
+                if mask_o & mask or credits + cr > max_credits: continue
+                search_optional(j + 1, mask | mask_o, credits + cr, base + weights[j] * cr, chosen + (course,))
+
+    def search_required(k, mask, credits, base, chosen):
+        tick()
+        if k == len(required):
+            search_optional(0, mask, credits, base, chosen)
+            return
+        weight, options = required[k]
+        for mask_o, cr, course in options:
+            if mask_o & mask or credits + cr > max_credits: continue
+            search_required(k + 1, mask | mask_o, credits + cr, base + weight * cr, chosen + (course,))
+
+    complete = True
+    try: search_required(0, 0, 0, 0, ())
+    except _Timeout: complete = False
+
+    schedules = [
+        {"courses": list(chosen), "credits": credits, "score": score}
+        for score, _, chosen, credits in sorted(best, key=lambda x: (-x[0], x[1]))
+    ]
+    return {"schedules": schedules, "complete": complete, "nodes": nodes[0],
+            "elapsed": time.perf_counter() - start}
+
+
+def submit(candidates, **prefs):
+    """작업 스레드에서 generate_schedules 실행 (Streamlit 재실행을 막지 않음). Future 반환."""
+    return _executor.submit(generate_schedules, list(candidates), **prefs)
@@ -0,0 +1,153 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+# -----------------------------------------------------------------------------
+# [계측] 기능별 지연/토큰/재시도/캐시 적중 기록 (SQLite, 오래된 행부터 순환 삭제)
+# -----------------------------------------------------------------------------
+# with telemetry.Span("ask_ai", store) as span:
+#     ... span.add(prompt_tokens=..., retries=...) / span.first_token() / span.fail(e)
+# 블록이 끝나면 한 행으로 기록된다. map-reduce처럼 여러 스레드가 같은 span에 누적해도 안전하다.
+# 기록 실패(잠금, 디스크 등)는 요청 처리를 막지 않는다.
+
+TELEMETRY_PATH = os.environ.get("TELEMETRY_PATH", os.path.join("data", "telemetry.sqlite3"))
+MAX_ROWS = int(os.environ.get("TELEMETRY_MAX_ROWS", "20000"))
+WINDOW_SECONDS = int(os.environ.get("TELEMETRY_WINDOW", str(24 * 3600)))  # 관리자 패널 집계 구간
+
+_COUNTERS = ("prompt_tokens", "response_tokens", "llm_calls", "retries", "cache_hits", "failures")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL, feature TEXT NOT NULL, status TEXT NOT NULL,
+    latency_ms REAL NOT NULL, ttft_ms REAL, prompt_tokens INTEGER, response_tokens INTEGER,
+    llm_calls INTEGER, retries INTEGER, cache_hits INTEGER, failures INTEGER, error TEXT, meta TEXT
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events(ts);
+"""
+
+
+def describe_error(error):
+    return f"{type(error).__name__}: {str(error)[:200]}"
+
+
+def percentile(sorted_values, q):
+    """최근접 순위 백분위수 (q: 0~100). 값이 없으면 None."""
+    if not sorted_values: return None
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return round(sorted_values[int(rank) - 1], 1)
+
+
+class TelemetryStore:
+    def __init__(self, path=TELEMETRY_PATH, max_rows=MAX_ROWS):
+        self.path, self.max_rows = path, max_rows
+        self._local = threading.local()
+        self._inserts = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._conn() as conn: conn.executescript(_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def record(self, event):
+        row = (event["ts"], event["feature"], event["status"], event["latency_ms"], event.get("ttft_ms"),
+               *(event.get(name, 0) for name in _COUNTERS), event.get("error"),
+               json.dumps(event.get("meta") or {}, ensure_ascii=False))
+        try:
+            with self._conn() as conn:
+                conn.execute("INSERT INTO events(ts, feature, status, latency_ms, ttft_ms, prompt_tokens, "
+                             "response_tokens, llm_calls, retries, cache_hits, failures, error, meta) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+                # 순환: 일정 건수마다 상한을 넘는 오래된 행을 삭제
+                self._inserts += 1
+                if self._inserts % 100 == 0:
+                    conn.execute("DELETE FROM events WHERE id <= (SELECT MAX(id) FROM events) - ?", (self.max_rows,))
+        except sqlite3.Error:
+            pass
+
+    def recent(self, limit=50):
+        try:
+            with self._conn() as conn:
+                conn.row_factory = sqlite3.Row
+                rows = conn.execute("SELECT * FROM events ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+                conn.row_factory = None
+        except sqlite3.Error:
+            return []
+        return [dict(r) for r in rows]
+
+    def summary(self, window=WINDOW_SECONDS):
+        """기능별 호출 수, 지연 p50/p95/p99, 첫 토큰 p50, 토큰 합계, 재시도/캐시 적중/실패 수."""
+        try:
+            with self._conn() as conn:
+                rows = conn.execute("SELECT feature, status, latency_ms, ttft_ms, prompt_tokens, response_tokens, "
+                                    "retries, cache_hits FROM events WHERE ts >= ?",
+                                    (time.time() - window,)).fetchall()
+        except sqlite3.Error:
+            return []
+        by_feature = {}
+        for feature, status, latency, ttft, p_tok, r_tok, retries, hits in rows:
+            f = by_feature.setdefault(feature, {"latency": [], "ttft": [], "prompt_tokens": 0, "response_tokens": 0,
+                                                "retries": 0, "cache_hits": 0, "errors": 0})
+            f["latency"].append(latency)
+            if ttft is not None: f["ttft"].append(ttft)
+            f["prompt_tokens"] += p_tok or 0; f["response_tokens"] += r_tok or 0
+            f["retries"] += retries or 0; f["cache_hits"] += hits or 0
+            f["errors"] += status == "error"
+
+        summary = []
+        for feature, f in sorted(by_feature.items()):
+            latency, ttft = sorted(f["latency"]), sorted(f["ttft"])
+            summary.append({
+                "feature": feature, "calls": len(latency),
+                "p50_ms": percentile(latency, 50), "p95_ms": percentile(latency, 95), "p99_ms": percentile(latency, 99),
+                "ttft_p50_ms": percentile(ttft, 50),
+                "prompt_tokens": f["prompt_tokens"], "response_tokens": f["response_tokens"],
+                "retries": f["retries"], "cache_hits": f["cache_hits"], "errors": f["errors"],
+            })
+        return summary
+
+
+class Span:
+    """한 번의 기능 호출을 측정한다. with 블록 밖으로 나가는 예외는 실패 사유로 기록 후 그대로 전달."""
+
+    def __init__(self, feature, store=None, **meta):
+        self.feature, self.store, self.meta = feature, store, meta
+        self.counts = dict.fromkeys(_COUNTERS, 0)
+        self.ttft_ms = None
+        self.error = None
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def add(self, **counts):
+        with self.lock:
+            for name, value in counts.items(): self.counts[name] += value
+
+    def first_token(self):
+        if self.ttft_ms is None: self.ttft_ms = self.elapsed_ms()
+
+    def fail(self, error):
+        """호출부에서 삼키는 예외도 사유를 남긴다."""
+        with self.lock:
+            self.counts["failures"] += 1
+            self.error = describe_error(error)
+
+    def __exit__(self, exc_type, exc, tb):
+        if isinstance(exc, Exception): self.fail(exc)
+        if self.store is not None:
+            self.store.record(dict(self.counts, ts=time.time(), feature=self.feature, latency_ms=self.elapsed_ms(),
+                                   ttft_ms=self.ttft_ms, status="error" if self.error else "ok",
+                                   error=self.error, meta=self.meta))
+        return False
@@ -0,0 +1,44 @@
+import time
+import pytest
+import clients
+
+# 실행: 저장소 루트에서 python -m pytest -q tests
+
+
+def _factory(failures):
+    calls = []
+    def build():
+        calls.append(1)
+        if len(calls) <= failures: raise RuntimeError("bad credentials")
+        return "client"
+    return build, calls
+
+
+def test_failed_build_is_remembered_for_the_retry_window():
+    registry = clients.ClientRegistry(retry_after=60)
+    build, calls = _factory(1)
+    registry.register("db", build)
+    for _ in range(3):
+        with pytest.raises(RuntimeError): registry.get("db")
+    assert len(calls) == 1 and registry.get_or_none("db") is None
+    assert registry.error("db") == "RuntimeError: bad credentials" and not registry.ready("db")
+    assert registry.health()["db"]["state"] == "error" and registry.health()["db"]["retry_in_s"] > 0
+
+
+def test_build_is_retried_after_the_window():
+    registry = clients.ClientRegistry(retry_after=0.05)
+    build, calls = _factory(1)
+    registry.register("db", build)
+    assert registry.get_or_none("db") is None
+    time.sleep(0.06)
+    assert registry.get("db") == "client" and registry.error("db") is None and len(calls) == 2
+
+
+def test_retry_rebuilds_in_the_background():
+    registry = clients.ClientRegistry(retry_after=60)
+    build, calls = _factory(1)
+    registry.register("db", build)
+    registry.warmup().join(timeout=5)
+    assert registry.error("db")
+    registry.retry("db").join(timeout=5)
+    assert registry.ready("db") and registry.error("db") is None and len(calls) == 2
@@ -0,0 +1,54 @@
+import gc
+import weakref
+import course_store
+import timeslots
+import timetable_view
+
+# 실행: 저장소 루트에서 python -m pytest -q tests
+
+
+def _courses(prefix, n):
+    return [{"id": f"{prefix}-{i:02d}", "name": f"{prefix}{i}", "professor": "김철수", "credits": 3,
+             "time_slots": [f"월{i % 9 + 1}"]} for i in range(n)]
+
+
+def test_collect_frees_courses_no_array_references():
+    store = course_store.CourseStore(max_courses=10)
+    kept = store.index_array(_courses("유지", 3))
+    dropped = store.intern_list(_courses("버림", 5))
+    course = store[dropped[0]]
+    timetable_view.course_row_html(course, False)  # 행 HTML 캐시가 Course를 붙잡으면 안 된다
+    ref = weakref.ref(course)
+    store._lists.clear()  # 공유 목록 캐시에서도 빠진 경우 (LRU로 밀려남)
+    del dropped, course
+    gc.collect()
+    assert store.collect() == 5
+    gc.collect()
+    assert ref() is None
+    assert [c["name"] for c in store.courses(kept)] == ["유지0", "유지1", "유지2"]
+    assert store.stats()["courses"] == 3 and store.stats()["free_slots"] == 5
+
+
+def test_freed_slots_are_reused_and_interning_is_stable():
+    store = course_store.CourseStore(max_courses=10)
+    store.index_array(_courses("버림", 4))
+    gc.collect(); store.collect()
+    ids = store.index_array(_courses("새", 4))
+    assert sorted(ids) == [0, 1, 2, 3]
+    assert store.intern(_courses("새", 4)[2]) == ids[2]
+    assert store.intern_list(_courses("새", 4)) is store.intern_list(_courses("새", 4))
+
+
+def test_conflicts_follow_reused_slots():
+    store = course_store.CourseStore(max_courses=10)
+    store.index_array([{"id": "a", "name": "a", "time_slots": ["화1"]}])
+    gc.collect(); store.collect()
+    ids = store.index_array([{"id": "b", "name": "b", "time_slots": ["월1"]}])
+    assert store.conflicts_with(ids, timeslots.encode_slots(["월1"])).tolist() == [True]
+    assert store.conflicts_with(ids, timeslots.encode_slots(["화1"])).tolist() == [False]
+
+
+def test_course_mask_does_not_modify_the_course():
+    course = {"name": "자료구조", "time_slots": ["월1", "수2"]}
+    assert timeslots.course_mask(course) == timeslots.encode_slots(["월1", "수2"])
+    assert "slot_mask" not in course
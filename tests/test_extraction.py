@@ -0,0 +1,48 @@
+import re
+import page_store
+import extraction
+from tokens import count_tokens
+
+# 실행: 저장소 루트에서 python -m pytest -q tests
+
+HEADER = re.compile(r"\n--- \[문서: (.+?) \| p\.(\d+)\] ---\n")
+
+
+def _pages(tmp_path, texts):
+    path = str(tmp_path / "doc.pages")
+    with page_store.PageWriter(path) as writer:
+        for text in texts: writer.add(text)
+    return page_store.PageFile(path)
+
+
+def _sections(chunk):
+    """청크 텍스트 → [(문서, 페이지, 본문)]."""
+    parts = HEADER.split(str(chunk))
+    assert parts[0] == "", "chunk does not start with a header"
+    return [(parts[i], int(parts[i + 1]), parts[i + 2]) for i in range(1, len(parts), 3)]
+
+
+def test_every_chunk_of_an_oversized_page_keeps_its_header(tmp_path):
+    big = "".join(f"{i}번 과목 월3 수4 김철수 3학점\n" for i in range(200))
+    pages = _pages(tmp_path, ["짧은 첫 페이지\n", big, "마지막 페이지\n"])
+    chunks = extraction.split_pages([("시간표.pdf", pages)], max_tokens=300)
+    assert len(chunks) > 3
+    sections = [s for c in chunks for s in _sections(c)]
+    assert all(doc == "시간표.pdf" and body.strip() for doc, _, body in sections)
+    assert "".join(body for _, page, body in sections if page == 2) == big
+    assert [page for _, page, _ in sections] == sorted(page for _, page, _ in sections)
+    assert all(count_tokens(str(c)) <= 300 for c in chunks)
+
+
+def test_blank_pages_and_blank_tails_make_no_chunks(tmp_path):
+    big = "".join(f"{i}번 과목 월3 수4\n" for i in range(100)) + "\n" * 400
+    pages = _pages(tmp_path, ["", big, "   \n"])
+    chunks = extraction.split_pages([("시간표.pdf", pages)], max_tokens=200)
+    assert chunks and all(body.strip() for c in chunks for _, _, body in _sections(c))
+    assert {page for c in chunks for _, page, _ in _sections(c)} == {2}
+
+
+def test_small_pages_share_a_chunk(tmp_path):
+    pages = _pages(tmp_path, ["가\n", "나\n", "다\n"])
+    chunks = extraction.split_pages([("a.pdf", pages)], max_tokens=1000)
+    assert len(chunks) == 1 and [p for _, p, _ in _sections(chunks[0])] == [1, 2, 3]
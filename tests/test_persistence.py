@@ -0,0 +1,72 @@
+import fakes
+import persistence
+
+# 실행: 저장소 루트에서 python -m pytest -q tests
+
+DOC = ("users", "u1", "timetables", "2025-2")
+
+
+def _store(db, **kwargs):
+    return persistence.WriteBehindStore(lambda: db, **{"flush_interval": 0.01, **kwargs})
+
+
+def test_pending_writes_are_visible_to_reads_before_flush():
+    db = fakes.FakeFirestore()
+    store = _store(db, flush_interval=60)  # 기록 스레드가 시험 중에는 commit하지 않는다
+    for i in range(10): store.put("u1", "chats", f"c{i % 3}", {"n": i, "updated_at": persistence.now()})
+    rows = store.load_collection("u1", "chats")
+    assert sorted((r["id"], r["n"]) for r in rows) == [("c0", 9), ("c1", 7), ("c2", 8)]
+    assert db.docs == {} and store.stats()["pending"] == 3
+
+
+def test_transient_commit_failures_are_retried():
+    db = fakes.FakeFirestore(fail_commits=2)
+    store = _store(db, max_attempts=5)
+    for i in range(5): store.put("u1", "chats", "c0", {"n": i})
+    assert store.flush(timeout=10)
+    stats = store.stats()
+    assert stats["retries"] >= 1 and stats["unsaved"] == 0 and stats["pending"] == 0
+    assert db.docs[("users", "u1", "chats", "c0")] == {"n": 4}
+
+
+def test_exhausted_writes_are_kept_and_readable():
+    db = fakes.FakeFirestore(fail_commits=10 ** 6)
+    store = _store(db, max_attempts=2)
+    store.put("u1", "timetables", "2025-2", {"credits": 18})
+    assert store.flush(timeout=10)
+    assert store.failed("u1") == [DOC] and store.failed("u2") == []
+    assert store.stats()["unsaved"] == 1 and "503" in store.stats()["last_error"]
+    assert store.load_collection("u1", "timetables") == [{"id": "2025-2", "credits": 18}]
+
+
+def test_retry_failed_writes_them_once_the_backend_recovers():
+    db = fakes.FakeFirestore(fail_commits=10 ** 6)
+    store = _store(db, max_attempts=2)
+    store.put("u1", "timetables", "2025-2", {"credits": 18})
+    assert store.flush(timeout=10)
+    db.fail_commits = 0
+    assert store.retry_failed("u2") == 0
+    assert store.retry_failed("u1") == 1
+    assert store.flush(timeout=10)
+    assert db.docs[DOC] == {"credits": 18} and store.failed() == []
+
+
+def test_new_write_replaces_a_failed_one():
+    db = fakes.FakeFirestore(fail_commits=10 ** 6)
+    store = _store(db, max_attempts=1)
+    store.put("u1", "timetables", "2025-2", {"credits": 18})
+    assert store.flush(timeout=10) and store.failed()
+    db.fail_commits = 0
+    store.put("u1", "timetables", "2025-2", {"credits": 21})
+    assert store.flush(timeout=10)
+    assert db.docs[DOC] == {"credits": 21} and store.failed() == []
+
+
+def test_user_cache_drops_the_password():
+    db = fakes.FakeFirestore()
+    db.collection("users").document("abc").set({"email": "a@kw.ac.kr", "password": "pw"})
+    store = _store(db)
+    assert store.find_user("a@kw.ac.kr") == ("abc", {"email": "a@kw.ac.kr"})
+    store.remember_user("b@kw.ac.kr", "def", {"email": "b@kw.ac.kr", "password": "pw2"})
+    assert all("password" not in entry[2] for entry in store._users.values())
+    assert store.find_user("b@kw.ac.kr") == ("def", {"email": "b@kw.ac.kr"})
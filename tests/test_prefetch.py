@@ -0,0 +1,75 @@
+import json
+import time
+import concurrent.futures
+import pytest
+import fakes
+import extraction
+import prefetch
+
+# 실행: 저장소 루트에서 python -m pytest -q tests
+
+CHUNKS = 5
+
+
+def _llm(latency=0.0):
+    return fakes.FakeLLM(first_token_latency=latency, tokens_per_second=1e9,
+                         response=lambda prompt: json.dumps([{"name": prompt, "credits": 3}]))
+
+
+def _loader(llm, key):
+    """앱의 후보 스캔처럼 청크마다 LLM을 한 번씩 부르고, 취소되면 남은 청크는 건너뛴다."""
+    chunks = [f"{key}-{i}" for i in range(CHUNKS)]
+    extract = lambda chunk: extraction.parse_course_json(llm.invoke(chunk).content)
+    return lambda cancelled: extraction.map_reduce_extract(chunks, extract, max_workers=1, cancelled=cancelled)
+
+
+def test_finished_prefetch_is_shared_without_new_llm_calls():
+    llm, prefetcher = _llm(), prefetch.Prefetcher()
+    a, b = prefetch.Owner(), prefetch.Owner()
+    first = prefetcher.request(a, "k", _loader(llm, "k"))
+    assert len(first.result(timeout=5)) == CHUNKS and llm.calls == CHUNKS
+    assert prefetcher.request(b, "k", _loader(llm, "k")) is first
+    assert prefetcher.get(b, "k", _loader(llm, "k")) is first  # 버튼을 눌러도 끝난 결과를 그대로
+    assert llm.calls == CHUNKS
+    assert prefetcher.stats()["shared"] == 1 and prefetcher.stats()["started"] == 1
+
+
+def test_switching_away_cancels_the_running_prefetch():
+    llm, prefetcher = _llm(latency=0.05), prefetch.Prefetcher()
+    owner = prefetch.Owner()
+    old = prefetcher.request(owner, "k1", _loader(llm, "k1"))
+    time.sleep(0.02)  # 첫 청크 호출 중
+    new = prefetcher.request(owner, "k2", _loader(llm, "k2"))
+    with pytest.raises((prefetch.CancelledPrefetch, concurrent.futures.CancelledError)): old.result(timeout=5)
+    assert len(new.result(timeout=5)) == CHUNKS
+    assert llm.calls < 2 * CHUNKS  # k1의 남은 청크는 호출하지 않았다
+    assert prefetcher.stats()["cancelled"] == 1
+
+
+def test_superseded_prefetch_result_is_discarded():
+    llm, prefetcher = _llm(latency=0.05), prefetch.Prefetcher()
+    owner = prefetch.Owner()
+    old = prefetcher.request(owner, "k1", _loader(llm, "k1"))
+    time.sleep(0.02)
+    prefetcher.request(owner, "k2", _loader(llm, "k2")).result(timeout=5)
+    again = prefetcher.request(owner, "k1", _loader(llm, "k1"))
+    assert again is not old and len(again.result(timeout=5)) == CHUNKS
+    assert prefetcher.stats()["started"] == 3
+
+
+def test_prefetch_still_wanted_by_another_session_keeps_running():
+    llm, prefetcher = _llm(latency=0.02), prefetch.Prefetcher()
+    a, b = prefetch.Owner(), prefetch.Owner()
+    shared = prefetcher.request(a, "k1", _loader(llm, "k1"))
+    assert prefetcher.request(b, "k1", _loader(llm, "k1")) is shared
+    prefetcher.request(a, "k2", _loader(llm, "k2"))
+    assert len(shared.result(timeout=5)) == CHUNKS
+    assert prefetcher.stats().get("cancelled", 0) == 0
+
+
+def test_get_reruns_an_empty_result():
+    prefetcher, owner = prefetch.Prefetcher(), prefetch.Owner()
+    results = iter([[], ["course"]])
+    load = lambda cancelled: next(results)
+    assert prefetcher.request(owner, "k", load).result(timeout=5) == []
+    assert prefetcher.get(owner, "k", load).result(timeout=5) == ["course"]
@@ -0,0 +1,93 @@
+import pandas as pd
+import pytest
+import timeslots
+import query_router
+
+# 실행: 저장소 루트에서 python -m pytest -q tests
+
+
+def _course(id, name, professor, credits, slots, classification, college, department, grade, semester="2025-2"):
+    return {"id": id, "name": name, "professor": professor, "credits": credits, "hours": credits,
+            "time_slots": slots, "classification": classification, "college": college, "department": department,
+            "grade": grade, "semester": semester, "note": "", "doc": f"{semester} 강의시간표.pdf", "page": 1,
+            "slot_mask": timeslots.encode_slots(slots)}
+
+
+@pytest.fixture(scope="module")
+def index():
+    return query_router.CourseIndex(pd.DataFrame([
+        _course("0000-2-1234-01", "자료구조", "김철수", 3, ["월3", "수4"], "전필", "소프트웨어융합대학", "컴퓨터정보공학부", 2),
+        _course("0000-2-2345-01", "회로이론", "이영희", 3, ["화1", "목2"], "전필", "전자정보공과대학", "전자공학과", 2),
+        _course("0000-3-3456-01", "인공지능", "박민수", 3, ["금5", "금6"], "전선", "소프트웨어융합대학", "컴퓨터정보공학부", 3),
+        _course("0000-1-4567-01", "대학글쓰기", "최지은", 3, ["월3", "월4"], "교필", "교양", "교양", 1),
+        _course("0000-1-5678-01", "요가", "정수진", 1, ["화7"], "교선", "교양", "교양", 1),
+        _course("0000-1-6789-01", "철학의이해", "한동훈", 3, ["목5", "목6"], "교선", "교양", "교양", 1),
+        _course("0000-2-7890-01", "디지털논리", "김철수", 3, ["월1", "수2"], "전필", "전자정보공과대학", "전자공학과", 2,
+                semester="2025-1"),
+    ]))
+
+
+@pytest.mark.parametrize("question", [
+    "자료구조 선수과목이 뭐야?",
+    "자료구조 교재 뭐 써?",
+    "회로이론 과제 많아?",
+    "회로이론 중간고사 언제?",
+    "회로이론 시험 범위",
+    "인공지능 공부 어디서 시작해?",
+    "김철수 교수 연구실 어디야?",
+    "재수강 규정 알려줘",
+])
+def test_questions_about_a_course_go_to_the_llm(index, question):
+    assert query_router.route(index, question) is None
+
+
+@pytest.mark.parametrize("question", ["자료구조 몇 시야?", "회로이론 몇 학점?", "인공지능 교수 누구야?", "자료구조 무슨 요일이야?"])
+def test_course_lookup(index, question):
+    answer = query_router.route(index, question)
+    assert answer.intent == "course" and answer.rows == 1
+
+
+def test_professor_courses(index):
+    answer = query_router.route(index, "김철수 교수 강의 목록")
+    assert answer.intent == "professor" and "자료구조" in answer.text
+
+
+def test_department_listing(index):
+    answer = query_router.route(index, "컴퓨터정보공학부 2학년 전공필수")
+    assert answer.intent == "listing" and answer.rows == 1 and "자료구조" in answer.text
+
+
+def test_day_and_period_listing(index):
+    answer = query_router.route(index, "월요일 3교시 수업 뭐 있어?")
+    assert answer.intent == "listing" and answer.rows == 2
+    assert "자료구조" in answer.text and "대학글쓰기" in answer.text and "회로이론" not in answer.text
+
+
+def test_day_listing(index):
+    answer = query_router.route(index, "금요일 수업 목록")
+    assert answer.rows == 1 and "인공지능" in answer.text
+
+
+def test_credits_and_general_education_listing(index):
+    answer = query_router.route(index, "3학점 교양 과목 알려줘")
+    assert answer.intent == "listing" and answer.rows == 2
+    assert "대학글쓰기" in answer.text and "철학의이해" in answer.text and "요가" not in answer.text
+
+
+def test_empty_listing(index):
+    answer = query_router.route(index, "토요일 과목 뭐 있어?")
+    assert answer.intent == "listing" and answer.rows == 0
+
+
+@pytest.mark.parametrize("question, default_semester", [("디지털논리 몇 시야?", None), ("2025-2 디지털논리 몇 학점?", None),
+                                                         ("디지털논리 교수 누구야?", "2학기")])
+def test_course_outside_the_scoped_term_is_labelled_with_its_own_term(index, question, default_semester):
+    answer = query_router.route(index, question, default_semester)
+    assert answer.intent == "course" and answer.rows == 1
+    assert "2025-2 강의시간표에는 개설되지 않았습니다" in answer.text
+    assert "(2025-1 강의시간표 기준)" in answer.text and "(2025-2 강의시간표 기준)" not in answer.text
+
+
+def test_professor_courses_stay_in_the_scoped_term(index):
+    answer = query_router.route(index, "김철수 교수 강의 목록")
+    assert answer.rows == 1 and "디지털논리" not in answer.text and "개설되지 않았습니다" not in answer.text
@@ -0,0 +1,117 @@
+import time
+import pytest
+import rate_limit
+
+# 실행: 저장소 루트에서 python -m pytest -q tests
+
+
+class Throttled(Exception):
+    status_code = 429
+
+
+def _limiter(**kwargs):
+    params = {"rpm": 60000, "tpm": 10 ** 9, "max_attempts": 4, "base_delay": 0.001, "max_delay": 0.001}
+    return rate_limit.AdaptiveLimiter(**{**params, **kwargs})
+
+
+def _flaky(failures, error=Throttled("429 RESOURCE_EXHAUSTED")):
+    calls = []
+    def func():
+        calls.append(time.monotonic())
+        if len(calls) <= failures: raise error
+        return "ok"
+    return func, calls
+
+
+def test_throttling_halves_the_rate_and_success_recovers_it():
+    limiter = _limiter()
+    func, calls = _flaky(2)
+    assert limiter.call(func) == "ok" and len(calls) == 3
+    assert limiter.scale == pytest.approx(0.25 + 0.05)
+    assert limiter.requests.rate == pytest.approx(limiter.base_rps * limiter.scale)
+    assert limiter.counters["throttled"] == 2 and limiter.counters["retries"] == 2
+    for _ in range(30): limiter.call(lambda: None)
+    assert limiter.scale == 1.0
+
+
+def test_rate_never_drops_below_min_scale():
+    limiter = _limiter(max_attempts=10, min_scale=0.1, breaker=rate_limit.CircuitBreaker(failure_threshold=100))
+    func, _ = _flaky(100)
+    with pytest.raises(Throttled): limiter.call(func)
+    assert limiter.scale == pytest.approx(0.1)
+
+
+def test_other_errors_are_not_retried_and_keep_the_rate():
+    limiter = _limiter()
+    func, calls = _flaky(5, ValueError("bad prompt"))
+    with pytest.raises(ValueError): limiter.call(func)
+    assert len(calls) == 1 and limiter.scale == 1.0 and limiter.breaker.failures == 0
+
+
+def test_breaker_opens_half_opens_and_closes():
+    breaker = rate_limit.CircuitBreaker(failure_threshold=2, cooldown=0.05)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(rate_limit.CircuitOpenError): breaker.before_call()
+    time.sleep(0.06)
+    breaker.before_call()  # 탐침 한 번만 통과
+    assert breaker.state == "half_open"
+    with pytest.raises(rate_limit.CircuitOpenError): breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+    breaker.before_call(); breaker.before_call()
+
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = rate_limit.CircuitBreaker(failure_threshold=1, cooldown=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(rate_limit.CircuitOpenError): breaker.before_call()
+
+
+def test_non_throttle_error_on_the_probe_leaves_the_circuit_half_open():
+    limiter = _limiter(breaker=rate_limit.CircuitBreaker(failure_threshold=1, cooldown=0.05))
+    limiter.breaker.record_failure()
+    time.sleep(0.06)
+    with pytest.raises(ValueError): limiter.call(_flaky(1, ValueError("bad prompt"))[0])
+    assert limiter.breaker.state == "half_open" and not limiter.breaker.probe_in_flight
+    assert limiter.call(lambda: "ok") == "ok" and limiter.breaker.state == "closed"
+
+
+def test_open_circuit_fails_fast():
+    limiter = _limiter(max_attempts=1, breaker=rate_limit.CircuitBreaker(failure_threshold=1, cooldown=60))
+    with pytest.raises(Throttled): limiter.call(_flaky(1)[0])
+    func, calls = _flaky(0)
+    with pytest.raises(rate_limit.CircuitOpenError): limiter.call(func)
+    assert not calls and limiter.counters["fast_fails"] == 1
+
+
+def test_bucket_wait_past_the_deadline_raises_without_calling():
+    limiter = _limiter(rpm=60)  # 초당 1개, 한 번에 최대 6개
+    for _ in range(6): limiter.call(lambda: None)
+    func, calls = _flaky(0)
+    with pytest.raises(rate_limit.DeadlineExceeded): limiter.call(func, deadline=time.monotonic() + 0.2)
+    assert not calls and limiter.counters["deadline_exceeded"] == 1
+
+
+def test_retry_backoff_past_the_deadline_raises():
+    limiter = _limiter()
+    func, calls = _flaky(5, Throttled("429 retry after 30s"))
+    started = time.monotonic()
+    with pytest.raises(rate_limit.DeadlineExceeded): limiter.call(func, budget=1.0)
+    assert len(calls) == 1 and time.monotonic() - started < 0.5
+
+
+def test_request_reservation_is_refunded_when_the_token_bucket_times_out():
+    limiter = _limiter(rpm=60, tpm=600)  # 요청 6개, 토큰 60개(초당 10개)
+    limiter.call(lambda: None, tokens=60)
+    before = limiter.requests.tokens
+    func, calls = _flaky(0)
+    with pytest.raises(rate_limit.DeadlineExceeded):
+        limiter.call(func, tokens=60, deadline=time.monotonic() + 0.5)
+    assert not calls and limiter.requests.tokens >= before
@@ -0,0 +1,94 @@
+import itertools
+import timeslots
+import scheduler
+
+# 실행: 저장소 루트에서 python -m pytest -q tests
+
+
+def _c(name, slots, credits=3, priority="Normal", section=1):
+    return {"id": f"{name}-{section:02d}", "name": name, "time_slots": slots, "credits": credits, "priority": priority}
+
+
+def _brute_force_best(candidates, min_credits, max_credits):
+    """그룹(과목명)마다 분반 하나 또는 선택 안 함의 모든 조합 중 최고 점수."""
+    groups = {}
+    for c in candidates: groups.setdefault(c["name"], []).append(c)
+    required = {name for name, sections in groups.items() if any(c["priority"] == "High" for c in sections)}
+    best = None
+    for pick in itertools.product(*[[None] + sections for sections in groups.values()]):
+        chosen = [c for c in pick if c is not None]
+        if not required <= {c["name"] for c in chosen}: continue
+        masks = [timeslots.encode_slots(c["time_slots"]) for c in chosen]
+        if any(a & b for a, b in itertools.combinations(masks, 2)): continue
+        credits = sum(c["credits"] for c in chosen)
+        if not min_credits <= credits <= max_credits: continue
+        mask = 0
+        for m in masks: mask |= m
+        score = sum(scheduler.PRIORITY_WEIGHT[c["priority"]] * c["credits"] for c in chosen)
+        score += scheduler.FREE_DAY_BONUS * scheduler._free_weekdays(mask)
+        best = score if best is None else max(best, score)
+    return best
+
+
+CANDIDATES = [
+    _c("자료구조", ["월1", "월2"], priority="High"), _c("자료구조", ["화1", "화2"], priority="High", section=2),
+    _c("회로이론", ["월2", "수2"], priority="Medium"), _c("회로이론", ["목3", "목4"], priority="Medium", section=2),
+    _c("인공지능", ["화1", "목3"]), _c("인공지능", ["금5", "금6"], section=2),
+    _c("대학글쓰기", ["월1", "수1"], credits=2), _c("요가", ["토1"], credits=1),
+    _c("철학의이해", ["토1", "토2"], credits=2), _c("캡스톤설계", ["월10", "월11"], credits=3, priority="Medium"),
+    _c("야간세미나", ["월11"], credits=1),
+]
+
+
+def _masks(schedule):
+    return [timeslots.encode_slots(c["time_slots"]) for c in schedule["courses"]]
+
+
+def test_best_schedule_matches_exhaustive_search():
+    result = scheduler.generate_schedules(CANDIDATES, min_credits=6, max_credits=15, top_n=3, time_budget=5)
+    assert result["complete"]
+    scores = [s["score"] for s in result["schedules"]]
+    assert scores == sorted(scores, reverse=True)
+    assert scores[0] == _brute_force_best(CANDIDATES, 6, 15)
+
+
+def test_conflicting_sections_are_never_combined():
+    result = scheduler.generate_schedules(CANDIDATES, min_credits=1, max_credits=30, top_n=20, time_budget=5)
+    assert result["schedules"]
+    for schedule in result["schedules"]:
+        masks = _masks(schedule)
+        assert not any(a & b for a, b in itertools.combinations(masks, 2)), schedule
+        assert len({c["name"] for c in schedule["courses"]}) == len(schedule["courses"])
+
+
+def test_slots_outside_the_grid_still_conflict():
+    # 토요일/10교시 이상은 45비트 격자 밖 상위 비트 → 겹치면 함께 고르지 않는다
+    candidates = [_c("요가", ["토1"], credits=1), _c("철학의이해", ["토1", "토2"], credits=2),
+                  _c("캡스톤설계", ["월10", "월11"], credits=3), _c("야간세미나", ["월11"], credits=1)]
+    result = scheduler.generate_schedules(candidates, min_credits=1, max_credits=30, top_n=10, time_budget=5)
+    for schedule in result["schedules"]:
+        names = {c["name"] for c in schedule["courses"]}
+        assert not {"요가", "철학의이해"} <= names and not {"캡스톤설계", "야간세미나"} <= names
+    assert result["schedules"][0]["credits"] == 5
+
+
+def test_credit_cap_and_required_courses():
+    result = scheduler.generate_schedules(CANDIDATES, min_credits=6, max_credits=9, top_n=10, time_budget=5)
+    assert result["schedules"]
+    for schedule in result["schedules"]:
+        assert 6 <= schedule["credits"] <= 9
+        assert schedule["credits"] == sum(c["credits"] for c in schedule["courses"])
+        assert any(c["name"] == "자료구조" for c in schedule["courses"])
+
+
+def test_free_days_are_respected():
+    result = scheduler.generate_schedules(CANDIDATES, min_credits=3, max_credits=15, free_days=("금",), time_budget=5)
+    fri = timeslots.day_mask("금")
+    assert all(not m & fri for s in result["schedules"] for m in _masks(s))
+
+
+def test_no_candidates():
+    result = scheduler.generate_schedules([], min_credits=0, max_credits=21)
+    assert result["complete"] and result["schedules"] == [{"courses": [], "credits": 0,
+                                                               "score": scheduler.FREE_DAY_BONUS * 5}]
+    assert scheduler.generate_schedules([], min_credits=15)["schedules"] == []
@@ -0,0 +1,97 @@
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# [시간 슬롯 비트마스크] '월3' 같은 문자열 슬롯 → 정수 비트마스크
+# -----------------------------------------------------------------------------
+# 0~44번 비트: 월~금 × 1~9교시 (45비트 기본 격자, 요일 우선 배치)
+# 45번 이후 : 격자 밖 슬롯 (토요일, 0교시, 10교시 이상) — 강의시간표에 실제로 존재하므로
+#            충돌 판정에서 빠지지 않도록 같은 정수의 상위 비트에 둔다.
+# 강좌마다 카탈로그 로딩 시 한 번만 인코딩하고, 충돌 검사는 AND 한 번으로 끝낸다.
+
+GRID_DAYS = ("월", "화", "수", "목", "금")
+GRID_PERIODS = 9
+ALL_DAYS = GRID_DAYS + ("토",)
+MAX_PERIOD = 12
+
+SLOT_BITS = {}
+for _d, _day in enumerate(GRID_DAYS):
+    for _p in range(1, GRID_PERIODS + 1):
+        SLOT_BITS[f"{_day}{_p}"] = _d * GRID_PERIODS + (_p - 1)
+for _day in ALL_DAYS:
+    for _p in range(0, MAX_PERIOD + 1):
+        SLOT_BITS.setdefault(f"{_day}{_p}", len(SLOT_BITS))
+BIT_SLOTS = {bit: (slot[0], int(slot[1:])) for slot, bit in SLOT_BITS.items()}
+GRID_MASK = (1 << (len(GRID_DAYS) * GRID_PERIODS)) - 1
+_WORD = (1 << 64) - 1
+
+
+def parse_slot(slot):
+    """'월3' → ('월', 3). 형식이 맞지 않으면 None."""
+    if not isinstance(slot, str) or len(slot) < 2 or not slot[1:].isdigit(): return None
+    return slot[0], int(slot[1:])
+
+
+def encode_slots(slots):
+    mask = 0
+    for slot in slots or []:
+        bit = SLOT_BITS.get(slot) if isinstance(slot, str) else None
+        if bit is not None: mask |= 1 << bit
+    return mask
+
+
+def course_mask(course):
+    """카탈로그에서 미리 계산한 slot_mask를 쓰고, 없으면(LLM 결과 등) 그 자리에서 인코딩 (입력은 바꾸지 않는다)."""
+    mask = course.get("slot_mask")
+    return encode_slots(course.get("time_slots")) if mask is None else mask
+
+
+def iter_slots(mask):
+    """마스크에 켜진 (요일, 교시)를 비트 순서대로."""
+    while mask:
+        low = mask & -mask
+        yield BIT_SLOTS[low.bit_length() - 1]
+        mask ^= low
+
+
+def _words(masks):
+    masks = list(masks)
+    lo = np.array([m & _WORD for m in masks], dtype=np.uint64)
+    hi = np.array([m >> 64 for m in masks], dtype=np.uint64)
+    return lo, hi
+
+
+def conflicts_with(masks, schedule_mask):
+    """각 강좌가 현재 시간표(마스크 합)와 겹치는지 (n개 bool)."""
+    lo, hi = _words(masks)
+    return ((lo & np.uint64(schedule_mask & _WORD)) | (hi & np.uint64(schedule_mask >> 64))) != 0
+
+
+def sum_masks(courses):
+    mask = 0
+    for c in courses: mask |= course_mask(c)
+    return mask
+
+
+def find_conflict(course, schedule):
+    """시간표에서 course와 겹치는 첫 과목명, 없으면 None. 합집합 AND 한 번으로 대부분 바로 끝난다."""
+    mask = course_mask(course)
+    if not mask & sum_masks(schedule): return None
+    for existing in schedule:
+        if mask & course_mask(existing): return existing['name']
+    return None
+
+
+def day_mask(day):
+    """해당 요일의 모든 교시 비트."""
+    mask = 0
+    for slot, bit in SLOT_BITS.items():
+        if slot[0] == day: mask |= 1 << bit
+    return mask
+
+
+def period_mask(period):
+    """모든 요일의 해당 교시 비트."""
+    mask = 0
+    for slot, bit in SLOT_BITS.items():
+        if int(slot[1:]) == period: mask |= 1 << bit
+    return mask
@@ -0,0 +1,102 @@
+import zlib
+import functools
+import timeslots
+
+# -----------------------------------------------------------------------------
+# [시간표 HTML 렌더러] 시간표 지문(fingerprint) 단위 캐시 + 셀 단위 재사용
+# -----------------------------------------------------------------------------
+# - 색상은 과목명의 crc32로 고른다 (hash()는 프로세스마다 달라져 배포 후 색이 바뀐다).
+# - 기본 격자는 월~금 1~9교시, 시간표에 토요일/0교시/10교시 이상이 있으면 그만큼 넓힌다.
+# - 같은 시간표는 캐시된 HTML을 그대로 쓰고, 과목을 더하거나 빼면 바뀐 셀만 새로 만든다
+#   (셀/행 HTML이 각각 캐시되어 나머지는 재사용).
+# 스타일(.tt-*)은 app.py의 전역 CSS에 한 번만 들어 있다.
+# 강의 목록 행 HTML도 (보이는 내용, 충돌 여부) 단위로 프로세스 전체에서 재사용한다. 캐시 키에 Course 객체를
+# 넣지 않으므로 course_store.collect()가 비운 강좌를 캐시가 붙잡아 두지 않는다.
+
+PALETTE = (
+    {"bg": "#FFEBEE", "text": "#C62828"}, {"bg": "#E3F2FD", "text": "#1565C0"},
+    {"bg": "#E8F5E9", "text": "#2E7D32"}, {"bg": "#F3E5F5", "text": "#6A1B9A"},
+    {"bg": "#FFF3E0", "text": "#EF6C00"}, {"bg": "#E0F2F1", "text": "#00695C"},
+    {"bg": "#FCE4EC", "text": "#AD1457"},
+)
+EMPTY_CELL = "<td class='tt-cell tt-empty'></td>"
+
+
+def course_color(name):
+    return PALETTE[zlib.crc32(name.encode("utf-8")) % len(PALETTE)]
+
+
+def schedule_fingerprint(schedule):
+    """렌더링 결과를 결정하는 값만 모은 튜플 (순서 유지: 겹치면 뒤 과목이 보인다)."""
+    return tuple((c['name'], timeslots.course_mask(c)) for c in schedule)
+
+
+@functools.lru_cache(maxsize=1024)
+def _cell_html(name):
+    if name is None: return EMPTY_CELL
+    style = course_color(name)
+    return (f"<td class='tt-cell'><div class='tt-card' style='background:{style['bg']}; color:{style['text']};'>"
+            f"<span class='tt-name'>{name}</span></div></td>")
+
+
+@functools.lru_cache(maxsize=2048)
+def _row_html(period, names):
+    return f"<tr><td class='tt-time'>{period}</td>" + "".join(_cell_html(n) for n in names) + "</tr>"
+
+
+@functools.lru_cache(maxsize=256)
+def render_fingerprint(fingerprint):
+    grid, online, days, periods = {}, [], set(timeslots.GRID_DAYS), set(range(1, timeslots.GRID_PERIODS + 1))
+    for name, mask in fingerprint:
+        if not mask:
+            online.append(name)
+            continue
+        for day, period in timeslots.iter_slots(mask):
+            grid[day, period] = name
+            days.add(day); periods.add(period)
+
+    days = [d for d in timeslots.ALL_DAYS if d in days]
+    periods = range(min(periods), max(periods) + 1)
+    html = ["<table class='tt-table'><tr><th style='width:20px;'></th>"]
+    html.extend(f"<th>{d}</th>" for d in days)
+    html.append("</tr>")
+    html.extend(_row_html(p, tuple(grid.get((d, p)) for d in days)) for p in periods)
+    html.append("</table>")
+
+    if online:
+        html.append("<div class='tt-online'><strong>💻 온라인/기타:</strong> ")
+        for name in online:
+            s = course_color(name)
+            html.append(f"<span class='tt-badge' style='background:{s['bg']}; color:{s['text']};'>{name}</span>")
+        html.append("</div>")
+    return "".join(html)
+
+
+def render_timetable(schedule):
+    return render_fingerprint(schedule_fingerprint(schedule))
+
+
+def course_row_html(course, conflict):
+    return _course_row_html(course['name'], course['credits'], course['professor'], tuple(course['time_slots'] or ()),
+                            conflict)
+
+
+@functools.lru_cache(maxsize=8192)
+def _course_row_html(name, credits, professor, time_slots, conflict):
+    # 슬림한 Row 스타일 HTML (시간 충돌 과목은 흐리게), 구분선 포함
+    return f"""
+    <div class="course-row{' cr-conflict' if conflict else ''}">
+        <div class="cr-left">
+            <span class="cr-title">{name}</span>
+            <div class="cr-meta">
+                <span>{credits}학점</span>
+                <span>|</span>
+                <span>{professor}</span>
+            </div>
+        </div>
+        <div class="cr-right">
+            <span class="cr-time">{', '.join(time_slots) if time_slots else '-'}</span>
+        </div>
+    </div>
+    <hr style='margin: 0; border: none; border-bottom: 1px solid #f0f0f0;'>
+    """
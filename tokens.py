@@ -0,0 +1,28 @@
+import functools
+
+# -----------------------------------------------------------------------------
+# [토큰 계산] tiktoken 우선, 인코딩 파일을 받을 수 없는 오프라인 환경에서는 근사치
+# -----------------------------------------------------------------------------
+ENCODING_NAME = "cl100k_base"
+
+
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(ENCODING_NAME)
+    except Exception:
+        return None
+
+
+def estimate_tokens(text):
+    # 한글 등 비ASCII 문자는 대체로 1자 ≈ 1토큰, ASCII는 4자 ≈ 1토큰
+    ascii_chars = sum(1 for ch in text if ch < "\x80")
+    return (len(text) - ascii_chars) + (ascii_chars + 3) // 4
+
+
+def count_tokens(text):
+    if not text: return 0
+    enc = _encoding()
+    if enc is None: return estimate_tokens(text)
+    return len(enc.encode(text, disallowed_special=()))